@@ -0,0 +1 @@
+"""Performance benchmarks for the music library (not part of the test suite)."""
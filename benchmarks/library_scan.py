@@ -0,0 +1,187 @@
+"""Library scan benchmarks on synthetic tagged libraries.
+
+For each library size, generates (or reuses) a synthetic library and
+measures on a fresh cache:
+
+- cold_scan: first scan with an empty index (every file extracted)
+- warm_rescan: second scan with nothing changed
+- load_index / load_index_validated: loading the index in trust-cache mode
+  and with the per-file stat() validation
+- rebuild_index, search, get_folder_structure: in-memory operations
+  (best of --repeat runs)
+
+Results are written as JSON so runs can be compared across versions.
+
+Usage:
+    python -m benchmarks.library_scan --sizes 1000 10000 100000 \\
+        --library-dir ~/bench-libraries --output results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.synthetic_library import generate_library
+
+SEARCH_QUERIES = ("artist 1", "album 2", "track 99", "jazz", "no such track")
+
+
+def _timed(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _best_of(func: Callable[[], Any], repeat: int) -> float:
+    return min(_timed(func) for _ in range(repeat))
+
+
+def _use_config_home(home: Path, music_dir: Path, options: Dict[str, str]) -> None:
+    """Point the Config singleton at a fresh XDG tree for one benchmark run."""
+    from core.config import Config
+
+    for name in ("XDG_CONFIG_HOME", "XDG_CACHE_HOME", "XDG_DATA_HOME"):
+        os.environ[name] = str(home / name.lower())
+    Config._instance = None
+    config = Config.get_instance()
+    config.set("library", "music_dirs", str(music_dir))
+    # Measure the scan alone: no background validation or watcher threads
+    config.set("library", "trust_cache", "false")
+    config.set("library", "watch", "false")
+    for key, value in options.items():
+        config.set("library", key, value)
+
+
+def run_size(
+    count: int,
+    library_root: Path,
+    work_dir: Path,
+    repeat: int,
+    embed_art: bool,
+    options: Dict[str, str],
+) -> Dict[str, Any]:
+    """Run all measurements for one library size."""
+    from core.music_library import MusicLibrary
+
+    music_dir = library_root / f"library-{count}"
+    start = time.perf_counter()
+    manifest = generate_library(music_dir, count, embed_art=embed_art)
+    generate_s = time.perf_counter() - start
+
+    home = work_dir / f"home-{count}"
+    shutil.rmtree(home, ignore_errors=True)
+    _use_config_home(home, music_dir, options)
+
+    library = MusicLibrary()
+    cold_scan_s = _timed(library._do_scan)
+    cold_stats = library.get_scan_stats()
+    warm_rescan_s = _timed(library._do_scan)
+    tracks = library.get_track_count()
+
+    library = MusicLibrary()
+    library._trust_cache = True
+    load_index_s = _best_of(library._load_index, repeat)
+    library._trust_cache = False
+    load_index_validated_s = _best_of(library._load_index, repeat)
+
+    def rebuild() -> None:
+        with library._lock:
+            library._rebuild_index()
+
+    def search() -> None:
+        for query in SEARCH_QUERIES:
+            library.search(query)
+
+    return {
+        "files": count,
+        "tracks": tracks,
+        "formats": manifest["formats"],
+        "embed_art": embed_art,
+        "generate_s": round(generate_s, 4),
+        "cold_scan_s": round(cold_scan_s, 4),
+        "cold_scan_files_per_s": round(count / cold_scan_s, 1) if cold_scan_s else None,
+        "cold_scan_stats": cold_stats,
+        "warm_rescan_s": round(warm_rescan_s, 4),
+        "load_index_s": round(load_index_s, 4),
+        "load_index_validated_s": round(load_index_validated_s, 4),
+        "rebuild_index_s": round(_best_of(rebuild, repeat), 4),
+        "search_s": round(_best_of(search, repeat) / len(SEARCH_QUERIES), 6),
+        "get_folder_structure_s": round(
+            _best_of(library.get_folder_structure, repeat), 6
+        ),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000], metavar="N"
+    )
+    parser.add_argument(
+        "--library-dir",
+        type=Path,
+        help="Keep generated libraries here and reuse them (default: temporary)",
+    )
+    parser.add_argument("--output", type=Path, help="Write JSON here (default: stdout)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-art", action="store_true", help="Skip embedded covers")
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Override a [library] setting, e.g. --set index_backend=sqlite",
+    )
+    args = parser.parse_args(argv)
+    options = dict(item.split("=", 1) for item in args.set)
+
+    work_dir = Path(tempfile.mkdtemp(prefix="musicplayer-bench-"))
+    library_root = args.library_dir or work_dir
+    library_root.mkdir(parents=True, exist_ok=True)
+    try:
+        results = []
+        for count in args.sizes:
+            print(f"Benchmarking {count} files...", file=sys.stderr)
+            results.append(
+                run_size(
+                    count,
+                    library_root,
+                    work_dir,
+                    args.repeat,
+                    not args.no_art,
+                    options,
+                )
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    from core.music_library import INDEX_VERSION
+
+    report = {
+        "benchmark": "library_scan",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "index_version": INDEX_VERSION,
+        "options": options,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Memory benchmark for TrackMetadata.
+
+Builds synthetic libraries the way the library index does (one fresh dict
+per track, as json.load produces them) and measures how much memory the
+resulting track objects keep alive, comparing the previous __dict__-based
+representation against the current slot-based, interned TrackMetadata.
+
+Usage:
+    python -m benchmarks.metadata_memory [--sizes 10000 100000]
+"""
+
+import argparse
+import gc
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from core.metadata import TrackMetadata
+
+TRACKS_PER_ALBUM = 12
+ALBUMS_PER_ARTIST = 4
+GENRES = ["Rock", "Jazz", "Electronic", "Classical", "Hip-Hop", "Folk", "Metal"]
+
+
+class DictTrackMetadata:
+    """The previous TrackMetadata layout: per-instance __dict__, no interning."""
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DictTrackMetadata":
+        metadata = cls.__new__(cls)
+        for key, value in data.items():
+            setattr(metadata, key, value)
+        return metadata
+
+
+def _track_dict(i: int) -> Dict[str, Any]:
+    """Build the cached metadata dict of track i with freshly allocated strings."""
+    album_id = i // TRACKS_PER_ALBUM
+    artist_id = album_id // ALBUMS_PER_ARTIST
+    return {
+        "file_path": f"/music/Artist {artist_id}/Album {album_id}/{i:06d} Track.flac",
+        "title": f"Track {i}",
+        "artist": f"Artist {artist_id}",
+        "album": f"Album {album_id}",
+        "album_artist": f"Artist {artist_id}",
+        "track_number": i % TRACKS_PER_ALBUM + 1,
+        "duration": 180.0 + i % 120,
+        "album_art_path": None,
+        "genre": "".join(GENRES[artist_id % len(GENRES)]),  # fresh copy
+        "year": str(1960 + artist_id % 60),
+    }
+
+
+def measure(factory: Callable[[Dict[str, Any]], Any], count: int) -> int:
+    """Return the bytes retained by ``count`` tracks built with ``factory``."""
+    gc.collect()
+    tracemalloc.start()
+    tracks: List[Any] = [factory(_track_dict(i)) for i in range(count)]
+    gc.collect()
+    retained, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tracks
+    return retained
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000], metavar="N"
+    )
+    args = parser.parse_args()
+
+    print(f"{'tracks':>8}  {'dict-based':>12}  {'slots+intern':>12}  {'saved':>6}")
+    for count in args.sizes:
+        before = measure(DictTrackMetadata.from_dict, count)
+        after = measure(TrackMetadata.from_dict, count)
+        print(
+            f"{count:>8}  {before / 2**20:>9.1f} MiB  {after / 2**20:>9.1f} MiB"
+            f"  {1 - after / before:>6.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Generate synthetic, tagged music libraries for benchmarks.
+
+Files are tiny but structurally valid MP3, FLAC, Ogg Vorbis and M4A
+containers (no real audio), tagged through mutagen exactly like ripped
+files: title, artist, album, album artist, track number, genre, year and
+an embedded cover. The layout is Artist/Album/NN - Title.ext with one
+format per album.
+"""
+
+import base64
+import json
+import random
+import struct
+from pathlib import Path
+from typing import Callable, Dict
+
+from mutagen.flac import FLAC, Picture
+from mutagen.id3 import APIC, ID3, TALB, TCON, TDRC, TIT2, TPE1, TPE2, TRCK
+from mutagen.mp4 import MP4, MP4Cover
+from mutagen.ogg import OggPage
+from mutagen.oggvorbis import OggVorbis
+
+FORMATS = ("mp3", "flac", "ogg", "m4a")
+TRACKS_PER_ALBUM = 12
+ALBUMS_PER_ARTIST = 4
+GENRES = ("Rock", "Jazz", "Electronic", "Classical", "Hip-Hop", "Folk", "Metal")
+ART_SIZE = 16 * 1024
+
+# Written next to the generated files so a library can be reused across runs
+MANIFEST_NAME = ".synthetic_library.json"
+
+SAMPLE_RATE = 44100
+DURATION = 180
+
+
+def _mp3_template() -> bytes:
+    # MPEG-1 Layer III, 128 kbit/s, 44.1 kHz frames (417 bytes each)
+    frame = bytes([0xFF, 0xFB, 0x90, 0x64]) + bytes(413)
+    return frame * 20
+
+
+def _flac_template() -> bytes:
+    total_samples = SAMPLE_RATE * DURATION
+    packed = (SAMPLE_RATE << 44) | (1 << 41) | (15 << 36) | total_samples
+    streaminfo = (
+        struct.pack(">HH", 4096, 4096)
+        + bytes(6)
+        + packed.to_bytes(8, "big")
+        + bytes(16)
+    )
+    # Single (last) STREAMINFO metadata block
+    return b"fLaC" + bytes([0x80]) + len(streaminfo).to_bytes(3, "big") + streaminfo
+
+
+def _ogg_template() -> bytes:
+    ident = (
+        b"\x01vorbis"
+        + struct.pack("<IBIiii", 0, 2, SAMPLE_RATE, 0, 128000, 0)
+        + bytes([0xB8, 1])
+    )
+    comment = b"\x03vorbis" + struct.pack("<II", 0, 0) + b"\x01"
+    setup = b"\x05vorbis" + bytes(32)
+
+    pages = []
+    for sequence, packets in enumerate(([ident], [comment, setup], [bytes(64)])):
+        page = OggPage()
+        page.serial = 1
+        page.sequence = sequence
+        page.packets = packets
+        page.position = 0
+        pages.append(page)
+    pages[0].first = True
+    pages[-1].last = True
+    pages[-1].position = SAMPLE_RATE * DURATION
+    return b"".join(page.write() for page in pages)
+
+
+def _m4a_template() -> bytes:
+    def atom(name: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", 8 + len(data)) + name + data
+
+    def full_atom(name: bytes, data: bytes) -> bytes:
+        return atom(name, bytes(4) + data)
+
+    length = SAMPLE_RATE * DURATION
+    mvhd = full_atom(
+        b"mvhd", struct.pack(">IIII", 0, 0, SAMPLE_RATE, length) + bytes(80)
+    )
+    mdhd = full_atom(b"mdhd", struct.pack(">IIIIHH", 0, 0, SAMPLE_RATE, length, 0, 0))
+    hdlr = full_atom(b"hdlr", struct.pack(">I4s12s", 0, b"soun", bytes(12)) + b"\x00")
+    moov = atom(b"moov", mvhd + atom(b"trak", atom(b"mdia", mdhd + hdlr)))
+    ftyp = atom(b"ftyp", b"M4A " + bytes(4) + b"M4A mp42isom")
+    return ftyp + moov + atom(b"mdat", bytes(64))
+
+
+def _cover(album_id: int) -> bytes:
+    """Cover payload for an album (JPEG markers around random bytes)."""
+    rng = random.Random(album_id)
+    return b"\xff\xd8\xff\xe0" + rng.randbytes(ART_SIZE) + b"\xff\xd9"
+
+
+def _tag_mp3(path: Path, tags: Dict, art: bytes) -> None:
+    id3 = ID3()
+    id3.add(TIT2(encoding=3, text=tags["title"]))
+    id3.add(TPE1(encoding=3, text=tags["artist"]))
+    id3.add(TALB(encoding=3, text=tags["album"]))
+    id3.add(TPE2(encoding=3, text=tags["album_artist"]))
+    id3.add(TRCK(encoding=3, text=f"{tags['track']}/{TRACKS_PER_ALBUM}"))
+    id3.add(TCON(encoding=3, text=tags["genre"]))
+    id3.add(TDRC(encoding=3, text=tags["year"]))
+    if art:
+        id3.add(APIC(encoding=3, mime="image/jpeg", type=3, desc="", data=art))
+    id3.save(path)
+
+
+def _vorbis_comments(audio, tags: Dict) -> None:
+    audio["title"] = tags["title"]
+    audio["artist"] = tags["artist"]
+    audio["album"] = tags["album"]
+    audio["albumartist"] = tags["album_artist"]
+    audio["tracknumber"] = str(tags["track"])
+    audio["genre"] = tags["genre"]
+    audio["date"] = tags["year"]
+
+
+def _picture(art: bytes) -> Picture:
+    picture = Picture()
+    picture.type = 3
+    picture.mime = "image/jpeg"
+    picture.data = art
+    return picture
+
+
+def _tag_flac(path: Path, tags: Dict, art: bytes) -> None:
+    audio = FLAC(path)
+    _vorbis_comments(audio, tags)
+    if art:
+        audio.add_picture(_picture(art))
+    audio.save()
+
+
+def _tag_ogg(path: Path, tags: Dict, art: bytes) -> None:
+    audio = OggVorbis(path)
+    _vorbis_comments(audio, tags)
+    if art:
+        audio["metadata_block_picture"] = [
+            base64.b64encode(_picture(art).write()).decode("ascii")
+        ]
+    audio.save()
+
+
+def _tag_m4a(path: Path, tags: Dict, art: bytes) -> None:
+    audio = MP4(path)
+    audio["\xa9nam"] = tags["title"]
+    audio["\xa9ART"] = tags["artist"]
+    audio["\xa9alb"] = tags["album"]
+    audio["aART"] = tags["album_artist"]
+    audio["trkn"] = [(tags["track"], TRACKS_PER_ALBUM)]
+    audio["\xa9gen"] = tags["genre"]
+    audio["\xa9day"] = tags["year"]
+    if art:
+        audio["covr"] = [MP4Cover(art, imageformat=MP4Cover.FORMAT_JPEG)]
+    audio.save()
+
+
+_TEMPLATES: Dict[str, Callable[[], bytes]] = {
+    "mp3": _mp3_template,
+    "flac": _flac_template,
+    "ogg": _ogg_template,
+    "m4a": _m4a_template,
+}
+_TAGGERS: Dict[str, Callable[[Path, Dict, bytes], None]] = {
+    "mp3": _tag_mp3,
+    "flac": _tag_flac,
+    "ogg": _tag_ogg,
+    "m4a": _tag_m4a,
+}
+
+
+def generate_library(root: Path, count: int, embed_art: bool = True) -> Dict:
+    """
+    Create ``count`` tagged files under ``root`` (reused if already there).
+
+    ``root`` must be empty, missing, or hold a library generated earlier with
+    the same parameters.
+
+    Returns:
+        The library manifest: {"files", "embed_art", "formats": {ext: count}}
+    """
+    manifest_path = root / MANIFEST_NAME
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+        if manifest.get("files") == count and manifest.get("embed_art") == embed_art:
+            return manifest
+    if root.exists() and any(root.iterdir()):
+        raise ValueError(f"{root} is not empty and holds no matching library")
+
+    templates = {fmt: template() for fmt, template in _TEMPLATES.items()}
+    formats = dict.fromkeys(FORMATS, 0)
+    art = b""
+    for i in range(count):
+        album_id = i // TRACKS_PER_ALBUM
+        artist_id = album_id // ALBUMS_PER_ARTIST
+        fmt = FORMATS[album_id % len(FORMATS)]
+        track = i % TRACKS_PER_ALBUM + 1
+        if track == 1:
+            art = _cover(album_id) if embed_art else b""
+
+        tags = {
+            "title": f"Track {i}",
+            "artist": f"Artist {artist_id}",
+            "album": f"Album {album_id}",
+            "album_artist": f"Artist {artist_id}",
+            "track": track,
+            "genre": GENRES[artist_id % len(GENRES)],
+            "year": str(1960 + artist_id % 60),
+        }
+        album_dir = root / tags["artist"] / tags["album"]
+        album_dir.mkdir(parents=True, exist_ok=True)
+        path = album_dir / f"{track:02d} - {tags['title']}.{fmt}"
+        path.write_bytes(templates[fmt])
+        _TAGGERS[fmt](path, tags, art)
+        formats[fmt] += 1
+
+    manifest = {"files": count, "embed_art": embed_art, "formats": formats}
+    manifest_path.write_text(json.dumps(manifest))
+    return manifest
@@ -0,0 +1,89 @@
+"""Micro-benchmark for reading track fields from parsed tag containers.
+
+Generates (or reuses) a synthetic library, parses every file once with
+mutagen, then times per format how long turning the parsed tags into track
+fields takes: the previous approach, probing every known key of every
+format per field, against the single-pass readers of core.tag_readers. The
+mutagen parse itself is timed too, for scale.
+
+Usage:
+    python -m benchmarks.tag_extraction [--files 400] [--repeat 20]
+"""
+
+import argparse
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from mutagen import File
+
+from benchmarks.synthetic_library import FORMATS, generate_library
+from core.metadata import TrackMetadata
+from core.tag_readers import read_tags
+
+
+def _time_per_file(fn: Callable[[Any], Any], items: List[Any], repeat: int) -> float:
+    """Best of ``repeat`` runs of fn over items, in microseconds per item."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1e6
+
+
+def run(root: Path, files: int, repeat: int) -> None:
+    generate_library(root, files, embed_art=False)
+    paths: Dict[str, List[Path]] = defaultdict(list)
+    for path in sorted(root.rglob("*.*")):
+        if path.suffix[1:] in FORMATS:
+            paths[path.suffix[1:]].append(path)
+
+    # Only the probing helpers are used; they need no file
+    probe = TrackMetadata.__new__(TrackMetadata)
+
+    print(
+        f"{'format':>6}  {'files':>5}  {'parse':>9}  {'probing':>9}"
+        f"  {'single-pass':>11}  {'speedup':>7}"
+    )
+    for fmt in FORMATS:
+        audio_files = [File(path) for path in paths[fmt]]
+        if not audio_files:
+            continue
+        for audio_file in audio_files:
+            # Both must read the same fields
+            assert read_tags(audio_file.tags) == probe._read_tags_generic(audio_file)
+        parse = _time_per_file(File, paths[fmt], max(1, repeat // 10))
+        before = _time_per_file(probe._read_tags_generic, audio_files, repeat)
+        after = _time_per_file(
+            lambda audio_file: read_tags(audio_file.tags), audio_files, repeat
+        )
+        print(
+            f"{fmt:>6}  {len(audio_files):>5}  {parse:>6.1f} µs  {before:>6.1f} µs"
+            f"  {after:>8.1f} µs  {before / after:>6.1f}x"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=400, metavar="N")
+    parser.add_argument("--repeat", type=int, default=20, metavar="N")
+    parser.add_argument(
+        "--library-dir",
+        type=Path,
+        help="keep the generated library here (default: a temporary directory)",
+    )
+    args = parser.parse_args()
+
+    if args.library_dir:
+        run(args.library_dir / f"tags-{args.files}", args.files, args.repeat)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(Path(tmp), args.files, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""Album art: locating embedded pictures during scans, extracting them on demand."""
+
+import base64
+import hashlib
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from mutagen import File
+from mutagen._vorbis import VCommentDict
+from mutagen.apev2 import APEv2
+from mutagen.flac import Picture
+from mutagen.id3 import ID3
+from mutagen.mp4 import MP4Tags
+
+from core.art_store import ArtStore
+from core.config import get_config
+from core.events import EventBus
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Locations of embedded art recorded in TrackMetadata.embedded_art, besides
+# ID3 APIC frame keys ("APIC:", "APIC:Cover", ...)
+FLAC_PICTURES = "pictures"  # FLAC picture metadata blocks
+VORBIS_PICTURE = "METADATA_BLOCK_PICTURE"  # base64 FLAC picture block
+VORBIS_COVERART = "COVERART"  # base64 image (old Ogg taggers)
+MP4_COVER = "covr"
+APE_COVER = "Cover Art (Front)"  # file name, NUL, image
+GSTREAMER_IMAGE = "gstreamer"  # GStreamer "image" tag (video containers)
+
+# Upcoming playlist tracks whose art is extracted ahead of time
+PREFETCH_COUNT = 3
+
+# Cover images shipped next to the audio files, best first
+FOLDER_COVER_NAMES = ("cover", "folder", "front", "album")
+FOLDER_COVER_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def is_folder_cover(name: str) -> bool:
+    """Whether a file name is one of the folder cover names (any case)."""
+    stem, ext = os.path.splitext(name.lower())
+    return stem in FOLDER_COVER_NAMES and ext in FOLDER_COVER_EXTENSIONS
+
+
+def pick_folder_cover(names: Iterable[str]) -> Optional[str]:
+    """
+    Choose the folder cover among the cover file names of a directory.
+
+    Names rank by FOLDER_COVER_NAMES, then FOLDER_COVER_EXTENSIONS, so the
+    choice does not depend on listing order.
+
+    Returns:
+        The chosen name, or None if none is a folder cover
+    """
+    best = None
+    best_rank = None
+    for name in names:
+        if not is_folder_cover(name):
+            continue
+        stem, ext = os.path.splitext(name.lower())
+        rank = (
+            FOLDER_COVER_NAMES.index(stem),
+            FOLDER_COVER_EXTENSIONS.index(ext),
+            name,
+        )
+        if best_rank is None or rank < best_rank:
+            best, best_rank = name, rank
+    return best
+
+
+def album_art_cache_path(file_path: str) -> Path:
+    """
+    Get the per-track art file of the cache layout before art was shared.
+
+    Index entries written then still point to these through album_art_path.
+    """
+    track_hash = hashlib.md5(file_path.encode()).hexdigest()
+    return get_config().album_art_cache_dir / f"{track_hash}.jpg"
+
+
+def find_embedded_art(audio_file: Any) -> Optional[str]:
+    """
+    Find where a parsed file embeds its cover, without decoding it.
+
+    Args:
+        audio_file: Mutagen File object
+
+    Returns:
+        The location to pass to read_embedded_art, or None if there is none
+    """
+    if getattr(audio_file, "pictures", None):
+        return FLAC_PICTURES
+    tags = getattr(audio_file, "tags", None)
+    if not tags:
+        return None
+    if isinstance(tags, ID3):
+        for key in tags.keys():
+            if key.startswith("APIC"):
+                return key
+    elif isinstance(tags, VCommentDict):
+        for key in (VORBIS_PICTURE, VORBIS_COVERART):
+            if key in tags:
+                return key
+    elif isinstance(tags, MP4Tags):
+        if tags.get(MP4_COVER):
+            return MP4_COVER
+    elif isinstance(tags, APEv2):
+        if APE_COVER in tags:
+            return APE_COVER
+    return None
+
+
+def read_embedded_art(audio_file: Any, location: str) -> Optional[bytes]:
+    """
+    Read the image bytes found by find_embedded_art.
+
+    Raises:
+        Whatever the tag data raises when it is malformed (KeyError,
+        IndexError, ValueError, ...)
+    """
+    if location == FLAC_PICTURES:
+        return audio_file.pictures[0].data or None
+    tags = audio_file.tags
+    if location == VORBIS_PICTURE:
+        return Picture(base64.b64decode(tags[location][0])).data or None
+    if location == VORBIS_COVERART:
+        return base64.b64decode(tags[location][0]) or None
+    if location == MP4_COVER:
+        return bytes(tags[location][0]) or None
+    if location == APE_COVER:
+        return tags[location].value.split(b"\0", 1)[1] or None
+    return tags[location].data or None  # ID3 APIC frame
+
+
+def read_album_art(file_path: str, location: str) -> Optional[bytes]:
+    """
+    Read the embedded cover of a track.
+
+    Returns:
+        The image bytes, or None if they cannot be read
+    """
+    try:
+        if location == GSTREAMER_IMAGE:
+            # core.metadata imports this module
+            from core.metadata import read_gstreamer_image
+
+            return read_gstreamer_image(file_path)
+        audio_file = File(file_path)
+        return read_embedded_art(audio_file, location) if audio_file else None
+    except Exception as e:
+        logger.debug("Cannot read album art of %s: %s", file_path, e)
+        return None
+
+
+class AlbumArt:
+    """
+    Album art of tracks, extracted from the audio files when first needed.
+
+    Scans only record where a file embeds its cover (TrackMetadata.
+    embedded_art); the image is decoded and stored in the ArtStore the
+    first time a view asks for it, on a background thread. Results
+    (including "no art") are remembered for the session. Tracks the scan
+    linked to a folder cover (album_art_path) never open their audio file.
+    """
+
+    def __init__(self, store: Optional[ArtStore] = None) -> None:
+        self._store = store or ArtStore.from_config(get_config())
+        self._lock = threading.Lock()
+        self._paths: Dict[str, Optional[str]] = {}
+        self._pending: Dict[str, Future] = {}
+        # Extractions started only by prefetch, and tracks someone requested
+        self._prefetching: List[Future] = []
+        self._requested: Set[str] = set()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="album-art"
+        )
+
+    def cached(self, track: Any) -> Optional[str]:
+        """
+        Art path of a track if it is available without extracting anything.
+
+        Returns None when the track has no art or it was not extracted yet
+        (see needs_extraction).
+        """
+        if track.album_art_path:
+            return track.album_art_path
+        with self._lock:
+            path = self._paths.get(track.file_path)
+        if path is None and track.embedded_art:
+            # Extracted in an earlier session
+            path = self._store.lookup(track.file_path)
+            if path is not None:
+                with self._lock:
+                    self._paths[track.file_path] = path
+        return path
+
+    def needs_extraction(self, track: Any) -> bool:
+        """Whether the track embeds art that was not extracted yet."""
+        with self._lock:
+            return self._needs_extraction(track)
+
+    def request(self, track: Any) -> "Future[Optional[str]]":
+        """
+        Extract the art of a track in the background.
+
+        Returns:
+            Future with the art path (None if the track has none). Its
+            callbacks run on the extraction thread.
+        """
+        with self._lock:
+            future = self._submit(track)
+            if not future.done():
+                # Wanted now: no prefetch may drop it
+                self._requested.add(track.file_path)
+                if future in self._prefetching:
+                    self._prefetching.remove(future)
+            return future
+
+    def get(self, track: Any) -> Optional[str]:
+        """Art path of a track, extracting the art now if needed (blocks)."""
+        path = self.cached(track)
+        if path is None and self.needs_extraction(track):
+            path = self.request(track).result()
+        return path
+
+    def prefetch(self, tracks: Iterable[Any]) -> None:
+        """
+        Extract the art of tracks likely to be shown soon.
+
+        Replaces the previous prefetch: its extractions that did not start
+        yet are dropped, so requests for what is shown now are not stuck
+        behind stale ones.
+        """
+        with self._lock:
+            for future in self._prefetching:
+                future.cancel()
+            self._pending = {
+                path: future
+                for path, future in self._pending.items()
+                if not future.cancelled()
+            }
+            self._prefetching = [
+                self._submit(track)
+                for track in tracks
+                if self._needs_extraction(track)
+                and track.file_path not in self._requested
+            ]
+
+    def collect_garbage(self, tracks: Iterable[Any]) -> Future:
+        """
+        Delete cached art not needed by ``tracks`` (every track still around:
+        library and playlist) and evict beyond the size limit, in the
+        background between extractions.
+
+        ``tracks`` is iterated on the extraction thread, so it must not
+        change afterwards (e.g. a library snapshot's tracks and a copy of
+        the playlist).
+
+        Returns:
+            Future with the bytes freed
+        """
+        return self._executor.submit(self._collect_garbage, tracks)
+
+    def close(self) -> None:
+        """Stop extracting and save the art references."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._store.save()
+
+    def _needs_extraction(self, track: Any) -> bool:
+        return (
+            not track.album_art_path
+            and bool(track.embedded_art)
+            and track.file_path not in self._paths
+        )
+
+    def _submit(self, track: Any) -> Future:
+        """Future for the art of a track (the caller holds the lock)."""
+        if not self._needs_extraction(track):
+            future: Future = Future()
+            future.set_result(track.album_art_path or self._paths.get(track.file_path))
+            return future
+        future = self._pending.get(track.file_path)
+        if future is None or future.cancelled():
+            future = self._executor.submit(
+                self._extract, track.file_path, track.embedded_art
+            )
+            self._pending[track.file_path] = future
+        return future
+
+    def _extract(self, file_path: str, location: str) -> Optional[str]:
+        path = self._store.lookup(file_path)
+        if path is None:
+            art_data = read_album_art(file_path, location)
+            if art_data:
+                path = self._store.put(file_path, art_data)
+        with self._lock:
+            self._paths[file_path] = path
+            self._pending.pop(file_path, None)
+            self._requested.discard(file_path)
+        return path
+
+    def _collect_garbage(self, tracks: Iterable[Any]) -> int:
+        removed, freed = self._store.collect_garbage(tracks)
+        with self._lock:
+            self._paths = {
+                file_path: path
+                for file_path, path in self._paths.items()
+                if path not in removed
+            }
+        return freed
+
+
+class AlbumArtPrefetcher:
+    """Extracts the art of the next playlist tracks while the current one plays."""
+
+    def __init__(
+        self,
+        album_art: AlbumArt,
+        playlist_manager,
+        event_bus: EventBus,
+        count: int = PREFETCH_COUNT,
+    ) -> None:
+        self._album_art = album_art
+        self._playlist_manager = playlist_manager
+        self._event_bus = event_bus
+        self._count = count
+        event_bus.subscribe(EventBus.CURRENT_INDEX_CHANGED, self._on_playlist_changed)
+        event_bus.subscribe(EventBus.PLAYLIST_CHANGED, self._on_playlist_changed)
+
+    def _on_playlist_changed(self, data: Optional[dict]) -> None:
+        self._album_art.prefetch(
+            self._playlist_manager.get_upcoming_tracks(self._count)
+        )
+
+    def cleanup(self) -> None:
+        """Unsubscribe from events."""
+        self._event_bus.unsubscribe(
+            EventBus.CURRENT_INDEX_CHANGED, self._on_playlist_changed
+        )
+        self._event_bus.unsubscribe(
+            EventBus.PLAYLIST_CHANGED, self._on_playlist_changed
+        )
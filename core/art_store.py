@@ -0,0 +1,227 @@
+"""Content-addressed album art cache shared by all tracks."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Reference index kept next to the images
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+
+# Unreferenced images younger than this are kept: a scan may have just
+# written them for tracks the collector was not told about yet
+GC_GRACE_SECONDS = 300
+
+
+def _image_suffix(data: bytes) -> str:
+    if data.startswith(b"\x89PNG"):
+        return ".png"
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        return ".gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return ".webp"
+    return ".jpg"
+
+
+def store_image(art_dir: Path, data: bytes) -> Path:
+    """
+    Write an image under the hash of its bytes (once; later calls reuse it).
+
+    Safe to call from several threads and processes at once: the file is
+    written under a temporary name unique to the process and thread, and
+    renamed into place.
+
+    Returns:
+        Path of the image
+    """
+    path = art_dir / (hashlib.sha1(data).hexdigest() + _image_suffix(data))
+    if not path.exists():
+        # Thread idents repeat across processes: the pid keeps names apart
+        temp_file = path.with_name(
+            f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        temp_file.write_bytes(data)
+        temp_file.replace(path)
+    return path
+
+
+class ArtStore:
+    """
+    Album art images named by the hash of their bytes.
+
+    All tracks of an album that embed the same cover share one file. The
+    reference index maps track paths to image names (and remembers when
+    each image was last used); collect_garbage() deletes images no live
+    track refers to and evicts the least recently used ones beyond
+    ``max_bytes``. Evicted art is extracted again when next shown.
+    """
+
+    def __init__(self, art_dir: Path, max_bytes: int) -> None:
+        self.art_dir = art_dir
+        self.max_bytes = max_bytes
+        self._index_file = art_dir / INDEX_NAME
+        self._lock = threading.Lock()
+        self._refs: Dict[str, str] = {}
+        self._used: Dict[str, float] = {}
+        self._dirty = False
+        self._load()
+
+    @classmethod
+    def from_config(cls, config) -> "ArtStore":
+        return cls(config.album_art_cache_dir, config.library_art_cache_mb * 2**20)
+
+    def lookup(self, file_path: str) -> Optional[str]:
+        """Cached art of a track, or None if it was never stored or is gone."""
+        with self._lock:
+            name = self._refs.get(file_path)
+            if name is None:
+                return None
+            path = self.art_dir / name
+            if not path.exists():
+                del self._refs[file_path]
+                self._dirty = True
+                return None
+            self._used[name] = time.time()
+            self._dirty = True
+            return str(path)
+
+    def put(self, file_path: str, data: bytes) -> Optional[str]:
+        """Store the art of a track (shared with tracks having the same image)."""
+        try:
+            path = store_image(self.art_dir, data)
+        except OSError as e:
+            logger.error("Error saving album art: %s", e, exc_info=True)
+            return None
+        with self._lock:
+            self._refs[file_path] = path.name
+            self._used[path.name] = time.time()
+            self._dirty = True
+        return str(path)
+
+    def rekey(self, old_path: str, new_path: str) -> None:
+        """Move the reference of a track that was moved/renamed to ``new_path``."""
+        with self._lock:
+            name = self._refs.pop(old_path, None)
+            if name is None:
+                return
+            self._refs[new_path] = name
+            self._dirty = True
+
+    def collect_garbage(self, tracks: Iterable[Any]) -> Tuple[Set[str], int]:
+        """
+        Drop art no longer needed by ``tracks`` (all tracks still around).
+
+        References of other tracks are forgotten, images nothing refers to
+        are deleted (including the per-track files of the old layout), then
+        the least recently used images are evicted until the store fits in
+        max_bytes. Images tracks point to through album_art_path are kept.
+
+        Returns:
+            Paths of the deleted images and the bytes freed
+        """
+        live: Set[str] = set()
+        pinned: Set[str] = set()
+        for track in tracks:
+            live.add(track.file_path)
+            if track.album_art_path:
+                pinned.add(Path(track.album_art_path).name)
+
+        sizes: Dict[str, int] = {}
+        recent: Set[str] = set()
+        grace_start = time.time() - GC_GRACE_SECONDS
+        for path in self.art_dir.iterdir():
+            if path.name == INDEX_NAME or path.suffix == ".tmp":
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            sizes[path.name] = st.st_size
+            if st.st_mtime > grace_start:
+                recent.add(path.name)
+
+        with self._lock:
+            self._refs = {
+                file_path: name
+                for file_path, name in self._refs.items()
+                if file_path in live and name in sizes
+            }
+            referenced = set(self._refs.values())
+            keep = referenced | pinned | recent
+            garbage = [name for name in sizes if name not in keep]
+            total = sum(sizes.values()) - sum(sizes[name] for name in garbage)
+            # Least recently used first
+            evictable = sorted(
+                referenced - pinned, key=lambda name: self._used.get(name, 0.0)
+            )
+            for name in evictable:
+                if total <= self.max_bytes:
+                    break
+                garbage.append(name)
+                total -= sizes[name]
+            evicted = set(garbage)
+            self._refs = {
+                file_path: name
+                for file_path, name in self._refs.items()
+                if name not in evicted
+            }
+            self._used = {
+                name: used
+                for name, used in self._used.items()
+                if name in sizes and name not in evicted
+            }
+            self._dirty = True
+
+        removed: Set[str] = set()
+        freed = 0
+        for name in garbage:
+            try:
+                (self.art_dir / name).unlink()
+            except OSError as e:
+                logger.debug("Cannot delete album art %s: %s", name, e)
+                continue
+            removed.add(str(self.art_dir / name))
+            freed += sizes[name]
+        if removed:
+            logger.info(
+                "Album art cache: deleted %d images (%.1f MiB)",
+                len(removed),
+                freed / 2**20,
+            )
+        self.save()
+        return removed, freed
+
+    def save(self) -> None:
+        """Write the reference index if it changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": INDEX_VERSION, "tracks": self._refs, "used": self._used}
+            self._dirty = False
+            try:
+                temp_file = self._index_file.with_suffix(".tmp")
+                temp_file.write_text(json.dumps(data))
+                temp_file.replace(self._index_file)
+            except OSError as e:
+                logger.warning("Cannot save album art index: %s", e)
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self._index_file.read_text())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Cannot read album art index, starting empty: %s", e)
+            return
+        if data.get("version") != INDEX_VERSION:
+            return
+        self._refs = dict(data.get("tracks", {}))
+        self._used = dict(data.get("used", {}))
@@ -14,6 +14,16 @@ from core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Metadata extraction is mostly I/O bound, so a few workers beyond the core
+# count keep the disk busy without oversubscribing small machines.
+DEFAULT_SCAN_WORKERS = min(8, (os.cpu_count() or 1) + 2)
+
+# Folders scans skip unless configured otherwise: hidden folders (.git,
+# .Trash-1000, ...), NAS metadata and recycle bins, filesystem recovery
+DEFAULT_EXCLUDE_DIRS = (
+    ".*:@eaDir:#recycle:$RECYCLE.BIN:System Volume Information:lost+found"
+)
+
 
 class Config:
     """
@@ -87,6 +97,26 @@ class Config:
             "music_dirs": str(Path.home() / "Music") + ":" + str(Path.home() / "Musik"),
             "scan_on_startup": "true",
             "index_file": str(self.cache_dir / "library_index.json"),
+            "index_backend": "json",  # json, sqlite
+            "index_db": str(self.cache_dir / "library_index.db"),
+            "index_shards": "true",  # one index per music directory
+            "trust_cache": "true",
+            "watch": "true",
+            "watch_poll_interval": "60",
+            "fingerprint_hash": "false",
+            "scan_workers": str(DEFAULT_SCAN_WORKERS),
+            "scan_executor": "process",  # process, thread
+            "scan_max_files_per_sec": "0",  # 0 = unlimited
+            "scan_max_bytes_per_sec": "0",  # 0 = unlimited
+            "scan_playback_files_per_sec": "20",  # 0 = no back-off
+            "scan_idle_only": "false",
+            "stat_workers": "1",  # >1 overlaps stat() calls (network shares)
+            "simulate_latency_ms": "0",  # testing: delay every file operation
+            "exclude_dirs": DEFAULT_EXCLUDE_DIRS,  # folder name globs
+            "exclude": "",  # globs relative to the music directory
+            "include": "",  # file name globs; empty = all audio files
+            "follow_symlinks": "false",
+            "art_cache_mb": "200",
         }
 
         # MOC settings
@@ -228,6 +258,114 @@ class Config:
             "library", "index_file", self.cache_dir / "library_index.json"
         )
 
+    @property
+    def library_index_backend(self) -> str:
+        """Get library index storage backend ('json' or 'sqlite')."""
+        value = (self.get("library", "index_backend", "json") or "json").lower()
+        return value if value in ("json", "sqlite") else "json"
+
+    @property
+    def library_index_db(self) -> Path:
+        """Get SQLite library index path (used when index_backend = sqlite)."""
+        return self.get_path("library", "index_db", self.cache_dir / "library_index.db")
+
+    @property
+    def library_index_shards(self) -> bool:
+        """Keep one index per music directory (see ShardedLibraryIndex)."""
+        return self.get_bool("library", "index_shards", True)
+
+    @property
+    def library_shard_dir(self) -> Path:
+        """Get the directory holding the per-music-directory index shards."""
+        return self.cache_dir / "library_shards"
+
+    @property
+    def library_trust_cache(self) -> bool:
+        """Publish the cached library at startup and validate it in the background."""
+        return self.get_bool("library", "trust_cache", True)
+
+    @property
+    def library_watch(self) -> bool:
+        """Apply filesystem changes under the music directories live."""
+        return self.get_bool("library", "watch", True)
+
+    @property
+    def library_watch_poll_interval(self) -> float:
+        """Get polling interval (seconds) used when inotify is unavailable."""
+        return max(5.0, self.get_float("library", "watch_poll_interval", 60.0))
+
+    @property
+    def library_fingerprint_hash(self) -> bool:
+        """Also hash file head/tail to confirm moved files (costs two small reads)."""
+        return self.get_bool("library", "fingerprint_hash", False)
+
+    @property
+    def library_scan_workers(self) -> int:
+        """Get number of parallel metadata extraction workers per device for scans."""
+        return max(1, self.get_int("library", "scan_workers", DEFAULT_SCAN_WORKERS))
+
+    @property
+    def library_scan_executor(self) -> str:
+        """Get scan worker type ('process': scanner worker processes, or 'thread')."""
+        value = (self.get("library", "scan_executor", "process") or "process").lower()
+        return value if value in ("thread", "process") else "process"
+
+    @property
+    def library_scan_max_files_per_sec(self) -> float:
+        """Get the files/sec budget for tag reads during scans (0 = unlimited)."""
+        return max(0.0, self.get_float("library", "scan_max_files_per_sec", 0.0))
+
+    @property
+    def library_scan_max_bytes_per_sec(self) -> float:
+        """Get the bytes/sec budget for tag reads during scans (0 = unlimited)."""
+        return max(0.0, self.get_float("library", "scan_max_bytes_per_sec", 0.0))
+
+    @property
+    def library_scan_playback_files_per_sec(self) -> float:
+        """Get the files/sec budget while playing from the scanned device (0 = off)."""
+        return max(0.0, self.get_float("library", "scan_playback_files_per_sec", 20.0))
+
+    @property
+    def library_scan_idle_only(self) -> bool:
+        """Only read tags while playback is stopped or paused."""
+        return self.get_bool("library", "scan_idle_only", False)
+
+    @property
+    def library_stat_workers(self) -> int:
+        """Get number of threads overlapping stat() calls (1 = sequential)."""
+        return max(1, self.get_int("library", "stat_workers", 1))
+
+    @property
+    def library_simulate_latency_ms(self) -> float:
+        """Get simulated latency (ms) per filesystem operation (testing aid)."""
+        return max(0.0, self.get_float("library", "simulate_latency_ms", 0.0))
+
+    @property
+    def library_exclude_dirs(self) -> list[str]:
+        """Get folder name globs skipped by scans (colon separated)."""
+        value = self.get("library", "exclude_dirs", DEFAULT_EXCLUDE_DIRS) or ""
+        return [item.strip() for item in value.split(":") if item.strip()]
+
+    @property
+    def library_exclude(self) -> list[str]:
+        """Get path globs (relative to the music directory) skipped by scans."""
+        return self.get_list("library", "exclude")
+
+    @property
+    def library_include(self) -> list[str]:
+        """Get file name globs to index (empty = all audio files)."""
+        return self.get_list("library", "include")
+
+    @property
+    def library_follow_symlinks(self) -> bool:
+        """Descend into symlinked folders during scans (loops are detected)."""
+        return self.get_bool("library", "follow_symlinks", False)
+
+    @property
+    def library_art_cache_mb(self) -> int:
+        """Get the size (MiB) the album art cache is trimmed to after scans."""
+        return max(0, self.get_int("library", "art_cache_mb", 200))
+
     @property
     def album_art_cache_dir(self) -> Path:
         """Get album art cache directory."""
@@ -235,6 +373,14 @@ class Config:
         art_dir.mkdir(parents=True, exist_ok=True)
         return art_dir
 
+    @property
+    def library_music_roots(self) -> list[Path]:
+        """Get all configured music directories, present or not."""
+        dirs = self.get_list("library", "music_dirs")
+        if not dirs:
+            return [Path.home() / "Music", Path.home() / "Musik"]
+        return [Path(d) for d in dirs]
+
     @property
     def music_directories(self) -> list[Path]:
         """Get list of music directories to scan."""
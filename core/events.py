@@ -50,6 +50,33 @@ class EventBus:
     BT_SINK_DISABLED = "bluetooth.sink_disabled"
     BT_SINK_DEVICE_CONNECTED = "bluetooth.sink_device_connected"
 
+    # Library state (published by MusicLibrary, from background threads —
+    # UI subscribers must defer widget work with GLib.idle_add)
+    #   LIBRARY_TRACKS_REMOVED — tracks found missing or deleted on disk
+    #                        Data: {"tracks": List[TrackMetadata], "music_root",
+    #                        "folders": {rel_folder: List[TrackMetadata]}}
+    #   LIBRARY_TRACKS_UPDATED — tracks (re-)read after a change on disk (new or
+    #                        modified files, validation, watcher)
+    #                        Data: as LIBRARY_TRACKS_REMOVED (new metadata)
+    #   LIBRARY_SCAN_PROGRESS — periodic scan progress (first with zero counts
+    #                        when a scan starts, last with done=True, also
+    #                        when the scan is paused or cancelled)
+    #                        Data: {"files": int, "extracted": int,
+    #                               "tracks_added": int, "done": bool,
+    #                               "paused": bool, "cancelled": bool,
+    #                               "throttle": dict}
+    #                        (throttle as in ScanThrottle.snapshot; its "mode"
+    #                        is unlimited, limited, backoff or waiting_for_idle)
+    #   LIBRARY_TRACKS_ADDED — batch of tracks found by a running scan that
+    #                        the UI has not seen yet
+    #                        Data: {"music_root": Path, "tracks": List[TrackMetadata],
+    #                               "folders": {folder: List[TrackMetadata]}}
+    #                        (folder keys as in MusicLibrary.get_folder_structure)
+    LIBRARY_SCAN_PROGRESS = "library.scan_progress"
+    LIBRARY_TRACKS_ADDED = "library.tracks_added"
+    LIBRARY_TRACKS_REMOVED = "library.tracks_removed"
+    LIBRARY_TRACKS_UPDATED = "library.tracks_updated"
+
     # =========================================================================
     # UI -> Core: Action Requests
     # Published by PlaylistView, PlayerControls, LibraryBrowser
@@ -0,0 +1,203 @@
+"""Filesystem access for the library and MOC integration (local or simulated)."""
+
+import os
+import stat as stat_module
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+PathLike = Union[str, Path]
+
+# Most stat() results waiting to be picked up after prefetch() per thread;
+# more paths are not prefetched (their stats would likely go stale before use)
+PREFETCH_LIMIT = 10000
+
+
+class FileSystem:
+    """
+    Local filesystem with batched stat() and prefetching.
+
+    On network shares (NFS/SMB) every stat() is a round trip. stat_many()
+    overlaps them on up to ``stat_workers`` threads, and prefetch() starts
+    them in the background so that later stat() calls for the same paths
+    are answered from memory (each prefetched result is used once). Prefetched
+    results belong to the thread that asked for them, so walks running in
+    parallel (one per device) neither use nor discard each other's. With a
+    single worker both run sequentially and prefetch() does nothing, which
+    is fastest on local disks.
+
+    Subclasses change how single operations are done by overriding _stat,
+    _lstat, _scandir and _resolve.
+    """
+
+    def __init__(self, stat_workers: int = 1) -> None:
+        self.stat_workers = max(1, stat_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Thread ident -> path -> pending stat() (see prefetch)
+        self._prefetched: Dict[int, Dict[str, Future]] = {}
+
+    # Single operations
+
+    def _stat(self, path: str) -> os.stat_result:
+        return os.stat(path)
+
+    def _lstat(self, path: str) -> os.stat_result:
+        return os.lstat(path)
+
+    def _scandir(self, path: str) -> List[os.DirEntry]:
+        with os.scandir(path) as entries:
+            return list(entries)
+
+    def _resolve(self, path: Path) -> Path:
+        return path.resolve()
+
+    # Public API
+
+    def stat(self, path: PathLike) -> os.stat_result:
+        """stat() a path, using a prefetched result if there is one."""
+        path = str(path)
+        if self._prefetched:
+            with self._lock:
+                prefetched = self._prefetched.get(threading.get_ident())
+                future = prefetched.pop(path, None) if prefetched else None
+            if future is not None:
+                return future.result()
+        return self._stat(path)
+
+    def stat_many(
+        self, paths: Iterable[PathLike]
+    ) -> Dict[str, Optional[os.stat_result]]:
+        """stat() many paths at once; None for paths that cannot be stat()ed."""
+        paths = [str(path) for path in paths]
+        if self.stat_workers <= 1 or len(paths) <= 1:
+            return {path: self._stat_or_none(path) for path in paths}
+        return dict(zip(paths, self._get_executor().map(self._stat_or_none, paths)))
+
+    def prefetch(self, paths: Iterable[PathLike]) -> None:
+        """Start stat()ing paths in the background for this thread's stat() calls."""
+        if self.stat_workers <= 1:
+            return
+        executor = self._get_executor()
+        with self._lock:
+            prefetched = self._prefetched.setdefault(threading.get_ident(), {})
+            for path in paths:
+                if len(prefetched) >= PREFETCH_LIMIT:
+                    break
+                path = str(path)
+                if path not in prefetched:
+                    prefetched[path] = executor.submit(self._stat, path)
+
+    def discard_prefetched(self) -> None:
+        """Drop this thread's prefetched results that were not used."""
+        with self._lock:
+            self._prefetched.pop(threading.get_ident(), None)
+
+    def exists(self, path: PathLike) -> bool:
+        try:
+            self.stat(path)
+        except OSError:
+            return False
+        return True
+
+    def lexists(self, path: PathLike) -> bool:
+        """Like exists(), but true for broken symlinks too."""
+        try:
+            self._lstat(str(path))
+        except OSError:
+            return False
+        return True
+
+    def is_file(self, path: PathLike) -> bool:
+        try:
+            return stat_module.S_ISREG(self.stat(path).st_mode)
+        except OSError:
+            return False
+
+    def is_dir(self, path: PathLike) -> bool:
+        try:
+            return stat_module.S_ISDIR(self.stat(path).st_mode)
+        except OSError:
+            return False
+
+    def scandir(self, path: PathLike) -> List[os.DirEntry]:
+        """List a directory (raises OSError like os.scandir)."""
+        return self._scandir(str(path))
+
+    def resolve(self, path: PathLike) -> Path:
+        """Resolve symlinks and make a path absolute (like Path.resolve)."""
+        return self._resolve(Path(path))
+
+    def close(self) -> None:
+        """Stop the stat workers."""
+        with self._lock:
+            self._prefetched.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _stat_or_none(self, path: str) -> Optional[os.stat_result]:
+        try:
+            return self.stat(path)
+        except OSError:
+            return None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.stat_workers, thread_name_prefix="fs-stat"
+                )
+            return self._executor
+
+
+class LatencyFileSystem(FileSystem):
+    """
+    Local filesystem that waits ``latency`` seconds before every operation.
+
+    Simulates a network share on a local disk, so scans, index loads and
+    playlist handling can be benchmarked and tuned for high-latency storage.
+    ``calls`` counts the operations done.
+    """
+
+    def __init__(self, latency: float, stat_workers: int = 1) -> None:
+        super().__init__(stat_workers)
+        self.latency = latency
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+
+    def _round_trip(self) -> None:
+        with self._calls_lock:
+            self.calls += 1
+        time.sleep(self.latency)
+
+    def _stat(self, path: str) -> os.stat_result:
+        self._round_trip()
+        return super()._stat(path)
+
+    def _lstat(self, path: str) -> os.stat_result:
+        self._round_trip()
+        return super()._lstat(path)
+
+    def _scandir(self, path: str) -> List[os.DirEntry]:
+        self._round_trip()
+        return super()._scandir(path)
+
+    def _resolve(self, path: Path) -> Path:
+        self._round_trip()
+        return super()._resolve(path)
+
+
+def create_filesystem(config) -> FileSystem:
+    """Create the filesystem selected by the [library] settings."""
+    latency_ms = config.library_simulate_latency_ms
+    if latency_ms > 0:
+        logger.info("Simulating %.1f ms filesystem latency", latency_ms)
+        return LatencyFileSystem(latency_ms / 1000.0, config.library_stat_workers)
+    return FileSystem(config.library_stat_workers)
@@ -0,0 +1,544 @@
+"""Persistent storage for the music library index (JSON file or SQLite)."""
+
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# file_path -> {mtime, metadata, fingerprint}
+# dir_path -> {mtime_ns, files, dirs, links, covers}
+FileCache = Dict[str, Dict]
+DirCache = Dict[str, Dict]
+
+
+class LibraryIndex:
+    """Base class for library index backends (file cache and directory cache)."""
+
+    def load(self) -> Optional[Tuple[FileCache, DirCache]]:
+        """Load the index. Returns None if there is no index yet."""
+        raise NotImplementedError
+
+    def save(
+        self,
+        file_cache: FileCache,
+        dir_cache: DirCache,
+        changed: Iterable[str],
+        removed: Iterable[str],
+    ) -> None:
+        """Persist the index (changed/removed name the dirty file paths)."""
+        raise NotImplementedError
+
+    def stamp(self) -> Optional[str]:
+        """Token that changes on every save of the index (None if there is none)."""
+        return None
+
+    def dormant_roots(self) -> List[Path]:
+        """Music directories whose entries were kept but not loaded (unplugged)."""
+        return []
+
+    def load_root(self, root: Path) -> Optional[Tuple[FileCache, DirCache, bool]]:
+        """
+        Load the entries of a dormant music directory that came back.
+
+        Returns:
+            (file_cache, dir_cache, valid), where ``valid`` means the directory
+            looks unchanged since the entries were saved, or None if nothing is
+            kept for it or it is still missing
+        """
+        return None
+
+
+class JsonLibraryIndex(LibraryIndex):
+    """Single JSON document holding the whole index; rewritten on every save."""
+
+    def __init__(self, index_file: Path, version: int) -> None:
+        self.index_file = index_file
+        self.version = version
+
+    def load(self) -> Optional[Tuple[FileCache, DirCache]]:
+        if not self.index_file.exists():
+            return None
+
+        with open(self.index_file, "r", encoding="utf-8") as f:
+            index_data = json.load(f)
+
+        return index_data.get("file_cache", {}), index_data.get("dir_cache", {})
+
+    def save(
+        self,
+        file_cache: FileCache,
+        dir_cache: DirCache,
+        changed: Iterable[str] = (),
+        removed: Iterable[str] = (),
+    ) -> None:
+        # Prepare data for serialization
+        index_data = {"version": self.version, "file_cache": {}}
+
+        for file_path, cache_entry in file_cache.items():
+            entry = dict(cache_entry)
+            entry.setdefault("mtime", 0)
+            entry.setdefault("metadata", {})
+            index_data["file_cache"][file_path] = entry
+        index_data["dir_cache"] = dir_cache
+
+        # Write to file atomically
+        temp_file = self.index_file.with_suffix(".tmp")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(index_data, f, indent=2, ensure_ascii=False)
+
+        # Atomic rename
+        temp_file.replace(self.index_file)
+
+    def stamp(self) -> Optional[str]:
+        try:
+            st = self.index_file.stat()
+        except OSError:
+            return None
+        return f"json:{st.st_mtime_ns}:{st.st_size}"
+
+
+class SqliteLibraryIndex(LibraryIndex):
+    """SQLite index with one row per file, written incrementally (WAL mode)."""
+
+    def __init__(
+        self,
+        db_file: Path,
+        version: int,
+        legacy_json_file: Optional[Path] = None,
+    ) -> None:
+        """
+        Args:
+            db_file: SQLite database path
+            version: Index format version stored in the meta table
+            legacy_json_file: JSON index to migrate from on first run
+        """
+        self.db_file = db_file
+        self.version = version
+        self.legacy_json_file = legacy_json_file
+        # Directory rows as last loaded/saved, to write only the differences
+        self._saved_dirs: DirCache = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_file))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS tracks (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL DEFAULT 0,
+                entry TEXT NOT NULL
+            );
+            DROP INDEX IF EXISTS idx_tracks_artist;
+            DROP INDEX IF EXISTS idx_tracks_album;
+            CREATE TABLE IF NOT EXISTS directories (
+                path TEXT PRIMARY KEY,
+                entry TEXT NOT NULL
+            );
+            """)
+        return conn
+
+    def _is_initialized(self, conn: sqlite3.Connection) -> bool:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return row is not None
+
+    def load(self) -> Optional[Tuple[FileCache, DirCache]]:
+        with closing(self._connect()) as conn:
+            if not self._is_initialized(conn):
+                return self._migrate_legacy_json(conn)
+
+            file_cache = {
+                path: json.loads(entry)
+                for path, entry in conn.execute("SELECT path, entry FROM tracks")
+            }
+            dir_cache = {
+                path: json.loads(entry)
+                for path, entry in conn.execute("SELECT path, entry FROM directories")
+            }
+        self._saved_dirs = dict(dir_cache)
+        return file_cache, dir_cache
+
+    def _migrate_legacy_json(
+        self, conn: sqlite3.Connection
+    ) -> Optional[Tuple[FileCache, DirCache]]:
+        """Import an existing JSON index into an empty database (first run)."""
+        if self.legacy_json_file is None or not self.legacy_json_file.exists():
+            return None
+
+        loaded = JsonLibraryIndex(self.legacy_json_file, self.version).load()
+        if loaded is None:
+            return None
+        file_cache, dir_cache = loaded
+        self._write(conn, file_cache, dir_cache, file_cache.keys(), ())
+        logger.info(
+            "Migrated %d entries from %s to SQLite index %s",
+            len(file_cache),
+            self.legacy_json_file,
+            self.db_file,
+        )
+        return file_cache, dir_cache
+
+    def save(
+        self,
+        file_cache: FileCache,
+        dir_cache: DirCache,
+        changed: Iterable[str],
+        removed: Iterable[str],
+    ) -> None:
+        with closing(self._connect()) as conn:
+            if not self._is_initialized(conn):
+                # First save: write everything, not just the dirty rows
+                changed = file_cache.keys()
+            self._write(conn, file_cache, dir_cache, changed, removed)
+
+    def _write(
+        self,
+        conn: sqlite3.Connection,
+        file_cache: FileCache,
+        dir_cache: DirCache,
+        changed: Iterable[str],
+        removed: Iterable[str],
+    ) -> None:
+        upserts = []
+        for path in changed:
+            entry = file_cache.get(path)
+            if entry is None:
+                continue
+            upserts.append(
+                (path, entry.get("mtime", 0), json.dumps(entry, ensure_ascii=False))
+            )
+        deletions = [(path,) for path in removed if path not in file_cache]
+
+        dir_upserts = [
+            (path, json.dumps(entry, ensure_ascii=False))
+            for path, entry in dir_cache.items()
+            if self._saved_dirs.get(path) != entry
+        ]
+        dir_deletions = [(path,) for path in self._saved_dirs if path not in dir_cache]
+
+        with conn:
+            conn.executemany(
+                "INSERT INTO tracks (path, mtime, entry) VALUES (?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET mtime = excluded.mtime, "
+                "entry = excluded.entry",
+                upserts,
+            )
+            conn.executemany("DELETE FROM tracks WHERE path = ?", deletions)
+            conn.executemany(
+                "INSERT OR REPLACE INTO directories (path, entry) VALUES (?, ?)",
+                dir_upserts,
+            )
+            conn.executemany("DELETE FROM directories WHERE path = ?", dir_deletions)
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)",
+                (str(self.version),),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('generation', ?)",
+                (str(time.time_ns()),),
+            )
+        self._saved_dirs = dict(dir_cache)
+        logger.debug(
+            "SQLite index: %d upserted, %d deleted, %d directories updated",
+            len(upserts),
+            len(deletions),
+            len(dir_upserts) + len(dir_deletions),
+        )
+
+    def stamp(self) -> Optional[str]:
+        if not self.db_file.exists():
+            return None
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT value FROM meta WHERE key = 'generation'"
+            ).fetchone()
+        return f"sqlite:{row[0]}" if row else None
+
+
+class ShardedLibraryIndex(LibraryIndex):
+    """
+    One index per music directory ("shard"), each in its own file.
+
+    Shards of missing directories stay dormant until load_root brings them back.
+    """
+
+    MANIFEST_NAME = "manifest"
+
+    def __init__(
+        self,
+        shard_dir: Path,
+        roots: List[Path],
+        version: int,
+        make_shard: Callable[[Path], LibraryIndex],
+        suffix: str,
+        legacy: Optional[LibraryIndex] = None,
+    ) -> None:
+        """
+        Args:
+            shard_dir: Directory holding the shards and the manifest
+            roots: Configured music directories (present or not), in order
+            version: Index format version of the shards
+            make_shard: Creates the backend of one shard from its path
+            suffix: Shard file suffix (".json", ".db")
+            legacy: Unsharded index to split into shards on first run
+        """
+        self.shard_dir = shard_dir
+        self.roots = [str(root) for root in roots]
+        self.version = version
+        self._make_shard = make_shard
+        self._suffix = suffix
+        self._legacy = legacy
+        self._shards: Dict[str, LibraryIndex] = {}
+        self._manifest: Dict[str, Dict] = {}
+        # Roots whose shard is in memory (loaded or saved this session)
+        self._loaded: Set[str] = set()
+        # Directory entries per root as last loaded/saved
+        self._saved_dirs: Dict[str, DirCache] = {}
+
+    def _shard(self, root: str) -> LibraryIndex:
+        shard = self._shards.get(root)
+        if shard is None:
+            name = hashlib.sha1(root.encode("utf-8")).hexdigest()[:16]
+            shard = self._make_shard(self.shard_dir / (name + self._suffix))
+            self._shards[root] = shard
+        return shard
+
+    def _root_of(self, path: str) -> Optional[str]:
+        """First configured root containing ``path``."""
+        for root in self.roots:
+            if path == root or path.startswith(root.rstrip(os.sep) + os.sep):
+                return root
+        return None
+
+    @staticmethod
+    def _fingerprint(root: str) -> Optional[Dict[str, int]]:
+        try:
+            st = os.stat(root)
+        except OSError:
+            return None
+        return {"ino": st.st_ino, "mtime_ns": st.st_mtime_ns}
+
+    def is_available(self, root: Path) -> bool:
+        """Whether a music directory is present, not just an empty mount point."""
+        root_str = str(root)
+        if not os.path.isdir(root_str):
+            return False
+        if not self._manifest.get(root_str, {}).get("entries"):
+            return True
+        try:
+            with os.scandir(root_str) as entries:
+                return next(entries, None) is not None
+        except OSError:
+            return False
+
+    def _read_manifest(self) -> Optional[Dict[str, Dict]]:
+        try:
+            with open(self.shard_dir / self.MANIFEST_NAME, "r", encoding="utf-8") as f:
+                return json.load(f).get("shards", {})
+        except FileNotFoundError:
+            return None
+
+    def _write_manifest(self) -> None:
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        manifest_file = self.shard_dir / self.MANIFEST_NAME
+        temp_file = manifest_file.with_suffix(".tmp")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump({"shards": self._manifest}, f, indent=2, ensure_ascii=False)
+        temp_file.replace(manifest_file)
+
+    def _load_shard(self, root: str) -> Optional[Tuple[FileCache, DirCache]]:
+        entry = self._manifest.get(root)
+        if entry is None or entry.get("version") != self.version:
+            return None
+        loaded = self._shard(root).load()
+        if loaded is not None:
+            self._loaded.add(root)
+            self._saved_dirs[root] = dict(loaded[1])
+        return loaded
+
+    def load(self) -> Optional[Tuple[FileCache, DirCache]]:
+        manifest = self._read_manifest()
+        if manifest is None:
+            return self._migrate_legacy()
+        self._manifest = manifest
+
+        file_cache: FileCache = {}
+        dir_cache: DirCache = {}
+        for root in self.roots:
+            if not self.is_available(Path(root)):
+                continue
+            loaded = self._load_shard(root)
+            if loaded is not None:
+                file_cache.update(loaded[0])
+                dir_cache.update(loaded[1])
+        return file_cache, dir_cache
+
+    def _migrate_legacy(self) -> Optional[Tuple[FileCache, DirCache]]:
+        """Split an existing unsharded index into shards (first run)."""
+        loaded = self._legacy.load() if self._legacy is not None else None
+        if loaded is None:
+            return None
+        file_cache, dir_cache = loaded
+        roots = {self._root_of(path) for path in file_cache} - {None}
+        self._save_roots(sorted(roots), file_cache, dir_cache, file_cache.keys(), ())
+        logger.info(
+            "Split library index into %d shards in %s", len(roots), self.shard_dir
+        )
+        # Entries of directories that are missing now stay in their shards
+        available = {root for root in self.roots if self.is_available(Path(root))}
+        self._loaded &= available
+        return (
+            {p: e for p, e in file_cache.items() if self._root_of(p) in available},
+            {p: e for p, e in dir_cache.items() if self._root_of(p) in available},
+        )
+
+    def save(
+        self,
+        file_cache: FileCache,
+        dir_cache: DirCache,
+        changed: Iterable[str],
+        removed: Iterable[str],
+    ) -> None:
+        changed = list(changed)
+        removed = list(removed)
+        dirty = {self._root_of(path) for path in changed}
+        dirty.update(self._root_of(path) for path in removed)
+        dirs_by_root: Dict[str, DirCache] = {}
+        for path, entry in dir_cache.items():
+            root = self._root_of(path)
+            if root is not None:
+                dirs_by_root.setdefault(root, {})[path] = entry
+        for root in self.roots:
+            if dirs_by_root.get(root, {}) != self._saved_dirs.get(root, {}):
+                dirty.add(root)
+        roots = []
+        for root in self.roots:
+            if not self.is_available(Path(root)):
+                # Gone (unplugged): keep its shard dormant for load_root
+                self._loaded.discard(root)
+                self._saved_dirs.pop(root, None)
+            elif root in dirty:
+                roots.append(root)
+        self._save_roots(roots, file_cache, dir_cache, changed, removed)
+
+    def _save_roots(
+        self,
+        roots: List[str],
+        file_cache: FileCache,
+        dir_cache: DirCache,
+        changed: Iterable[str],
+        removed: Iterable[str],
+    ) -> None:
+        """Write the shards of ``roots`` and the manifest."""
+        if not roots:
+            return
+        wanted = set(roots)
+
+        def split(paths: Iterable[str]) -> Dict[str, List[str]]:
+            parts: Dict[str, List[str]] = {root: [] for root in roots}
+            for path in paths:
+                root = self._root_of(path)
+                if root in wanted:
+                    parts[root].append(path)
+            return parts
+
+        files_by_root = split(file_cache)
+        dirs_by_root = split(dir_cache)
+        changed_by_root = split(changed)
+        removed_by_root = split(removed)
+
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        for root in roots:
+            shard_files = {path: file_cache[path] for path in files_by_root[root]}
+            shard_dirs = {path: dir_cache[path] for path in dirs_by_root[root]}
+            shard_changed: Iterable[str] = changed_by_root[root]
+            shard_removed: Iterable[str] = removed_by_root[root]
+            if root not in self._loaded and self._manifest.get(root):
+                # Came back without load_root: replace what the shard holds
+                old = self._load_shard(root)
+                shard_changed = shard_files.keys()
+                shard_removed = [
+                    p for p in (old[0] if old else ()) if p not in shard_files
+                ]
+            self._shard(root).save(
+                shard_files, shard_dirs, shard_changed, shard_removed
+            )
+            self._loaded.add(root)
+            self._saved_dirs[root] = shard_dirs
+            self._manifest[root] = {
+                "version": self.version,
+                "fingerprint": self._fingerprint(root),
+                "entries": len(shard_files),
+            }
+        self._write_manifest()
+
+    def stamp(self) -> Optional[str]:
+        stamps = []
+        for root in self.roots:
+            if root in self._loaded:
+                stamps.append(self._shard(root).stamp() or "-")
+            else:
+                stamps.append("-")
+        if all(stamp == "-" for stamp in stamps):
+            return None
+        return "shards:" + "|".join(stamps)
+
+    def dormant_roots(self) -> List[Path]:
+        return [
+            Path(root)
+            for root in self.roots
+            if root not in self._loaded and self._manifest.get(root, {}).get("entries")
+        ]
+
+    def load_root(self, root: Path) -> Optional[Tuple[FileCache, DirCache, bool]]:
+        root_str = str(root)
+        if root_str in self._loaded or not self.is_available(root):
+            return None
+        loaded = self._load_shard(root_str)
+        if loaded is None:
+            return None
+        valid = self._fingerprint(root_str) == self._manifest[root_str].get(
+            "fingerprint"
+        )
+        return loaded[0], loaded[1], valid
+
+
+def create_library_index(config, version: int) -> LibraryIndex:
+    """
+    Create the index backend selected by ``[library] index_backend``, one
+    per music directory when ``index_shards`` is on.
+    """
+    if config.library_index_backend == "sqlite":
+        legacy: LibraryIndex = SqliteLibraryIndex(
+            config.library_index_db, version, legacy_json_file=config.library_index_file
+        )
+        make_shard: Callable[[Path], LibraryIndex] = functools.partial(
+            SqliteLibraryIndex, version=version
+        )
+        suffix = ".db"
+    else:
+        legacy = JsonLibraryIndex(config.library_index_file, version)
+        make_shard = functools.partial(JsonLibraryIndex, version=version)
+        suffix = ".json"
+    if not config.library_index_shards:
+        return legacy
+    return ShardedLibraryIndex(
+        config.library_shard_dir,
+        config.library_music_roots,
+        version,
+        make_shard,
+        suffix,
+        legacy=legacy,
+    )
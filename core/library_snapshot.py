@@ -0,0 +1,302 @@
+"""Immutable library snapshots for readers, and their binary form for startup."""
+
+import locale
+import os
+import pickle
+import re
+import struct
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from core.logging import get_logger
+from core.metadata import TrackMetadata
+from core.track_store import ChunkedColumn, TrackStore
+
+logger = get_logger(__name__)
+
+SNAPSHOT_MAGIC = b"MPLSNAP\0"
+# Bump when the pickled structures change shape (TrackMetadata slots,
+# TrackStore columns, folder tree layout, sort keys)
+SNAPSHOT_VERSION = 7
+
+# magic, format version, length of the pickled key
+_HEADER = struct.Struct(">8sHI")
+
+_DIGITS = re.compile(r"(\d+)")
+
+
+def natural_sort_key(name: str) -> Tuple[Tuple[Any, ...], str]:
+    """
+    Sort key for artist/album names: case-insensitive, collated for the
+    current locale, with digit runs compared as numbers ("Vol. 2" < "Vol. 10").
+    """
+    parts: List[Any] = _DIGITS.split(name.casefold())
+    for i in range(0, len(parts), 2):
+        parts[i] = locale.strxfrm(parts[i])
+    for i in range(1, len(parts), 2):
+        parts[i] = int(parts[i])
+    return tuple(parts), name
+
+
+class _ReadOnlyMapping(Mapping):
+    """
+    Read-only view of a dict nobody changes any more, without copying it.
+
+    Unlike MappingProxyType it never triggers a defaultdict's default, so
+    a lookup of a missing key cannot insert into the viewed dict.
+    """
+
+    __slots__ = ("_data", "_nested")
+
+    def __init__(self, data: Dict[Any, Any], nested: bool = False) -> None:
+        self._data = data
+        # Wrap dict values (an artist's albums) in read-only views too
+        self._nested = nested
+
+    def __getitem__(self, key: Any) -> Any:
+        if key not in self._data:
+            raise KeyError(key)
+        value = self._data[key]
+        return _ReadOnlyMapping(value) if self._nested else value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class FolderStructure(Mapping):
+    """
+    Read-only folder key -> tracks mapping over a folder tree.
+
+    Keys are paths relative to the music directory ("." for tracks directly
+    in it), the nodes' track lists are the values. Lookups walk the tree
+    from the root, and iteration visits the folders with tracks in tree
+    order; nothing is copied.
+    """
+
+    __slots__ = ("_tree",)
+
+    def __init__(self, tree: Dict[str, Any]) -> None:
+        self._tree = tree
+
+    def __getitem__(self, key: Any) -> List[TrackMetadata]:
+        node = self._tree
+        if not isinstance(key, str):
+            raise KeyError(key)
+        if key and key != ".":
+            for part in Path(key).parts:
+                node = node["folders"].get(part)
+                if node is None:
+                    raise KeyError(key)
+        if not node["tracks"]:
+            raise KeyError(key)
+        return node["tracks"]
+
+    def __iter__(self) -> Iterator[str]:
+        if self._tree["tracks"]:
+            yield "."
+        # Pre-order, subfolders in tree (sorted) order
+        stack = list(reversed(self._tree["folders"].items()))
+        while stack:
+            key, node = stack.pop()
+            if node["tracks"]:
+                yield key
+            stack.extend(
+                (os.path.join(key, name), child)
+                for name, child in reversed(node["folders"].items())
+            )
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class LibrarySnapshot:
+    """
+    Immutable, versioned state of the library as seen by readers.
+
+    MusicLibrary publishes a new snapshot (by swapping one reference) when a
+    scan, load or change batch completes, so readers never take the library
+    lock and never copy. Nothing reachable from a snapshot is modified after
+    it is published (bar the store's append-only tables of distinct
+    strings): writers copy the store's chunks, the outer artist dict, the
+    album dicts of changed artists, track lists and folder tree nodes
+    before changing them, so publishing costs nothing per track.
+    folder_structure is a view over the folder tree. The track list and
+    sorted views are built on first use and kept for the snapshot's
+    lifetime. Lists handed out are shared: treat them as read-only.
+    """
+
+    __slots__ = (
+        "version",
+        "folder_structure",
+        "folder_tree",
+        "artists",
+        "music_roots",
+        "_store",
+        "_track_by_id",
+        "_sort_keys",
+        "_views",
+    )
+
+    def __init__(
+        self,
+        version: int,
+        folder_tree: Dict[str, Any],
+        artists: Dict[str, Dict[str, List[TrackMetadata]]],
+        music_roots: Sequence[Path],
+        store: TrackStore,
+        track_by_id: ChunkedColumn,
+        sort_keys: Dict[str, Tuple],
+    ) -> None:
+        self.version = version
+        self.folder_structure: Mapping[str, List[TrackMetadata]] = FolderStructure(
+            folder_tree
+        )
+        self.folder_tree = folder_tree
+        self.artists: Mapping[str, Mapping[str, List[TrackMetadata]]] = (
+            _ReadOnlyMapping(artists, nested=True)
+        )
+        self.music_roots = tuple(music_roots)
+        self._store = store
+        self._track_by_id = track_by_id
+        self._sort_keys = sort_keys
+        self._views: Dict[Tuple, Any] = {}
+
+    @classmethod
+    def empty(cls) -> "LibrarySnapshot":
+        return cls(
+            0, {"tracks": [], "folders": {}}, {}, [], TrackStore(), ChunkedColumn(), {}
+        )
+
+    @property
+    def tracks(self) -> List[TrackMetadata]:
+        """All tracks, in scan order (store id order, built on first use)."""
+        return self._view(
+            ("tracks",),
+            lambda: [track for track in self._track_by_id if track is not None],
+        )
+
+    @property
+    def track_count(self) -> int:
+        return len(self._store)
+
+    @property
+    def music_root(self) -> Optional[Path]:
+        """First music directory (None if there is none)."""
+        return self.music_roots[0] if self.music_roots else None
+
+    def _view(self, key: Tuple, build: Callable[[], Any]) -> Any:
+        # Concurrent first calls may both build; the results are equal
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = build()
+        return view
+
+    def _sort_key(self, name: str) -> Tuple:
+        key = self._sort_keys.get(name)
+        return natural_sort_key(name) if key is None else key
+
+    def get_artists(self) -> List[str]:
+        """All artists, in natural order."""
+        return self._view(
+            ("artists",), lambda: sorted(self.artists, key=self._sort_key)
+        )
+
+    def get_albums(self, artist: str) -> List[str]:
+        """Albums of an artist, in natural order."""
+        albums = self.artists.get(artist)
+        if albums is None:
+            return []
+        return self._view(
+            ("albums", artist), lambda: sorted(albums, key=self._sort_key)
+        )
+
+    def get_tracks(
+        self, artist: Optional[str] = None, album: Optional[str] = None
+    ) -> Sequence[TrackMetadata]:
+        """Tracks, optionally filtered by artist and/or album (album order)."""
+        if not artist:
+            return self.tracks
+        albums = self.artists.get(artist)
+        if albums is None:
+            return []
+        if album:
+            return albums.get(album, [])
+
+        def build() -> List[TrackMetadata]:
+            tracks: List[TrackMetadata] = []
+            for name in self.get_albums(artist):
+                tracks.extend(albums[name])
+            return tracks
+
+        return self._view(("tracks", artist), build)
+
+    def search(self, query: str) -> List[TrackMetadata]:
+        """Tracks whose title, artist, album or album artist contain query."""
+        return self._track_by_id.take(self._store.search(query))
+
+    def get_duration_by_artist(self) -> Dict[str, float]:
+        """Total known duration (seconds) per album artist or artist."""
+        return self._view(
+            ("duration_by_artist",),
+            lambda: self._store.total_duration_by("library_artist"),
+        )
+
+
+def save_snapshot(path: Path, key: Dict[str, Any], data: Dict[str, Any]) -> None:
+    """
+    Write ``data`` to ``path`` (atomically), tagged with ``key``.
+
+    ``key`` describes what the data was built from (index stamp, music
+    directories, ...); load_snapshot only returns the data for an equal key.
+    """
+    key_blob = pickle.dumps(key, protocol=pickle.HIGHEST_PROTOCOL)
+    temp_file = path.with_suffix(".tmp")
+    with open(temp_file, "wb") as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(key_blob)))
+        f.write(key_blob)
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    temp_file.replace(path)
+
+
+def load_snapshot(path: Path, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Read the data saved for ``key``.
+
+    Returns None if there is no snapshot, or it has another format version,
+    was built from something else, or cannot be read. The key is checked
+    before the (large) data is unpickled.
+    """
+    try:
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                return None
+            magic, version, key_length = _HEADER.unpack(header)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                logger.debug("Ignoring library snapshot %s of another version", path)
+                return None
+            if pickle.loads(f.read(key_length)) != key:
+                logger.debug("Library snapshot %s is stale", path)
+                return None
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Cannot read library snapshot %s: %s", path, e)
+        return None
@@ -0,0 +1,228 @@
+"""Live filesystem watcher for the music library (inotify with polling fallback)."""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Set
+
+from core.logging import get_logger
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    FileSystemEventHandler = object
+    WATCHDOG_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+# Events that say nothing about content changes (e.g. our own tag reads)
+_IGNORED_EVENT_TYPES = {"opened", "closed_no_write"}
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    """Forwards watchdog events to the watcher's coalescing buffer."""
+
+    def __init__(self, watcher: "LibraryWatcher") -> None:
+        super().__init__()
+        self._watcher = watcher
+
+    def on_any_event(self, event) -> None:
+        if event.event_type in _IGNORED_EVENT_TYPES:
+            return
+        # Directory mtime updates are implied by the child events
+        if event.is_directory and event.event_type == "modified":
+            return
+        src = os.fsdecode(event.src_path)
+        if event.event_type == "deleted":
+            self._watcher.record(removed=src, is_directory=event.is_directory)
+        elif event.event_type == "moved":
+            self._watcher.record(removed=src, is_directory=event.is_directory)
+            self._watcher.record(
+                changed=os.fsdecode(event.dest_path), is_directory=event.is_directory
+            )
+        else:
+            self._watcher.record(changed=src, is_directory=event.is_directory)
+
+
+class LibraryWatcher:
+    """
+    Watches the music directories and reports coalesced changes.
+
+    Uses inotify through watchdog. Bursts of create/modify/move/delete events
+    are buffered until no event arrived for ``debounce`` seconds (or at most
+    ``max_delay`` after the first one) and then handed to ``on_changes`` as two
+    sets of paths: changed (files or directories to re-read) and removed.
+
+    If watchdog is missing or inotify cannot be set up (e.g. the
+    fs.inotify.max_user_watches limit is exhausted), falls back to calling
+    ``on_poll`` every ``poll_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        roots: List[Path],
+        on_changes: Callable[[Set[str], Set[str]], None],
+        on_poll: Callable[[], None],
+        extensions: Set[str],
+        debounce: float = 1.0,
+        max_delay: float = 10.0,
+        poll_interval: float = 60.0,
+    ) -> None:
+        """
+        Initialize the watcher.
+
+        Args:
+            roots: Directories to watch recursively
+            on_changes: Called with (changed_paths, removed_paths) per burst
+            on_poll: Called periodically when inotify is unavailable
+            extensions: Lower-case file extensions worth reporting
+            debounce: Quiet period that ends a burst, in seconds
+            max_delay: Upper bound on how long a burst is buffered, in seconds
+            poll_interval: Polling period of the fallback, in seconds
+        """
+        self._roots = roots
+        self._on_changes = on_changes
+        self._on_poll = on_poll
+        self._extensions = extensions
+        self._debounce = debounce
+        self._max_delay = max_delay
+        self._poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._changed: Set[str] = set()
+        self._removed: Set[str] = set()
+        self._first_event = 0.0
+        self._last_event = 0.0
+        self._timer: Optional[threading.Timer] = None
+
+        self._observer = None
+        self._poll_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    @property
+    def is_polling(self) -> bool:
+        """True if the watcher fell back to periodic polling."""
+        return self._poll_thread is not None
+
+    def start(self) -> None:
+        """Start watching (inotify if possible, otherwise polling)."""
+        self._stop_event.clear()
+        if WATCHDOG_AVAILABLE:
+            observer = Observer()
+            handler = _ChangeHandler(self)
+            try:
+                for root in self._roots:
+                    observer.schedule(handler, str(root), recursive=True)
+                observer.start()
+                self._observer = observer
+                logger.info(
+                    "Watching %d music directories with inotify", len(self._roots)
+                )
+                return
+            except OSError as e:
+                logger.warning(
+                    "Cannot watch music directories (%s); "
+                    "raise fs.inotify.max_user_watches to enable live updates. "
+                    "Falling back to polling every %.0fs",
+                    e,
+                    self._poll_interval,
+                )
+                try:
+                    observer.stop()
+                except Exception:
+                    pass
+        else:
+            logger.info("watchdog not installed; polling music directories")
+        self._start_polling()
+
+    def _start_polling(self) -> None:
+        self._poll_thread = threading.Thread(
+            target=self._poll_loop, name="library-poll", daemon=True
+        )
+        self._poll_thread.start()
+
+    def _poll_loop(self) -> None:
+        while not self._stop_event.wait(self._poll_interval):
+            try:
+                self._on_poll()
+            except Exception as e:
+                logger.error("Error polling music directories: %s", e, exc_info=True)
+
+    def stop(self) -> None:
+        """Stop watching and drop any buffered changes."""
+        self._stop_event.set()
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._changed.clear()
+            self._removed.clear()
+        if self._observer is not None:
+            try:
+                self._observer.stop()
+                self._observer.join(timeout=2)
+            except Exception as e:
+                logger.debug("Error stopping library observer: %s", e)
+            self._observer = None
+        self._poll_thread = None
+
+    def record(
+        self,
+        changed: Optional[str] = None,
+        removed: Optional[str] = None,
+        is_directory: bool = False,
+    ) -> None:
+        """Buffer one change; the latest event for a path wins."""
+        path = changed or removed
+        if not path:
+            return
+        if (
+            not is_directory
+            and os.path.splitext(path)[1].lower() not in self._extensions
+        ):
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            if changed:
+                self._removed.discard(changed)
+                self._changed.add(changed)
+            else:
+                self._changed.discard(removed)
+                self._removed.add(removed)
+            if self._timer is None:
+                self._first_event = now
+                self._schedule(self._debounce)
+            self._last_event = now
+
+    def _schedule(self, delay: float) -> None:
+        """Arm the flush timer (caller holds the lock)."""
+        self._timer = threading.Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            quiet_for = now - self._last_event
+            waited = now - self._first_event
+            if quiet_for < self._debounce and waited < self._max_delay:
+                # Burst still going: wait for the rest of the quiet period
+                self._schedule(
+                    min(self._debounce - quiet_for, self._max_delay - waited)
+                )
+                return
+            changed, removed = self._changed, self._removed
+            self._changed, self._removed = set(), set()
+            self._timer = None
+
+        if self._stop_event.is_set() or not (changed or removed):
+            return
+        try:
+            self._on_changes(changed, removed)
+        except Exception as e:
+            logger.error("Error applying library changes: %s", e, exc_info=True)
@@ -1,36 +1,156 @@
 """Metadata extraction for audio files using mutagen and GStreamer."""
 
-import base64
-import hashlib
 import re
-import struct
+import sys
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from mutagen import File
 from mutagen.flac import FLAC
-from mutagen.mp3 import MP3
-from mutagen.mp4 import MP4
 from mutagen.oggvorbis import OggVorbis
 
-# GStreamer for video/MP4 metadata extraction
-import gi
-
-gi.require_version("Gst", "1.0")
-gi.require_version("GstPbutils", "1.0")
-from gi.repository import Gst, GstPbutils
-
-from core.config import get_config
+from core.album_art import GSTREAMER_IMAGE, find_embedded_art
 from core.logging import get_logger
+from core.tag_readers import read_tags
 
 logger = get_logger(__name__)
 
 # Video file extensions that should use GStreamer for metadata
 VIDEO_EXTENSIONS = {".mp4", ".mkv", ".webm", ".avi", ".mov", ".m4v", ".wmv", ".flv"}
 
+# Fields shared by many tracks; interned so a library holds one copy of each
+INTERNED_FIELDS = (
+    "artist",
+    "album",
+    "album_artist",
+    "genre",
+    "year",
+    "embedded_art",
+)
+
+
+# Tag keys tried one by one for each field when the tag container has no
+# reader in core.tag_readers
+GENERIC_TAG_KEYS = {
+    "title": [
+        "TITLE",  # FLAC, OGG (Vorbis)
+        "TIT2",  # MP3 (ID3v2)
+        "\xa9nam",  # MP4 (iTunes)
+        "TIT1",  # MP3 (ID3v1 title)
+    ],
+    "artist": [
+        "ARTIST",  # FLAC, OGG (Vorbis)
+        "TPE1",  # MP3 (ID3v2)
+        "\xa9ART",  # MP4 (iTunes)
+        "TP1",  # MP3 (ID3v1 artist)
+    ],
+    "album": [
+        "ALBUM",  # FLAC, OGG (Vorbis)
+        "TALB",  # MP3 (ID3v2)
+        "\xa9alb",  # MP4 (iTunes)
+        "TAL",  # MP3 (ID3v1 album)
+    ],
+    "album_artist": [
+        "ALBUMARTIST",  # FLAC, OGG (Vorbis)
+        "ALBUM ARTIST",  # FLAC, OGG (alternative)
+        "TPE2",  # MP3 (ID3v2)
+        "aART",  # MP4 (iTunes)
+    ],
+    "genre": [
+        "GENRE",  # FLAC, OGG (Vorbis)
+        "TCON",  # MP3 (ID3v2)
+        "\xa9gen",  # MP4 (iTunes)
+        "TCO",  # MP3 (ID3v1 genre)
+    ],
+    "year": [
+        "DATE",  # FLAC, OGG (Vorbis)
+        "YEAR",  # Alternative
+        "TDRC",  # MP3 (ID3v2 date)
+        "TDRL",  # MP3 (ID3v2 release date)
+        "TDOR",  # MP3 (ID3v2 original release date)
+        "\xa9day",  # MP4 (iTunes)
+        "TYE",  # MP3 (ID3v1 year)
+    ],
+    "track": [
+        "TRACKNUMBER",  # FLAC, OGG (Vorbis)
+        "TRACK",  # Alternative
+        "TRCK",  # MP3 (ID3v2)
+        "trkn",  # MP4 (iTunes - tuple format)
+        "TRK",  # MP3 (ID3v1 track)
+    ],
+}
+
+
+def _gstreamer() -> Tuple[Any, Any]:
+    """
+    Import and initialize GStreamer (for video/MP4 metadata) on first use.
+
+    Scanner worker processes (see core.scan_worker) start without it and
+    only load it for files mutagen cannot read.
+
+    Returns:
+        The Gst and GstPbutils modules
+    """
+    import gi
+
+    gi.require_version("Gst", "1.0")
+    gi.require_version("GstPbutils", "1.0")
+    from gi.repository import Gst, GstPbutils
+
+    Gst.init_check(None)
+    return Gst, GstPbutils
+
+
+def read_gstreamer_image(file_path: str) -> Optional[bytes]:
+    """Read the "image" tag of a file mutagen cannot read (see GSTREAMER_IMAGE)."""
+    Gst, GstPbutils = _gstreamer()
+    discoverer = GstPbutils.Discoverer.new(5 * Gst.SECOND)
+    info = discoverer.discover_uri(Path(file_path).resolve().as_uri())
+    tags = info.get_tags() if info is not None else None
+    if tags is None:
+        return None
+    success, sample = tags.get_sample("image")
+    buffer = sample.get_buffer() if success else None
+    if buffer is None:
+        return None
+    success, map_info = buffer.map(Gst.MapFlags.READ)
+    if not success:
+        return None
+    try:
+        return bytes(map_info.data) or None
+    finally:
+        buffer.unmap(map_info)
+
+
+def _intern(value: Any) -> Any:
+    """Intern string values, pass anything else through unchanged."""
+    if type(value) is str:
+        return sys.intern(value)
+    return value
+
 
 class TrackMetadata:
-    """Represents metadata for a single audio track."""
+    """
+    Represents metadata for a single audio track.
+
+    Uses __slots__ instead of a per-instance __dict__, and interns the fields
+    listed in INTERNED_FIELDS, since large libraries keep hundreds of
+    thousands of these alive.
+    """
+
+    __slots__ = (
+        "file_path",
+        "title",
+        "artist",
+        "album",
+        "album_artist",
+        "track_number",
+        "duration",
+        "album_art_path",
+        "genre",
+        "year",
+        "embedded_art",
+    )
 
     def __init__(self, file_path: str) -> None:
         """
@@ -49,16 +169,20 @@ class TrackMetadata:
         self.album_art_path: Optional[str] = None
         self.genre: Optional[str] = None
         self.year: Optional[str] = None
+        # Where the file embeds its cover (see core.album_art); the image is
+        # only extracted when something shows it
+        self.embedded_art: Optional[str] = None
 
         self._extract_metadata()
 
     def _extract_metadata(self) -> None:
         """
-        Extract metadata from the audio file using a generic approach.
+        Extract metadata from the audio file.
 
-        Supports multiple audio formats (MP3, FLAC, MP4, OGG) and extracts
-        common metadata fields including title, artist, album, track number,
-        duration, and album art.
+        Tags are read by the reader for the file's tag container (ID3,
+        Vorbis comments, MP4, ASF, APEv2; see core.tag_readers), falling back
+        to probing every known key. Extracts title, artist, album, track
+        number, duration, and album art.
 
         For video files (MP4, MKV, etc.), uses GStreamer discoverer which
         handles video containers more reliably than mutagen.
@@ -67,6 +191,7 @@ class TrackMetadata:
         file_ext = Path(self.file_path).suffix.lower()
         if file_ext in VIDEO_EXTENSIONS:
             if self._extract_metadata_gstreamer():
+                self._intern_fields()
                 return  # GStreamer succeeded
             # Fall through to try mutagen as backup
 
@@ -78,88 +203,19 @@ class TrackMetadata:
                     return
                 return
 
-            # Format-specific handling
-            is_flac = isinstance(audio_file, FLAC)
-            is_mp3 = isinstance(audio_file, MP3)
-            is_mp4 = isinstance(audio_file, MP4)
-            is_ogg = isinstance(audio_file, OggVorbis)
-
-            # Extract basic metadata using format-agnostic approach
-            # Try all common tag names for each field across all formats
-            self.title = self._get_tag_generic(
-                audio_file,
-                [
-                    "TITLE",  # FLAC, OGG (Vorbis)
-                    "TIT2",  # MP3 (ID3v2)
-                    "\xa9nam",  # MP4 (iTunes)
-                    "TIT1",  # MP3 (ID3v1 title)
-                ],
-            )
-
-            self.artist = self._get_tag_generic(
-                audio_file,
-                [
-                    "ARTIST",  # FLAC, OGG (Vorbis)
-                    "TPE1",  # MP3 (ID3v2)
-                    "\xa9ART",  # MP4 (iTunes)
-                    "TP1",  # MP3 (ID3v1 artist)
-                ],
-            )
-
-            self.album = self._get_tag_generic(
-                audio_file,
-                [
-                    "ALBUM",  # FLAC, OGG (Vorbis)
-                    "TALB",  # MP3 (ID3v2)
-                    "\xa9alb",  # MP4 (iTunes)
-                    "TAL",  # MP3 (ID3v1 album)
-                ],
-            )
-
-            self.album_artist = self._get_tag_generic(
-                audio_file,
-                [
-                    "ALBUMARTIST",  # FLAC, OGG (Vorbis)
-                    "ALBUM ARTIST",  # FLAC, OGG (alternative)
-                    "TPE2",  # MP3 (ID3v2)
-                    "aART",  # MP4 (iTunes)
-                ],
-            )
-
-            self.genre = self._get_tag_generic(
-                audio_file,
-                [
-                    "GENRE",  # FLAC, OGG (Vorbis)
-                    "TCON",  # MP3 (ID3v2)
-                    "\xa9gen",  # MP4 (iTunes)
-                    "TCO",  # MP3 (ID3v1 genre)
-                ],
-            )
-
-            self.year = self._get_tag_generic(
-                audio_file,
-                [
-                    "DATE",  # FLAC, OGG (Vorbis)
-                    "YEAR",  # Alternative
-                    "TDRC",  # MP3 (ID3v2 date)
-                    "TDRL",  # MP3 (ID3v2 release date)
-                    "TDOR",  # MP3 (ID3v2 original release date)
-                    "\xa9day",  # MP4 (iTunes)
-                    "TYE",  # MP3 (ID3v1 year)
-                ],
-            )
+            # Read the tag container once with the reader for its format;
+            # containers without one are probed key by key
+            tags = read_tags(getattr(audio_file, "tags", None))
+            if tags is None:
+                tags = self._read_tags_generic(audio_file)
 
-            # Extract track number
-            track_num = self._get_tag_generic(
-                audio_file,
-                [
-                    "TRACKNUMBER",  # FLAC, OGG (Vorbis)
-                    "TRACK",  # Alternative
-                    "TRCK",  # MP3 (ID3v2)
-                    "trkn",  # MP4 (iTunes - tuple format)
-                    "TRK",  # MP3 (ID3v1 track)
-                ],
-            )
+            self.title = tags.get("title")
+            self.artist = tags.get("artist")
+            self.album = tags.get("album")
+            self.album_artist = tags.get("album_artist")
+            self.genre = tags.get("genre")
+            self.year = tags.get("year")
+            track_num = tags.get("track")
 
             if track_num:
                 try:
@@ -180,8 +236,9 @@ class TrackMetadata:
             if hasattr(audio_file, "info") and hasattr(audio_file.info, "length"):
                 self.duration = audio_file.info.length
 
-            # Extract album art
-            self.album_art_path = self._extract_album_art(audio_file)
+            # Only note where the cover is; extracting it is left to
+            # core.album_art.AlbumArt when it is first shown
+            self.embedded_art = find_embedded_art(audio_file)
 
         except Exception as e:
             logger.debug(
@@ -203,6 +260,13 @@ class TrackMetadata:
             if not self.title:
                 self.title = parsed_title or stem
 
+            self._intern_fields()
+
+    def _intern_fields(self) -> None:
+        """Replace repeated string fields with their interned copies."""
+        for field in INTERNED_FIELDS:
+            setattr(self, field, _intern(getattr(self, field)))
+
     @staticmethod
     def _parse_filename_track_prefix(stem: str) -> tuple[Optional[int], Optional[str]]:
         """Parse filename prefixes like '01 - Title' into (track_number, title)."""
@@ -240,6 +304,7 @@ class TrackMetadata:
             True if metadata was successfully extracted, False otherwise
         """
         try:
+            Gst, GstPbutils = _gstreamer()
             # Create a discoverer with 5 second timeout
             discoverer = GstPbutils.Discoverer.new(5 * Gst.SECOND)
 
@@ -302,19 +367,10 @@ class TrackMetadata:
                     self.year = str(date_val.get_year())
                     break
 
-            # Try to extract album art (image tag)
-            sample = tags.get_sample("image")
-            if sample:
-                buffer = sample[1].get_buffer()
-                if buffer:
-                    success, map_info = buffer.map(Gst.MapFlags.READ)
-                    if success:
-                        try:
-                            art_path = self._save_album_art(map_info.data)
-                            if art_path:
-                                self.album_art_path = art_path
-                        finally:
-                            buffer.unmap(map_info)
+            # Only note that there is a cover, as for mutagen's formats
+            success, _sample = tags.get_sample("image")
+            if success:
+                self.embedded_art = GSTREAMER_IMAGE
 
             logger.debug("GStreamer extracted metadata for %s", self.file_path)
             return True
@@ -325,6 +381,26 @@ class TrackMetadata:
             )
             return False
 
+    def _read_tags_generic(self, audio_file: File) -> Dict[str, str]:
+        """
+        Read the track fields by trying every known key of every format.
+
+        Slower than core.tag_readers.read_tags; used for tag containers it
+        has no reader for.
+
+        Args:
+            audio_file: Mutagen File object
+
+        Returns:
+            Field name -> tag value, for the fields found
+        """
+        tags: Dict[str, str] = {}
+        for field, tag_keys in GENERIC_TAG_KEYS.items():
+            value = self._get_tag_generic(audio_file, tag_keys)
+            if value is not None:
+                tags[field] = value
+        return tags
+
     def _get_tag_generic(self, audio_file: File, tag_keys: list[str]) -> Optional[str]:
         """
         Get a tag value trying multiple possible keys - works for all formats.
@@ -436,139 +512,6 @@ class TrackMetadata:
         result = str(value).strip()
         return result if result else None
 
-    def _extract_album_art(self, audio_file: File) -> Optional[str]:
-        """
-        Extract album art from the audio file.
-
-        Args:
-            audio_file: Mutagen File object
-
-        Returns:
-            Path to saved album art file, or None if not found
-        """
-        try:
-            is_flac = isinstance(audio_file, FLAC)
-
-            if is_flac:
-                # FLAC uses METADATA_BLOCK_PICTURE which is a list of Picture objects
-                try:
-                    pictures = audio_file.pictures
-                    if pictures:
-                        # Get the first picture (usually the cover)
-                        picture = pictures[0]
-                        if picture.data:
-                            art_path = self._save_album_art(picture.data)
-                            if art_path:
-                                return art_path
-                except (AttributeError, IndexError, TypeError):
-                    pass
-
-                # Fallback: try METADATA_BLOCK_PICTURE tag directly
-                # This handles cases where the pictures property might not work
-                try:
-                    if "METADATA_BLOCK_PICTURE" in audio_file:
-                        picture_data = audio_file["METADATA_BLOCK_PICTURE"][0]
-                        # Decode base64
-                        decoded = base64.b64decode(picture_data)
-
-                        # Parse FLAC picture block header
-                        # Format: picture type (4), MIME length (4), MIME, description length (4), description,
-                        # width (4), height (4), depth (4), colors (4), data length (4), data
-                        if len(decoded) >= 32:
-                            offset = 0
-                            # Skip picture type (4 bytes)
-                            offset += 4
-                            # Read MIME length (4 bytes, big-endian)
-                            mime_len = struct.unpack(
-                                ">I", decoded[offset : offset + 4]
-                            )[0]
-                            offset += 4
-                            # Skip MIME string
-                            offset += mime_len
-                            # Read description length (4 bytes, big-endian)
-                            desc_len = struct.unpack(
-                                ">I", decoded[offset : offset + 4]
-                            )[0]
-                            offset += 4
-                            # Skip description
-                            offset += desc_len
-                            # Skip width, height, depth, colors (16 bytes total)
-                            offset += 16
-                            # Read data length (4 bytes, big-endian)
-                            data_len = struct.unpack(
-                                ">I", decoded[offset : offset + 4]
-                            )[0]
-                            offset += 4
-
-                            # Extract image data
-                            if offset + data_len <= len(decoded):
-                                image_data = decoded[offset : offset + data_len]
-                                art_path = self._save_album_art(image_data)
-                                if art_path:
-                                    return art_path
-                except (KeyError, ValueError, TypeError, struct.error, IndexError):
-                    # If parsing fails, continue to try other formats
-                    pass
-
-            # Try different tag formats for album art (MP3, MP4, etc.)
-            art_keys = [
-                "APIC:",  # MP3
-                "covr",  # MP4
-                "PICTURE",  # OGG
-            ]
-
-            for key in art_keys:
-                try:
-                    if key in audio_file:
-                        art_data = audio_file[key]
-                        if isinstance(art_data, list):
-                            art_data = art_data[0]
-
-                        # Save to temporary file
-                        if isinstance(art_data, bytes):
-                            art_path = self._save_album_art(art_data)
-                            if art_path:
-                                return art_path
-                        elif hasattr(art_data, "data"):
-                            art_path = self._save_album_art(art_data.data)
-                            if art_path:
-                                return art_path
-                except (KeyError, AttributeError, TypeError):
-                    continue
-        except Exception as e:
-            logger.error("Error extracting album art: %s", e, exc_info=True)
-
-        return None
-
-    def _save_album_art(self, art_data: bytes) -> Optional[str]:
-        """
-        Save album art to a cache file.
-
-        Args:
-            art_data: Raw image data bytes
-
-        Returns:
-            Path to saved album art file, or None on error
-        """
-        try:
-            # Get cache directory from config
-            config = get_config()
-            cache_dir = config.album_art_cache_dir
-
-            # Generate filename from track path hash
-            track_hash = hashlib.md5(self.file_path.encode()).hexdigest()
-            art_path = cache_dir / f"{track_hash}.jpg"
-
-            # Save if not exists
-            if not art_path.exists():
-                with open(art_path, "wb") as f:
-                    f.write(art_data)
-
-            return str(art_path)
-        except Exception as e:
-            logger.error("Error saving album art: %s", e, exc_info=True)
-            return None
-
     def to_dict(self) -> Dict[str, Any]:
         """Convert metadata to dictionary."""
         return {
@@ -582,24 +525,25 @@ class TrackMetadata:
             "album_art_path": self.album_art_path,
             "genre": self.genre,
             "year": self.year,
+            "embedded_art": self.embedded_art,
         }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "TrackMetadata":
-        """Create TrackMetadata from dictionary."""
+        """Create TrackMetadata from dictionary (unknown keys are ignored)."""
         metadata = cls.__new__(cls)
-        for key, value in data.items():
-            setattr(metadata, key, value)
+        for key in cls.__slots__:
+            setattr(metadata, key, data.get(key))
+        metadata._intern_fields()
 
         # Backward-compatible fallback for cached entries created before filename
         # prefix parsing existed (or with missing track tags).
-        file_path = getattr(metadata, "file_path", None)
-        if file_path:
-            stem = Path(file_path).stem
+        if metadata.file_path:
+            stem = Path(metadata.file_path).stem
             parsed_track_num, parsed_title = cls._parse_filename_track_prefix(stem)
-            if getattr(metadata, "track_number", None) is None and parsed_track_num is not None:
+            if metadata.track_number is None and parsed_track_num is not None:
                 metadata.track_number = parsed_track_num
-            if not getattr(metadata, "title", None):
+            if not metadata.title:
                 metadata.title = parsed_title or stem
         return metadata
 
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import shutil
+import stat
 import subprocess
 import threading
 import time
@@ -14,19 +15,23 @@ import gi
 gi.require_version("GLib", "2.0")
 from gi.repository import GLib
 from core.config import get_config
+from core.filesystem import FileSystem, create_filesystem
 from core.logging import get_logger
 from core.metadata import TrackMetadata
 
 logger = get_logger(__name__)
 
+
 class MocController:
     """Wrapper around mocp for playlist and playback control."""
 
-    def __init__(self):
+    def __init__(self, filesystem: Optional[FileSystem] = None):
         self._mocp_path: Optional[str] = shutil.which("mocp")
         # Get playlist path from config
         config = get_config()
         self._playlist_path: Path = config.moc_playlist_path
+        # Track files may live on a network share: batch their stat() calls
+        self._fs: FileSystem = filesystem or create_filesystem(config)
 
         # Simple server state tracking
         self._server_connected: bool = False
@@ -145,50 +150,25 @@ class MocController:
         # Parse M3U file using the standard parser
         parsed_tracks = self._parse_m3u_playlist()
 
-        # Convert to TrackMetadata objects, using EXTINF metadata if available
-        for _, extinf_line, file_path in parsed_tracks:
-            # Resolve path (handle both absolute and relative paths)
+        # Stat the usual location of every entry in one batch; only entries
+        # missing there take the slower fallbacks
+        playlist_dir = self._playlist_path.parent
+        candidates = []
+        for _, _, file_path in parsed_tracks:
             path_obj = Path(file_path)
-            resolved_path = None
-
-            if path_obj.is_absolute():
-                # Try as-is first
-                if path_obj.exists():
-                    resolved_path = path_obj
-                else:
-                    # Try resolving (handles symlinks, ~, etc.)
-                    try:
-                        resolved = path_obj.resolve()
-                        if resolved.exists():
-                            resolved_path = resolved
-                    except (OSError, RuntimeError):
-                        pass
+            candidates.append(
+                path_obj if path_obj.is_absolute() else playlist_dir / path_obj
+            )
+        stats = self._fs.stat_many(candidates)
+
+        for (_, _, file_path), candidate in zip(parsed_tracks, candidates):
+            if stats.get(str(candidate)) is not None:
+                resolved_path = candidate
             else:
-                # Relative path - try relative to playlist file directory
-                playlist_dir = self._playlist_path.parent
-                potential_path = playlist_dir / path_obj
-                if potential_path.exists():
-                    resolved_path = potential_path
-                else:
-                    # Try relative to current working directory
-                    try:
-                        potential_path = Path.cwd() / path_obj
-                        if potential_path.exists():
-                            resolved_path = potential_path
-                    except OSError:
-                        pass
-
-                    # Last resort: try resolving (might expand ~, etc.)
-                    if resolved_path is None:
-                        try:
-                            resolved = path_obj.resolve()
-                            if resolved.exists():
-                                resolved_path = resolved
-                        except (OSError, RuntimeError):
-                            pass
+                resolved_path = self._find_playlist_entry(Path(file_path))
 
             # Only include files that actually exist
-            if resolved_path and resolved_path.exists():
+            if resolved_path is not None:
                 # Create TrackMetadata from resolved path
                 # This extracts metadata directly from the file (same as internal tracks)
                 # We don't override with EXTINF metadata to match internal behavior
@@ -206,16 +186,57 @@ class MocController:
             current_file = status.get("file_path") if status else None
 
         if current_file:
-            # Normalize paths for comparison
-            current_file_resolved = str(Path(current_file).resolve())
+            # Normalize paths for comparison; exact matches need no resolving
+            current_file_resolved = str(self._fs.resolve(current_file))
             for idx, track in enumerate(tracks):
-                track_path_resolved = str(Path(track.file_path).resolve())
-                if track_path_resolved == current_file_resolved:
+                if track.file_path in (current_file, current_file_resolved):
                     current_index = idx
                     break
+            else:
+                for idx, track in enumerate(tracks):
+                    track_path_resolved = str(self._fs.resolve(track.file_path))
+                    if track_path_resolved == current_file_resolved:
+                        current_index = idx
+                        break
 
         return tracks, current_index
 
+    def _find_playlist_entry(self, path_obj: Path) -> Optional[Path]:
+        """Locate a playlist entry that is not at its usual location."""
+        if path_obj.is_absolute():
+            # Try resolving (handles symlinks, ~, etc.)
+            try:
+                resolved = self._fs.resolve(path_obj)
+                if self._fs.exists(resolved):
+                    return resolved
+            except (OSError, RuntimeError):
+                pass
+            return None
+
+        # Try relative to current working directory
+        try:
+            potential_path = Path.cwd() / path_obj
+            if self._fs.exists(potential_path):
+                return potential_path
+        except OSError:
+            pass
+
+        # Last resort: try resolving (might expand ~, etc.)
+        try:
+            resolved = self._fs.resolve(path_obj)
+            if self._fs.exists(resolved):
+                return resolved
+        except (OSError, RuntimeError):
+            pass
+        return None
+
+    def _existing_files(self, paths: List[str]) -> Dict[str, bool]:
+        """Map paths to whether they are regular files (stat()ed in one batch)."""
+        return {
+            path: st is not None and stat.S_ISREG(st.st_mode)
+            for path, st in self._fs.stat_many(paths).items()
+        }
+
     def get_status(self, force_refresh: bool = False) -> Optional[Dict]:
         """
         Get current MOC status (state, file, position, duration, volume).
@@ -719,20 +740,24 @@ class MocController:
             return False
 
         try:
-            target_path = output_path if output_path is not None else self._playlist_path
+            target_path = (
+                output_path if output_path is not None else self._playlist_path
+            )
             # Ensure playlist directory exists
             target_path.parent.mkdir(parents=True, exist_ok=True)
 
             # Build list of valid tracks with absolute paths
             valid_tracks = []
+            is_file = self._existing_files(
+                [track.file_path for track in tracks if track and track.file_path]
+            )
             for track in tracks:
                 if not track or not track.file_path:
                     continue
-                file_path = Path(track.file_path)
-                if not file_path.exists() or not file_path.is_file():
+                if not is_file[track.file_path]:
                     logger.warning("Track file does not exist: %s", track.file_path)
                     continue
-                abs_path = str(file_path.resolve())
+                abs_path = str(self._fs.resolve(track.file_path))
                 valid_tracks.append((track, abs_path))
 
             # Write M3U file
@@ -785,13 +810,12 @@ class MocController:
         if not path:
             return False
 
-        p = Path(path)
-        if not p.exists():
+        if not self._fs.exists(path):
             logger.warning("Cannot append - path does not exist: %s", path)
             return False
 
         self.ensure_server()
-        abs_path = str(p.resolve())
+        abs_path = str(self._fs.resolve(path))
         result = self._run("--append", abs_path, capture_output=True)
         return result.returncode == 0
 
@@ -865,27 +889,31 @@ class MocController:
                 existing_paths = set()
                 for _, _, fp in existing:
                     try:
-                        existing_paths.add(str(Path(fp).resolve()))
+                        existing_paths.add(str(self._fs.resolve(fp)))
                     except (OSError, RuntimeError):
                         existing_paths.add(fp)
 
                 # Build combined track list: existing (as TrackMetadata) + new
                 combined: List[TrackMetadata] = []
+                existing_stats = self._fs.stat_many(
+                    fp for _, _, fp in existing if Path(fp).is_absolute()
+                )
                 for _, _, fp in existing:
-                    p = Path(fp)
-                    if p.is_absolute() and p.exists():
-                        combined.append(TrackMetadata(str(p.resolve())))
+                    if existing_stats.get(fp) is not None:
+                        combined.append(TrackMetadata(str(self._fs.resolve(fp))))
 
+                is_file = self._existing_files(
+                    [track.file_path for track in tracks if track and track.file_path]
+                )
                 for track in tracks:
                     if cancel_event.is_set():
                         cancelled = True
                         return
                     if not track or not track.file_path:
                         continue
-                    p = Path(track.file_path)
-                    if not p.exists() or not p.is_file():
+                    if not is_file[track.file_path]:
                         continue
-                    resolved = str(p.resolve())
+                    resolved = str(self._fs.resolve(track.file_path))
                     if resolved not in existing_paths:
                         combined.append(TrackMetadata(resolved))
 
@@ -955,15 +983,14 @@ class MocController:
             return False
 
         # Validate file exists
-        path = Path(file_path)
-        if not path.exists() or not path.is_file():
+        if not self._fs.is_file(file_path):
             logger.error("Cannot play file - file does not exist: %s", file_path)
             return False
 
         if not self.ensure_server():
             return False
 
-        abs_path = str(path.resolve())
+        abs_path = str(self._fs.resolve(file_path))
         result = self._run("--playit", abs_path, capture_output=True)
         if result.returncode != 0:
             logger.error("Failed to play file: %s", abs_path)
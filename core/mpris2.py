@@ -11,13 +11,19 @@ Architecture:
 - Follows MPRIS2 specification for media player control
 """
 
+from concurrent.futures import Future
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional
 
 import dbus
 import dbus.service
+import gi
 from dbus.mainloop.glib import DBusGMainLoop
 
+gi.require_version("GLib", "2.0")
+from gi.repository import GLib
+
+from core.album_art import AlbumArt
 from core.dbus_utils import DBusConnectionMonitor, dbus_safe_call
 from core.logging import get_logger
 from core.metadata import TrackMetadata
@@ -557,8 +563,10 @@ class MPRIS2Service(dbus.service.Object):
                 MPRIS2_PLAYER_INTERFACE, {"CanGoPrevious": dbus.Boolean(value)}, []
             )
 
-    def update_metadata(self, track: Optional[TrackMetadata]):
-        """Update metadata from track."""
+    def update_metadata(
+        self, track: Optional[TrackMetadata], art_path: Optional[str] = None
+    ):
+        """Update metadata from track (art_path overrides its album_art_path)."""
         if not track:
             self.metadata = {}
             return
@@ -626,9 +634,10 @@ class MPRIS2Service(dbus.service.Object):
             metadata["xesam:trackNumber"] = int(track.track_number)
 
         # Art URL - ensure it's a string and file exists (native Python string)
-        if track.album_art_path:
+        art_path = art_path or track.album_art_path
+        if art_path:
             try:
-                art_path = Path(track.album_art_path).resolve()
+                art_path = Path(art_path).resolve()
                 if art_path.exists():
                     metadata["mpris:artUrl"] = f"file://{art_path}"
             except (OSError, ValueError):
@@ -660,8 +669,17 @@ class MPRIS2Manager:
     the combined root and player interfaces for desktop integration.
     """
 
-    def __init__(self):
-        """Initialize MPRIS2 manager."""
+    def __init__(self, album_art: Optional[AlbumArt] = None):
+        """
+        Initialize MPRIS2 manager.
+
+        Args:
+            album_art: Resolves mpris:artUrl, extracting embedded art on
+                demand (without it only album_art_path is used)
+        """
+        self._album_art = album_art
+        self._current_track: Optional[TrackMetadata] = None
+
         # DBusGMainLoop should be set once globally, but calling multiple times is safe
         try:
             DBusGMainLoop(set_as_default=True)
@@ -822,8 +840,34 @@ class MPRIS2Manager:
 
     def update_metadata(self, track: Optional[TrackMetadata]):
         """Update current track metadata."""
+        self._current_track = track
         if self.service:
-            self.service.update_metadata(track)
+            self.service.update_metadata(track, self._art_path(track))
+
+    def _art_path(self, track: Optional[TrackMetadata]) -> Optional[str]:
+        """Art of a track if it is at hand; otherwise start extracting it."""
+        if track is None or self._album_art is None:
+            return None
+        art_path = self._album_art.cached(track)
+        if art_path is None and self._album_art.needs_extraction(track):
+            self._album_art.request(track).add_done_callback(
+                lambda future: GLib.idle_add(self._on_art_extracted, track, future)
+            )
+        return art_path
+
+    def _on_art_extracted(self, track: TrackMetadata, future: Future) -> bool:
+        """Publish the extracted art if its track is still the current one."""
+        current = self._current_track
+        if (
+            current is not None
+            and current.file_path == track.file_path
+            and self.service
+            and not future.cancelled()
+            and future.exception() is None
+            and future.result()
+        ):
+            self.service.update_metadata(current, future.result())
+        return False
 
     def update_position(self, position: float):
         """Update playback position."""
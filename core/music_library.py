@@ -1,15 +1,56 @@
 """Music library scanning and indexing."""
 
+import bisect
+import hashlib
 import json
+import locale
 import os
 import threading
-from collections import defaultdict
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Callable, Dict, List, Optional
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
+from core.album_art import (
+    FOLDER_COVER_EXTENSIONS,
+    album_art_cache_path,
+    is_folder_cover,
+    pick_folder_cover,
+)
+from core.art_store import ArtStore
 from core.config import get_config
+from core.events import EventBus
+from core.filesystem import FileSystem, create_filesystem
+from core.library_index import create_library_index
+from core.library_snapshot import (
+    FolderStructure,
+    LibrarySnapshot,
+    load_snapshot,
+    natural_sort_key,
+    save_snapshot,
+)
+from core.library_watcher import LibraryWatcher
 from core.logging import get_logger
 from core.metadata import TrackMetadata
+from core.scan_rules import ScanRules
+from core.scan_throttle import ScanThrottle
+from core.scan_worker import ScanWorkerPool, extract_track_metadata
+from core.track_store import UNKNOWN_ALBUM, UNKNOWN_ARTIST, ChunkedColumn, TrackStore
 
 logger = get_logger(__name__)
 
@@ -37,58 +78,618 @@ AUDIO_EXTENSIONS = {
     ".webm",  # WebM (may contain Opus/Vorbis)
 }
 
+# Stale entries applied (and published) per batch during background validation
+VALIDATION_BATCH_SIZE = 200
+
+# Scan results are published every SCAN_BATCH_SIZE tracks or SCAN_BATCH_INTERVAL
+# seconds, whichever comes first
+SCAN_BATCH_SIZE = 250
+SCAN_BATCH_INTERVAL = 0.5
+
+# Seconds between checkpoints of extracted entries to the index during a scan
+CHECKPOINT_INTERVAL = 30.0
+
+# Bytes read from each end of a file for the optional fingerprint hash
+FINGERPRINT_HASH_BYTES = 64 * 1024
+
+# Scans that change more than this fraction of the library rebuild the browse
+# indexes from scratch instead of applying the changes one by one
+DELTA_REBUILD_RATIO = 0.25
+
+# Library index format version (2 added per-directory listings in "dir_cache",
+# 3 added per-file "fingerprint")
+INDEX_VERSION = 3
+
+
+def _album_order_key(track: TrackMetadata) -> Tuple[int, str]:
+    """Order within an album (same as TrackStore.sorted_ids)."""
+    return track.track_number or 999, track.title or ""
+
+
+def _folder_order_key(track: TrackMetadata) -> Tuple[int, str, str]:
+    """Order within a folder: track number, then title (or file name), then path."""
+    return (
+        track.track_number if track.track_number is not None else 999,
+        (track.title or Path(track.file_path).stem).lower(),
+        str(track.file_path).lower(),
+    )
+
+
+def _same_metadata(a: TrackMetadata, b: TrackMetadata) -> bool:
+    return a is b or all(
+        getattr(a, field) == getattr(b, field) for field in TrackMetadata.__slots__
+    )
+
+
+class ScanCancelled(Exception):
+    """Raised inside a scan whose ScanJob was cancelled."""
+
+
+class ScanJob:
+    """
+    Handle for a background library scan that can be paused or cancelled.
+
+    A cancelled scan resumes from its checkpoint on the next scan_library().
+    """
+
+    def __init__(self, full_rescan: bool = False) -> None:
+        self.full_rescan = full_rescan
+        self._cancel_event = threading.Event()
+        self._run_event = threading.Event()  # cleared while paused
+        self._run_event.set()
+        self._done_event = threading.Event()
+        self._completed = False
+        self._last_checkpoint = time.monotonic()
+
+    def cancel(self) -> None:
+        """Stop the scan at the next file (also wakes a paused scan)."""
+        self._cancel_event.set()
+        self._run_event.set()
+
+    def pause(self) -> None:
+        """Suspend the scan at the next file."""
+        if not self._cancel_event.is_set():
+            self._run_event.clear()
+
+    def resume(self) -> None:
+        """Continue a paused scan."""
+        self._run_event.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the scan to end; True if it ended within timeout."""
+        return self._done_event.wait(timeout)
+
+    @property
+    def is_paused(self) -> bool:
+        return not self._run_event.is_set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def is_done(self) -> bool:
+        """True once the scan thread has finished (completed or cancelled)."""
+        return self._done_event.is_set()
+
+    @property
+    def completed(self) -> bool:
+        """True if the scan ran to the end and replaced the library."""
+        return self._completed
+
+    def check(self) -> None:
+        """Block while paused; raise ScanCancelled if cancelled (scan thread)."""
+        self._run_event.wait()
+        if self._cancel_event.is_set():
+            raise ScanCancelled()
+
+    def sleep(self, seconds: float) -> None:
+        """Sleep in the scan thread, waking early if cancelled, then check()."""
+        self._cancel_event.wait(seconds)
+        self.check()
+
+    def checkpoint_due(self) -> bool:
+        """True (and restarts the interval) if a checkpoint should be written."""
+        now = time.monotonic()
+        if now - self._last_checkpoint < CHECKPOINT_INTERVAL:
+            return False
+        self._last_checkpoint = now
+        return True
+
+    def _finish(self, completed: bool) -> None:
+        self._completed = completed
+        self._done_event.set()
+
+
+class _ScanProgress:
+    """Batches tracks found by a scan into progress events for the UI."""
+
+    def __init__(
+        self,
+        event_bus: EventBus,
+        stats: List[Dict[str, int]],
+        known_paths: Set[str],
+        job: ScanJob,
+        music_root: Optional[Path],
+        throttle: Optional[ScanThrottle] = None,
+    ) -> None:
+        """
+        Args:
+            event_bus: Bus to publish LIBRARY_SCAN_PROGRESS / LIBRARY_TRACKS_ADDED on
+            stats: Live scan counters (files, extracted, ...) of each device
+                scan, summed into the progress
+            known_paths: Tracks already published to the UI (not re-announced)
+            job: The scan's job (paused/cancelled state is reported too)
+            music_root: First music directory (see get_music_root)
+            throttle: The scan's I/O throttle (its state is reported too)
+        """
+        self._event_bus = event_bus
+        self._stats = stats
+        self._known_paths = known_paths
+        self._job = job
+        self._music_root = music_root
+        self._throttle = throttle
+        # Device scans run in parallel threads
+        self._lock = threading.RLock()
+        self._folders: Dict[str, List[TrackMetadata]] = defaultdict(list)
+        self._count = 0
+        self._added = 0
+        self._last_flush = time.monotonic()
+
+    def add(self, folder: str, track: TrackMetadata) -> None:
+        """Queue a track found in ``folder`` (a folder_structure key)."""
+        if track.file_path in self._known_paths:
+            return
+        with self._lock:
+            self._folders[folder].append(track)
+            self._count += 1
+            if self._count >= SCAN_BATCH_SIZE:
+                self.flush()
+
+    def maybe_flush(self) -> None:
+        """Flush if SCAN_BATCH_INTERVAL has passed since the last batch."""
+        if time.monotonic() - self._last_flush >= SCAN_BATCH_INTERVAL:
+            self.flush()
+
+    def flush(self, done: bool = False) -> None:
+        """Publish queued tracks (if any) and the current progress."""
+        with self._lock:
+            if self._count:
+                self._added += self._count
+                self._event_bus.publish(
+                    EventBus.LIBRARY_TRACKS_ADDED,
+                    {
+                        "music_root": self._music_root,
+                        "folders": dict(self._folders),
+                        "tracks": [t for ts in self._folders.values() for t in ts],
+                    },
+                )
+                self._folders = defaultdict(list)
+                self._count = 0
+            self._event_bus.publish(
+                EventBus.LIBRARY_SCAN_PROGRESS,
+                {
+                    "files": sum(stats["files"] for stats in self._stats),
+                    "extracted": sum(stats["extracted"] for stats in self._stats),
+                    "tracks_added": self._added,
+                    "done": done,
+                    "paused": self._job.is_paused,
+                    "cancelled": self._job.is_cancelled,
+                    "throttle": (self._throttle.snapshot() if self._throttle else None),
+                },
+            )
+            self._last_flush = time.monotonic()
+
 
 class MusicLibrary:
     """Manages the music library, scanning and indexing tracks."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        event_bus: Optional[EventBus] = None,
+        filesystem: Optional[FileSystem] = None,
+        art_store: Optional[ArtStore] = None,
+    ) -> None:
         """
         Initialize music library manager.
 
         Loads existing index and prepares for asynchronous scanning.
+
+        Args:
+            event_bus: EventBus for publishing library changes. If None, no
+                events are published.
+            filesystem: Filesystem the music directories are read through.
+                If None, one is created from the [library] settings.
+            art_store: Album art cache whose references follow moved
+                tracks (share it with AlbumArt). If None, one is created
+                from the config.
         """
-        self.tracks: List[TrackMetadata] = []
+        self._event_bus = event_bus
+        # Columns of the fields queries read (search, grouping, album order,
+        # durations), the track of each store row (None once removed), and
+        # the row of each file. Store ids follow scan order (see tracks).
+        self._store = TrackStore()
+        self._track_by_id = ChunkedColumn()
+        self._id_by_path: Dict[str, int] = {}
+        self._track_list: Optional[List[TrackMetadata]] = []
         self.artists: Dict[str, Dict[str, List[TrackMetadata]]] = defaultdict(
             lambda: defaultdict(list)
         )
-        # Folder structure: path -> List[TrackMetadata]
-        self.folder_structure: Dict[str, List[TrackMetadata]] = defaultdict(list)
+        # Sorted folder hierarchy for the browser (see get_folder_tree); it
+        # also holds the tracks of each folder_structure key
+        self._folder_tree: Dict[str, Any] = self._build_folder_tree({})
+        # Set once the store and the index dicts are part of a published
+        # snapshot: the next change copies them first (see _own_indexes)
+        self._indexes_shared = False
+        # Artists whose album dict was copied since the last publish
+        self._owned_albums: Set[str] = set()
+        # Artist/album name -> natural_sort_key, computed once per name
+        self._sort_keys: Dict[str, Tuple] = {}
+        # What readers see; replaced as a whole by _publish (the structures
+        # above belong to writers holding _lock)
+        self._version = 0
+        self._snapshot = LibrarySnapshot.empty()
         self._lock = threading.Lock()
+        # Serializes writers of the cache (scans and watcher batches)
+        self._scan_lock = threading.RLock()
         self._scanning = False
+        self._watcher: Optional[LibraryWatcher] = None
 
         # Get config
         config = get_config()
-        self._index_file = config.library_index_file
+        self._index = create_library_index(config, INDEX_VERSION)
         self._file_cache: Dict[str, Dict] = {}  # file_path -> {mtime, hash, metadata}
-        self._music_root: Optional[Path] = None  # Root music directory
+        # Paths changed/removed since the last save (incremental index backends)
+        self._dirty_files: Set[str] = set()
+        self._removed_files: Set[str] = set()
+        # dir_path -> {mtime_ns, files, dirs, links}; lets rescans skip
+        # unchanged folders
+        self._dir_cache: Dict[str, Dict] = {}
+        self._music_root: Optional[Path] = None  # First music directory
+        self._music_roots: List[Path] = []
+        # (music directory, folder key prefix) of every directory the library
+        # holds tracks of, mounted or not (see _get_music_dirs), and the
+        # prefixes the current indexes were built with
+        self._folder_prefixes: List[Tuple[Path, str]] = []
+        self._indexed_prefixes: List[Tuple[Path, str]] = []
+        # Guards _file_cache and the dirty sets while devices scan in parallel
+        self._cache_lock = threading.RLock()
+        self._scan_workers = config.library_scan_workers
+        self._scan_executor_kind = config.library_scan_executor
+        # stat()/listing calls go through here so they can be batched
+        self._fs = filesystem or create_filesystem(config)
+        self.art_store = art_store or ArtStore.from_config(config)
+        self._scan_rules = ScanRules.from_config(config)
+        self._follow_symlinks = config.library_follow_symlinks
+        # Paces tag reads so scans don't starve playback from the same disk
+        self._throttle = ScanThrottle.from_config(config)
+        if event_bus:
+            event_bus.subscribe(
+                EventBus.PLAYBACK_STATE_CHANGED, self._throttle.on_playback_state
+            )
+            event_bus.subscribe(EventBus.TRACK_CHANGED, self._throttle.on_track_changed)
+        self._last_scan_stats: Dict[str, Any] = {}
+        self._trust_cache = config.library_trust_cache
+        self._fingerprint_hash = config.library_fingerprint_hash
+        # Lookup of cached entries by fingerprint, built lazily per scan/batch
+        self._moved_lookup: Optional[Dict[Tuple, str]] = None
+        self._watch_enabled = config.library_watch
+        self._watch_poll_interval = config.library_watch_poll_interval
+        self._validation_thread: Optional[threading.Thread] = None
+        self._scan_job: Optional[ScanJob] = None
+        # Present while a scan is running or after it was interrupted
+        self._scan_marker = config.cache_dir / "library_scan.json"
+        # Prebuilt browse structures matching the saved index
+        self._snapshot_file = config.cache_dir / "library_browse.snapshot"
+        # Set when small changes deleted the snapshot (see save_snapshot)
+        self._snapshot_outdated = False
 
         # Load existing index
         self._load_index()
+        if self._trust_cache and self._file_cache:
+            self._validation_thread = threading.Thread(
+                target=self._validate_cache, name="library-validate", daemon=True
+            )
+            self._validation_thread.start()
+
+    @property
+    def tracks(self) -> List[TrackMetadata]:
+        """All tracks, in scan order (new ones at the end after incremental updates)."""
+        if self._track_list is None:
+            self._track_list = [
+                track for track in self._track_by_id if track is not None
+            ]
+        return self._track_list
+
+    @tracks.setter
+    def tracks(self, tracks: List[TrackMetadata]) -> None:
+        """Replace all tracks (one per path) and number their rows from 0."""
+        by_path = {track.file_path: track for track in tracks}
+        self._track_by_id = ChunkedColumn.from_values(by_path.values())
+        self._id_by_path = {path: track_id for track_id, path in enumerate(by_path)}
+        self._track_list = list(by_path.values())
 
-    def scan_library(self, callback: Optional[Callable[[], None]] = None) -> None:
+    def scan_library(
+        self,
+        callback: Optional[Callable[[], None]] = None,
+        full_rescan: bool = False,
+    ) -> ScanJob:
         """
-        Scan music directories asynchronously.
+        Scan music directories asynchronously, resuming an interrupted scan.
 
         Args:
-            callback: Optional callback to call when scanning completes
+            callback: Optional callback to call when scanning completes (not
+                called if the scan is cancelled)
+            full_rescan: Ignore directory mtimes and re-list every folder
+
+        Returns:
+            The job controlling the scan (the running one, if any)
         """
-        if self._scanning:
-            return
+        job = self._scan_job
+        if job is not None and not job.is_done:
+            logger.debug("Library scan already running")
+            return job
+
+        interrupted = self._read_scan_marker()
+        if interrupted is not None:
+            logger.info("Resuming interrupted library scan")
+            full_rescan = full_rescan or bool(interrupted.get("full_rescan"))
+
+        job = ScanJob(full_rescan)
+        self._scan_job = job
 
         def scan_thread():
             self._scanning = True
+            completed = False
             try:
-                self._do_scan()
-                if callback:
+                completed = self._do_scan(full_rescan, job)
+                if completed and callback:
                     callback()
             finally:
                 self._scanning = False
+                job._finish(completed)
 
         thread = threading.Thread(target=scan_thread, daemon=True)
         thread.start()
+        return job
+
+    def get_scan_job(self) -> Optional[ScanJob]:
+        """Get the job of the running (or last) scan, if any."""
+        return self._scan_job
+
+    def has_interrupted_scan(self) -> bool:
+        """Check if a scan was interrupted and will resume on the next scan."""
+        return not self._scanning and self._read_scan_marker() is not None
+
+    def _do_scan(self, full_rescan: bool = False, job: Optional[ScanJob] = None):
+        """
+        Perform the actual scanning.
+
+        Args:
+            full_rescan: Re-list every directory instead of trusting unchanged
+                directory mtimes (picks up in-place tag edits)
+            job: Job to poll for pause/cancel (a fresh one if None)
+
+        Returns:
+            True if the scan completed, False if it was cancelled
+        """
+        if job is None:
+            job = ScanJob(full_rescan)
+        # The scan rewrites the cache, so let a background validation finish first
+        self._wait_for_validation()
+        with self._scan_lock:
+            try:
+                job.check()
+                self._scan_music_dirs(full_rescan, job)
+            except ScanCancelled:
+                return False
+        return True
+
+    def _read_scan_marker(self) -> Optional[Dict[str, Any]]:
+        """Get the marker left by a running or interrupted scan, if any."""
+        try:
+            with open(self._scan_marker, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug("Ignoring unreadable scan marker %s: %s", self._scan_marker, e)
+            return {}
+
+    def _write_scan_marker(self, full_rescan: bool) -> None:
+        try:
+            with open(self._scan_marker, "w", encoding="utf-8") as f:
+                json.dump({"full_rescan": full_rescan, "started": time.time()}, f)
+        except OSError as e:
+            logger.debug("Cannot write scan marker %s: %s", self._scan_marker, e)
+
+    def _scan_music_dirs(self, full_rescan: bool, job: ScanJob) -> None:
+        """
+        Walk all music directories and replace the library with the result.
+
+        Raises ScanCancelled (leaving the library as it was) when the job is cancelled.
+        """
+        self.reattach_roots()
+        music_dirs = self._get_music_dirs()
+        self._moved_lookup = None
+        prefixes = dict(self._folder_prefixes)
+        devices = self._group_by_device(music_dirs)
+
+        # Per-device results, merged in configured root order afterwards
+        results: Dict[Path, Tuple[List[TrackMetadata], Dict[str, List]]] = {}
+        device_stats = [self._new_scan_stats() for _ in devices]
+        device_dir_caches: List[Dict[str, Dict]] = [{} for _ in devices]
+        # (st_dev, st_ino) -> first path of every directory walked, shared by
+        # all roots so symlink loops and duplicate mounts are walked once
+        visited: Dict[Tuple[int, int], str] = {}
+        self._throttle.reset()
+        start = time.monotonic()
+
+        progress = None
+        if self._event_bus:
+            with self._lock:
+                known_paths = {track.file_path for track in self.tracks}
+            progress = _ScanProgress(
+                self._event_bus,
+                device_stats,
+                known_paths,
+                job,
+                music_dirs[0] if music_dirs else None,
+                self._throttle,
+            )
+            progress.flush()
+
+        def scan_device(index: int) -> None:
+            """Scan the roots of one device in order with its own worker pool."""
+            executor = self._create_executor()
+            try:
+                for music_dir in devices[index]:
+                    folder_structure = defaultdict(list)
+                    tracks = self._scan_directory(
+                        music_dir,
+                        folder_structure,
+                        music_dir,
+                        executor,
+                        device_stats[index],
+                        device_dir_caches[index],
+                        full_rescan,
+                        progress,
+                        job,
+                        prefixes[music_dir],
+                        visited,
+                    )
+                    results[music_dir] = (tracks, folder_structure)
+            finally:
+                if executor is not None:
+                    executor.shutdown(wait=True, cancel_futures=job.is_cancelled)
+
+        self._write_scan_marker(full_rescan)
+        cancelled = False
+        try:
+            if len(devices) <= 1:
+                for index in range(len(devices)):
+                    scan_device(index)
+            else:
+                # Devices are independent: scan them side by side
+                with ThreadPoolExecutor(
+                    max_workers=len(devices), thread_name_prefix="library-device"
+                ) as device_pool:
+                    futures = [
+                        device_pool.submit(scan_device, index)
+                        for index in range(len(devices))
+                    ]
+                for future in futures:
+                    future.result()
+        except ScanCancelled:
+            cancelled = True
+            raise
+        finally:
+            stats = self._new_scan_stats()
+            for counters in device_stats:
+                for key, value in counters.items():
+                    stats[key] += value
+            if cancelled:
+                # Keep what was extracted; the next scan resumes from here
+                self._save_checkpoint()
+                logger.info(
+                    "Library scan cancelled after %d files (%d extracted)",
+                    stats["files"],
+                    stats["extracted"],
+                )
+            if progress is not None:
+                progress.flush(done=True)
+
+        self._record_scan_stats(stats, time.monotonic() - start, len(devices))
+
+        tracks = []
+        folder_structure = defaultdict(list)
+        for music_dir in music_dirs:
+            if music_dir in results:
+                root_tracks, root_folders = results[music_dir]
+                tracks.extend(root_tracks)
+                for folder, folder_tracks in root_folders.items():
+                    folder_structure[folder].extend(folder_tracks)
+        dir_cache: Dict[str, Dict] = {}
+        for device_dir_cache in device_dir_caches:
+            dir_cache.update(device_dir_cache)
+
+        # Drop index entries for files and directories that are gone
+        seen_files = {track.file_path for track in tracks}
+        for path in [p for p in self._file_cache if p not in seen_files]:
+            del self._file_cache[path]
+            self._removed_files.add(path)
+
+        with self._lock:
+            self._dir_cache = dir_cache
+            if not self._apply_scan_deltas(tracks, music_dirs):
+                self.tracks = tracks
+                self._music_root = music_dirs[0] if music_dirs else None
+                self._music_roots = list(music_dirs)
+                self._rebuild_index(folder_structure)
+            self._save_index()
+        self._scan_marker.unlink(missing_ok=True)
+
+    def _apply_scan_deltas(
+        self, tracks: List[TrackMetadata], music_dirs: List[Path]
+    ) -> bool:
+        """
+        Update the indexes with what a rescan changed (caller holds _lock).
+
+        Returns False without changing anything when a full rebuild is needed instead.
+        """
+        if not self._id_by_path or self._folder_prefixes != self._indexed_prefixes:
+            return False
+        seen = set()
+        changed = []
+        for track in tracks:
+            seen.add(track.file_path)
+            track_id = self._id_by_path.get(track.file_path)
+            if track_id is None or not _same_metadata(
+                self._track_by_id[track_id], track
+            ):
+                changed.append(track)
+        removed = [path for path in self._id_by_path if path not in seen]
+        if len(changed) + len(removed) > len(tracks) * DELTA_REBUILD_RATIO:
+            return False
+        self._music_root = music_dirs[0] if music_dirs else None
+        self._music_roots = list(music_dirs)
+        self._apply_index_deltas(removed, changed)
+        return True
+
+    @staticmethod
+    def _new_scan_stats() -> Dict[str, int]:
+        return {
+            "files": 0,
+            "extracted": 0,
+            "moved": 0,
+            "dirs": 0,
+            "dirs_unchanged": 0,
+        }
+
+    def _group_by_device(self, music_dirs: List[Path]) -> List[List[Path]]:
+        """Group music directories by filesystem device (st_dev), keeping order."""
+        stats = self._fs.stat_many(music_dirs)
+        groups: Dict[int, List[Path]] = {}
+        for music_dir in music_dirs:
+            st = stats[str(music_dir)]
+            if st is None:
+                logger.debug("Cannot stat music directory %s", music_dir)
+                continue
+            groups.setdefault(st.st_dev, []).append(music_dir)
+        return list(groups.values())
 
-    def _do_scan(self):
-        """Perform the actual scanning."""
+    def _save_checkpoint(self) -> None:
+        """Save entries extracted so far while device scans may still run."""
+        with self._cache_lock, self._lock:
+            # The browse structures still show the previous library
+            self._save_index(snapshot=False)
+
+    def _get_music_dirs(self) -> List[Path]:
+        """
+        Get the existing music directories to scan, in configured order.
+
+        Also updates the folder key prefixes (see _root_prefixes).
+        """
         config = get_config()
         music_dirs = config.music_directories
         # Fallback to defaults if none configured
@@ -97,107 +698,619 @@ class MusicLibrary:
                 Path.home() / "Music",
                 Path.home() / "Musik",
             ]
+        music_dirs = [d for d in music_dirs if d.exists() and d.is_dir()]
+        dormant = set(self._index.dormant_roots())
+        known = [
+            root
+            for root in config.library_music_roots
+            if root in dormant or root in music_dirs
+        ]
+        known.extend(root for root in music_dirs if root not in known)
+        self._folder_prefixes = self._root_prefixes(known)
+        return music_dirs
 
-        # Scan directories incrementally
-        tracks = []
-        folder_structure = defaultdict(list)
-        music_root = None
+    @staticmethod
+    def _root_prefixes(music_roots: List[Path]) -> List[Tuple[Path, str]]:
+        """
+        Get the folder_structure key prefix of each music directory.
 
-        for music_dir in music_dirs:
-            if music_dir.exists() and music_dir.is_dir():
-                if music_root is None:
-                    music_root = music_dir
-                tracks.extend(
-                    self._scan_directory(music_dir, folder_structure, music_dir)
+        With several directories, each gets a top-level folder named after it.
+        """
+        if len(music_roots) <= 1:
+            return [(root, "") for root in music_roots]
+        prefixes = []
+        used: Set[str] = set()
+        for root in music_roots:
+            base = root.name or str(root)
+            label = base
+            suffix = 2
+            while label in used:
+                label = f"{base} ({suffix})"
+                suffix += 1
+            used.add(label)
+            prefixes.append((root, label))
+        return prefixes
+
+    @staticmethod
+    def _folder_key(prefix: str, rel_path: str) -> str:
+        """Join a root prefix and a path relative to that root into a folder key."""
+        if not prefix:
+            return rel_path
+        if rel_path == ".":
+            return prefix
+        return os.path.join(prefix, rel_path)
+
+    def _relative_folder(self, file_path: str) -> Optional[str]:
+        """Get the folder_structure key of a file (first music root containing it)."""
+        parent = os.path.dirname(file_path)
+        for root, prefix in self._folder_prefixes:
+            root_str = str(root).rstrip(os.sep)
+            if parent == str(root):
+                return self._folder_key(prefix, ".")
+            if parent.startswith(root_str + os.sep):
+                return self._folder_key(prefix, parent[len(root_str) + 1 :])
+        return None
+
+    def _is_excluded(
+        self, file_path: str, music_roots: Optional[List[Path]] = None
+    ) -> bool:
+        """Whether the scan rules exclude a file (first music root containing it)."""
+        for root in self._music_roots if music_roots is None else music_roots:
+            root_str = str(root).rstrip(os.sep)
+            if file_path.startswith(root_str + os.sep):
+                return self._scan_rules.excludes(file_path[len(root_str) + 1 :])
+        return False
+
+    def _create_executor(self) -> Optional[Executor]:
+        """Create the metadata extraction pool (None means extract inline)."""
+        if self._scan_workers <= 1:
+            return None
+        if self._scan_executor_kind == "process":
+            try:
+                return ScanWorkerPool(self._scan_workers)
+            except (OSError, ValueError, EOFError, RuntimeError) as e:
+                # E.g. no /dev/shm, or the fork server could not start
+                logger.warning(
+                    "Scanner processes unavailable (%s), falling back to threads", e
                 )
+        return ThreadPoolExecutor(
+            max_workers=self._scan_workers, thread_name_prefix="library-scan"
+        )
 
-        with self._lock:
-            self.tracks = tracks
-            self.folder_structure = folder_structure
-            self._music_root = music_root
-            self._rebuild_index()
-            self._save_index()
+    def _record_scan_stats(
+        self, stats: Dict[str, int], elapsed: float, devices: int = 1
+    ) -> None:
+        """Store and log throughput of the last scan so worker counts can be tuned."""
+        files_per_sec = stats["files"] / elapsed if elapsed > 0 else 0.0
+        self._last_scan_stats = {
+            "files": stats["files"],
+            "extracted": stats["extracted"],
+            "moved": stats["moved"],
+            "dirs": stats["dirs"],
+            "dirs_unchanged": stats["dirs_unchanged"],
+            "elapsed": elapsed,
+            "files_per_sec": files_per_sec,
+            "workers": self._scan_workers,
+            "executor": self._scan_executor_kind,
+            "devices": devices,
+        }
+        logger.info(
+            "Library scan finished: %d files (%d extracted, %d moved), "
+            "%d dirs (%d unchanged) in %.2fs, %.1f files/s with %d %s worker(s) "
+            "on each of %d device(s)",
+            stats["files"],
+            stats["extracted"],
+            stats["moved"],
+            stats["dirs"],
+            stats["dirs_unchanged"],
+            elapsed,
+            files_per_sec,
+            self._scan_workers,
+            self._scan_executor_kind,
+            devices,
+        )
+
+    def get_scan_stats(self) -> Dict[str, Any]:
+        """Get throughput statistics of the last completed scan."""
+        return dict(self._last_scan_stats)
 
     def _scan_directory(
         self,
         directory: Path,
         folder_structure: Dict[str, List[TrackMetadata]],
         music_root: Path,
+        executor: Optional[Executor] = None,
+        stats: Optional[Dict[str, int]] = None,
+        dir_cache: Optional[Dict[str, Dict]] = None,
+        full_rescan: bool = False,
+        progress: Optional[_ScanProgress] = None,
+        job: Optional[ScanJob] = None,
+        folder_prefix: str = "",
+        visited: Optional[Dict[Tuple[int, int], str]] = None,
     ) -> List[TrackMetadata]:
-        """Recursively scan a directory for audio files."""
+        """
+        Recursively scan a directory for audio files.
+
+        Files are extracted on ``executor`` while the walk continues; results are
+        merged in walk order.
+        """
         tracks = []
+        if stats is None:
+            stats = self._new_scan_stats()
+        if dir_cache is None:
+            dir_cache = {}
+        # (rel_path, file_str, metadata or pending future, folder cover) in
+        # walk order
+        pending: Deque[
+            Tuple[str, Optional[str], Union[TrackMetadata, Future], Optional[str]]
+        ] = deque()
+        try:
+            device = self._fs.stat(directory).st_dev
+        except OSError:
+            device = 0
+        on_throttle_wait = progress.flush if progress is not None else None
+
+        def merge_ready(block: bool) -> None:
+            """Merge the finished prefix of ``pending`` (everything if block)."""
+            while pending:
+                rel_path, file_str, result, cover = pending[0]
+                if isinstance(result, Future) and not (block or result.done()):
+                    break
+                pending.popleft()
+                try:
+                    metadata = result.result() if isinstance(result, Future) else result
+                except Exception as e:
+                    logger.error("Error processing %s: %s", file_str, e, exc_info=True)
+                    continue
+                relinked = self._link_folder_cover(metadata, cover)
+                tracks.append(metadata)
+                folder_structure[rel_path].append(metadata)
+                if file_str is not None or relinked:
+                    # Freshly extracted or folder cover changed: update cache
+                    self._update_cache(metadata.file_path, metadata)
+                if progress is not None:
+                    progress.add(rel_path, metadata)
 
         try:
-            for root, dirs, files in os.walk(directory):
-                root_path = Path(root)
+            for dir_path, files, unchanged in self._walk_directory(
+                directory, dir_cache, full_rescan, visited
+            ):
+                stats["dirs"] += 1
+                if unchanged:
+                    stats["dirs_unchanged"] += 1
                 # Get relative path from music root for folder structure
                 try:
-                    rel_path = str(root_path.relative_to(music_root))
+                    rel_path = self._folder_key(
+                        folder_prefix, str(dir_path.relative_to(music_root))
+                    )
                 except ValueError:
                     # If not relative, use absolute path
-                    rel_path = str(root_path)
+                    rel_path = str(dir_path)
+                # Looked up once for all the tracks of the directory
+                cover = self._folder_cover(dir_path, dir_cache)
 
+                if not unchanged:
+                    # _needs_rescan stats every file of a changed directory
+                    self._fs.prefetch(str(dir_path / file) for file in files)
                 for file in files:
-                    file_path = root_path / file
-                    if file_path.suffix.lower() in AUDIO_EXTENSIONS:
-                        try:
-                            file_str = str(file_path)
-
-                            # Check if file needs to be rescanned
-                            if self._needs_rescan(file_str):
-                                metadata = TrackMetadata(file_str)
-                                tracks.append(metadata)
-                                folder_structure[rel_path].append(metadata)
-                                # Update cache
-                                self._update_cache(file_str, metadata)
+                    if job is not None:
+                        if job.is_paused and progress is not None:
+                            progress.flush()
+                        job.check()
+                    file_str = str(dir_path / file)
+                    try:
+                        stats["files"] += 1
+
+                        # Unchanged directories skip the per-file stat entirely.
+                        # Files without usable cached metadata are always extracted.
+                        if not unchanged and self._needs_rescan(file_str):
+                            cached_metadata = None
+                        else:
+                            cached_metadata = self._get_cached_metadata(file_str)
+
+                        if cached_metadata is None:
+                            # A moved/renamed file keeps its cached tags
+                            cached_metadata = self._take_moved_entry(file_str)
+                            if cached_metadata is not None:
+                                stats["moved"] += 1
+                                pending.append((rel_path, None, cached_metadata, cover))
+                                continue
+
+                            if job is not None:
+                                size = (
+                                    self._fs.stat(file_str).st_size
+                                    if self._throttle.charges_bytes
+                                    else 0
+                                )
+                                self._throttle.acquire(
+                                    device, size, job.sleep, on_throttle_wait
+                                )
+                            stats["extracted"] += 1
+                            if executor is not None:
+                                pending.append(
+                                    (
+                                        rel_path,
+                                        file_str,
+                                        executor.submit(
+                                            extract_track_metadata, file_str
+                                        ),
+                                        cover,
+                                    )
+                                )
                             else:
-                                # Load from cache
-                                cached_metadata = self._get_cached_metadata(file_str)
-                                if cached_metadata:
-                                    tracks.append(cached_metadata)
-                                    folder_structure[rel_path].append(cached_metadata)
-                        except Exception as e:
-                            logger.error(
-                                "Error processing %s: %s", file_path, e, exc_info=True
-                            )
+                                pending.append(
+                                    (
+                                        rel_path,
+                                        file_str,
+                                        extract_track_metadata(file_str),
+                                        cover,
+                                    )
+                                )
+                        else:
+                            pending.append((rel_path, None, cached_metadata, cover))
+                    except ScanCancelled:
+                        raise
+                    except Exception as e:
+                        logger.error(
+                            "Error processing %s: %s", file_str, e, exc_info=True
+                        )
+
+                merge_ready(block=False)
+                if progress is not None:
+                    progress.maybe_flush()
+                if job is not None and job.checkpoint_due():
+                    self._save_checkpoint()
+        except ScanCancelled:
+            merge_ready(block=False)
+            raise
         except Exception as e:
             logger.error("Error scanning directory %s: %s", directory, e, exc_info=True)
+        finally:
+            # Stats not used now would be stale by the next scan (only this
+            # thread's: other devices may still be walking)
+            self._fs.discard_prefetched()
 
+        merge_ready(block=True)
         return tracks
 
+    def _walk_directory(
+        self,
+        directory: Path,
+        dir_cache: Dict[str, Dict],
+        full_rescan: bool = False,
+        visited: Optional[Dict[Tuple[int, int], str]] = None,
+        rel_dir: str = "",
+    ) -> Iterator[Tuple[Path, List[str], bool]]:
+        """
+        Walk a directory tree, reusing the cached listing of unchanged directories.
+
+        Yields (dir_path, audio_file_names, unchanged) in sorted pre-order, filtered
+        by the scan rules.
+
+        Args:
+            directory: Root of the walk
+            dir_cache: Receives {dir_path: {mtime_ns, files, dirs, links,
+                covers}} for every directory visited
+            full_rescan: List every directory even if its mtime is unchanged
+            visited: (st_dev, st_ino) -> path of directories walked so far;
+                updated as the walk goes
+            rel_dir: Path of ``directory`` relative to its music directory,
+                which the scan rules match against
+        """
+        rules = self._scan_rules
+        if visited is None:
+            visited = {}
+        # (dir_path, path relative to the root for the scan rules)
+        stack = [(directory, rel_dir)]
+        while stack:
+            dir_path, rel_dir = stack.pop()
+            dir_str = str(dir_path)
+            try:
+                st = self._fs.stat(dir_str)
+            except OSError as e:
+                logger.debug("Cannot stat directory %s: %s", dir_str, e)
+                continue
+            first_path = visited.setdefault((st.st_dev, st.st_ino), dir_str)
+            if first_path != dir_str:
+                logger.debug(
+                    "Skipping %s: same directory as %s (symlink loop or duplicate mount)",
+                    dir_str,
+                    first_path,
+                )
+                continue
+            mtime_ns = st.st_mtime_ns
+
+            cached = self._dir_cache.get(dir_str)
+            if (
+                not full_rescan
+                and cached is not None
+                and cached.get("mtime_ns") == mtime_ns
+                # Listings from older indexes did not record symlinked dirs
+                and (not self._follow_symlinks or "links" in cached)
+                # ... nor folder covers
+                and "covers" in cached
+            ):
+                files = cached.get("files", [])
+                subdirs = cached.get("dirs", [])
+                links = cached.get("links", [])
+                covers = cached["covers"]
+                unchanged = True
+            else:
+                files = []
+                subdirs = []
+                links = []
+                covers = []
+                try:
+                    for entry in self._fs.scandir(dir_str):
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirs.append(entry.name)
+                            elif entry.is_symlink() and entry.is_dir():
+                                links.append(entry.name)
+                            elif (
+                                os.path.splitext(entry.name)[1].lower()
+                                in AUDIO_EXTENSIONS
+                                and entry.is_file()
+                            ):
+                                files.append(entry.name)
+                            elif is_folder_cover(entry.name) and entry.is_file():
+                                covers.append(entry.name)
+                        except OSError:
+                            continue
+                except OSError as e:
+                    logger.error("Error listing directory %s: %s", dir_str, e)
+                    continue
+                files.sort()
+                subdirs.sort()
+                links.sort()
+                covers.sort()
+                unchanged = False
+
+            dir_cache[dir_str] = {
+                "mtime_ns": mtime_ns,
+                "files": files,
+                "dirs": subdirs,
+                "links": links,
+                "covers": covers,
+            }
+            if self._follow_symlinks and links:
+                subdirs = sorted(subdirs + links)
+            if rules:
+                files = rules.filter_files(rel_dir, files)
+                subdirs = rules.filter_dirs(rel_dir, subdirs)
+            yield dir_path, files, unchanged
+            self._fs.prefetch(os.path.join(dir_str, name) for name in subdirs)
+            stack.extend(
+                (dir_path / name, os.path.join(rel_dir, name))
+                for name in reversed(subdirs)
+            )
+
+    def _walk_changed_directory(
+        self, dir_path: str
+    ) -> Iterator[Tuple[Path, List[str], bool]]:
+        """
+        Walk a directory the watcher reported, as a scan of its music directory would.
+
+        Yields nothing for an excluded directory or one outside the music directories.
+        """
+        for root in self._music_roots:
+            root_str = str(root).rstrip(os.sep)
+            if dir_path == root_str or dir_path.startswith(root_str + os.sep):
+                break
+        else:
+            return
+        rel_dir = dir_path[len(root_str) + 1 :]
+        if self._scan_rules.excludes_dir(rel_dir):
+            return
+
+        # The walk starts below the music directory: count the ancestors as
+        # walked, so the loop guard sees links back up to them
+        visited: Dict[Tuple[int, int], str] = {}
+        for ancestor in Path(dir_path).parents:
+            if len(str(ancestor)) < len(root_str):
+                break
+            try:
+                st = self._fs.stat(ancestor)
+            except OSError:
+                continue
+            visited[(st.st_dev, st.st_ino)] = str(ancestor)
+        try:
+            yield from self._walk_directory(
+                Path(dir_path), {}, full_rescan=True, visited=visited, rel_dir=rel_dir
+            )
+        finally:
+            self._fs.discard_prefetched()
+
+    @staticmethod
+    def _folder_cover(dir_path: Path, dir_cache: Dict[str, Dict]) -> Optional[str]:
+        """Path of the cover image of a walked directory (see pick_folder_cover)."""
+        listing = dir_cache.get(str(dir_path)) or {}
+        name = pick_folder_cover(listing.get("covers", ()))
+        return str(dir_path / name) if name else None
+
+    def _list_folder_cover(self, dir_path: str) -> Optional[str]:
+        """Path of the cover image of a directory, listing it (see pick_folder_cover)."""
+        try:
+            names = [
+                entry.name
+                for entry in self._fs.scandir(dir_path)
+                if is_folder_cover(entry.name) and entry.is_file()
+            ]
+        except OSError:
+            return None
+        name = pick_folder_cover(names)
+        return os.path.join(dir_path, name) if name else None
+
+    @staticmethod
+    def _link_folder_cover(metadata: TrackMetadata, cover: Optional[str]) -> bool:
+        """
+        Point a track's album_art_path at the cover image of its directory.
+
+        Returns:
+            Whether album_art_path changed
+        """
+        art_path = metadata.album_art_path
+        if art_path == cover:
+            return False
+        if cover is None and not (
+            art_path
+            and os.path.dirname(art_path) == os.path.dirname(metadata.file_path)
+            and is_folder_cover(os.path.basename(art_path))
+        ):
+            return False
+        metadata.album_art_path = cover
+        return True
+
     def _needs_rescan(self, file_path: str) -> bool:
-        """Check if a file needs to be rescanned based on modification time."""
+        """Check if a file needs to be rescanned based on its fingerprint/mtime."""
         try:
-            path = Path(file_path)
-            if not path.exists():
+            try:
+                st = self._fs.stat(file_path)
+            except FileNotFoundError:
                 return False
 
-            mtime = path.stat().st_mtime
-
             # If not in cache, needs scan
-            if file_path not in self._file_cache:
+            cache_entry = self._file_cache.get(file_path)
+            if cache_entry is None:
                 return True
 
-            # If modification time changed, needs rescan
-            cached_mtime = self._file_cache[file_path].get("mtime", 0)
-            if mtime != cached_mtime:
-                return True
+            fingerprint = cache_entry.get("fingerprint")
+            if fingerprint:
+                return (
+                    fingerprint.get("mtime_ns") != st.st_mtime_ns
+                    or fingerprint.get("size") != st.st_size
+                )
 
-            return False
+            # Entries from older indexes: compare modification time only
+            return st.st_mtime != cache_entry.get("mtime", 0)
         except OSError:
             return True
 
+    def _make_fingerprint(self, file_path: str, st: os.stat_result) -> Dict[str, Any]:
+        """Build the identity of a file used to recognize it after a move."""
+        fingerprint: Dict[str, Any] = {
+            "dev": st.st_dev,
+            "ino": st.st_ino,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+        }
+        if self._fingerprint_hash:
+            fingerprint["hash"] = self._content_hash(file_path, st.st_size)
+        return fingerprint
+
+    @staticmethod
+    def _content_hash(file_path: str, size: int) -> Optional[str]:
+        """Hash the head and tail of a file (None if unreadable)."""
+        digest = hashlib.blake2b(digest_size=16)
+        try:
+            with open(file_path, "rb") as f:
+                digest.update(f.read(FINGERPRINT_HASH_BYTES))
+                if size > 2 * FINGERPRINT_HASH_BYTES:
+                    f.seek(-FINGERPRINT_HASH_BYTES, os.SEEK_END)
+                    digest.update(f.read(FINGERPRINT_HASH_BYTES))
+        except OSError:
+            return None
+        return digest.hexdigest()
+
+    def _take_moved_entry(self, file_path: str) -> Optional[TrackMetadata]:
+        """
+        Re-key the cache entry of a file that was moved/renamed to ``file_path``.
+
+        Returns:
+            Metadata for the new path, or None if it is not a known file
+        """
+        try:
+            st = self._fs.stat(file_path)
+        except OSError:
+            return None
+
+        with self._cache_lock:
+            return self._rekey_moved_entry(file_path, st)
+
+    def _rekey_moved_entry(
+        self, file_path: str, st: os.stat_result
+    ) -> Optional[TrackMetadata]:
+        """Body of _take_moved_entry (caller holds _cache_lock)."""
+        if self._moved_lookup is None:
+            self._moved_lookup = {}
+            for path, entry in self._file_cache.items():
+                fingerprint = entry.get("fingerprint")
+                if not fingerprint or not entry.get("metadata"):
+                    continue
+                self._moved_lookup[(fingerprint["dev"], fingerprint["ino"])] = path
+                if fingerprint.get("hash"):
+                    self._moved_lookup[
+                        (
+                            fingerprint["size"],
+                            fingerprint["mtime_ns"],
+                            fingerprint["hash"],
+                        )
+                    ] = path
+
+        old_path = self._moved_lookup.get((st.st_dev, st.st_ino))
+        if old_path is None and self._fingerprint_hash:
+            content_hash = self._content_hash(file_path, st.st_size)
+            old_path = self._moved_lookup.get(
+                (st.st_size, st.st_mtime_ns, content_hash)
+            )
+        if old_path is None or old_path == file_path:
+            return None
+
+        entry = self._file_cache.get(old_path)
+        if entry is None or not entry.get("metadata"):
+            return None
+        fingerprint = entry.get("fingerprint") or {}
+        if (
+            fingerprint.get("size") != st.st_size
+            or fingerprint.get("mtime_ns") != st.st_mtime_ns
+        ):
+            return None
+        if self._fs.lexists(old_path):
+            return None
+        new_fingerprint = self._make_fingerprint(file_path, st)
+        if (
+            fingerprint.get("hash")
+            and new_fingerprint.get("hash") != fingerprint["hash"]
+        ):
+            return None
+
+        metadata_dict = dict(entry["metadata"])
+        metadata_dict["file_path"] = file_path
+        old_art = metadata_dict.get("album_art_path")
+        if old_art and old_art == str(album_art_cache_path(old_path)):
+            new_art = album_art_cache_path(file_path)
+            try:
+                os.replace(old_art, new_art)
+                metadata_dict["album_art_path"] = str(new_art)
+            except OSError as e:
+                logger.debug("Keeping album art of moved file at %s: %s", old_art, e)
+        self.art_store.rekey(old_path, file_path)
+
+        del self._file_cache[old_path]
+        self._removed_files.add(old_path)
+        self._file_cache[file_path] = {
+            "mtime": st.st_mtime,
+            "metadata": metadata_dict,
+            "fingerprint": new_fingerprint,
+        }
+        self._dirty_files.add(file_path)
+        logger.debug("Recognized %s as moved from %s", file_path, old_path)
+        return self._get_cached_metadata(file_path)
+
     def _update_cache(self, file_path: str, metadata: TrackMetadata):
         """Update the cache for a file."""
         try:
-            path = Path(file_path)
-            mtime = path.stat().st_mtime
-            self._file_cache[file_path] = {
-                "mtime": mtime,
+            st = self._fs.stat(file_path)
+            entry = {
+                "mtime": st.st_mtime,
                 "metadata": metadata.to_dict(),
+                "fingerprint": self._make_fingerprint(file_path, st),
             }
         except OSError:
-            pass
+            return
+        with self._cache_lock:
+            self._file_cache[file_path] = entry
+            self._dirty_files.add(file_path)
 
     def _get_cached_metadata(self, file_path: str) -> Optional[TrackMetadata]:
         """Get metadata from cache."""
@@ -215,195 +1328,859 @@ class MusicLibrary:
                 )
         return None
 
-    def _rebuild_index(self):
-        """Rebuild the artist/album index from tracks."""
-        self.artists.clear()
-
-        for track in self.tracks:
-            # Use album artist if available, otherwise artist
-            artist_name = track.album_artist or track.artist or "Unknown Artist"
-            album_name = track.album or "Unknown Album"
+    def _rebuild_index(
+        self, folder_structure: Optional[Dict[str, List[TrackMetadata]]] = None
+    ) -> None:
+        """
+        Rebuild the track store, the artist/album index and the folder tree from tracks.
 
-            self.artists[artist_name][album_name].append(track)
+        Args:
+            folder_structure: Tracks per folder key as a scan grouped them;
+                if None, tracks are grouped by _relative_folder
+        """
+        if len(self._track_by_id) != len(self._id_by_path):
+            # Number the live tracks from 0, dropping removed rows
+            self.tracks = self.tracks
+        tracks = self.tracks
+        if folder_structure is None:
+            folder_structure = self._group_by_folder(tracks)
+        self._indexed_prefixes = self._folder_prefixes
+        self._store = TrackStore.from_tracks(tracks)
+        # New containers throughout: the published snapshot may share the
+        # old ones, and readers must never see them change
+        self.artists = defaultdict(lambda: defaultdict(list))
 
-        # Sort tracks within albums by track number
-        for artist in self.artists:
-            for album in self.artists[artist]:
-                tracks = self.artists[artist][album]
-                tracks.sort(key=lambda t: (t.track_number or 999, t.title or ""))
+        # Group by album artist (or artist) and album, sorted by track number
+        for (artist_name, album_name), ids in self._store.group_ids(
+            "library_artist", "library_album"
+        ).items():
+            self.artists[artist_name][album_name] = [
+                tracks[track_id] for track_id in self._store.sorted_ids(ids)
+            ]
 
         # Sort tracks within folders by track number when available.
-        for folder_path in self.folder_structure:
-            self.folder_structure[folder_path].sort(
-                key=lambda t: (
-                    t.track_number if t.track_number is not None else 999,
-                    (t.title or Path(t.file_path).stem).lower(),
-                    str(t.file_path).lower(),
-                )
-            )
+        self._folder_tree = self._build_folder_tree(
+            {
+                folder_path: sorted(folder_tracks, key=_folder_order_key)
+                for folder_path, folder_tracks in folder_structure.items()
+            }
+        )
+        self._sort_keys = {}
+        self._index_sort_keys(self.artists)
+        self._publish()
+
+    def _index_sort_keys(self, names: Dict[str, Any]) -> None:
+        """Compute sort keys for new artist (and nested album) names."""
+        sort_keys = self._sort_keys
+        for name, albums in names.items():
+            if name not in sort_keys:
+                sort_keys[name] = natural_sort_key(name)
+            if isinstance(albums, dict):
+                self._index_sort_keys(albums)
+
+    def _sort_key(self, name: str) -> Tuple:
+        key = self._sort_keys.get(name)
+        if key is None:
+            key = self._sort_keys[name] = natural_sort_key(name)
+        return key
+
+    def _publish(self) -> None:
+        """Publish the current indexes as a new snapshot (caller holds _lock)."""
+        self._version += 1
+        self._indexes_shared = True
+        self._owned_albums = set()
+        self._snapshot = LibrarySnapshot(
+            self._version,
+            self._folder_tree,
+            self.artists,
+            self._music_roots,
+            self._store,
+            self._track_by_id,
+            self._sort_keys,
+        )
+
+    def _own_indexes(self) -> None:
+        """Copy the shared indexes before a change batch if a snapshot uses them."""
+        if self._indexes_shared:
+            self._store = self._store.copy()
+            self._track_by_id = self._track_by_id.copy()
+            self.artists = defaultdict(lambda: defaultdict(list), self.artists)
+            self._indexes_shared = False
+
+    def _own_albums(self, artist: str) -> Dict[str, List[TrackMetadata]]:
+        """Get an artist's album dict for changing (caller called _own_indexes)."""
+        albums = self.artists.get(artist)
+        if albums is None or artist not in self._owned_albums:
+            albums = self.artists[artist] = defaultdict(list, albums or {})
+            self._owned_albums.add(artist)
+        return albums
+
+    def _group_by_folder(
+        self, tracks: Iterable[TrackMetadata]
+    ) -> Dict[str, List[TrackMetadata]]:
+        """Group tracks by folder_structure key (caller holds _lock)."""
+        folders: Dict[str, List[TrackMetadata]] = defaultdict(list)
+        for track in tracks:
+            rel_path = self._relative_folder(track.file_path)
+            if rel_path is not None:
+                folders[rel_path].append(track)
+        return dict(folders)
+
+    def _apply_index_deltas(
+        self, removed: List[str], updated: List[TrackMetadata]
+    ) -> List[TrackMetadata]:
+        """
+        Remove paths and add/replace tracks in all indexes (caller holds _lock).
+
+        Returns:
+            The removed tracks
+        """
+        removed_tracks = []
+        try:
+            for file_path in removed:
+                track = self._index_remove(file_path)
+                if track is not None:
+                    removed_tracks.append(track)
+            for track in updated:
+                self._index_put(track)
+            consistent = len(self._store) == len(self._id_by_path)
+        except Exception as e:
+            logger.error("Incremental index update failed: %s", e, exc_info=True)
+            consistent = False
+        if not consistent:
+            logger.warning("Library indexes out of sync, rebuilding")
+            self._rebuild_index()
+        elif len(self._track_by_id) > 2 * len(self._id_by_path) + 1000:
+            # Mostly tombstones: compact the store
+            self._rebuild_index()
+        else:
+            self._publish()
+        return removed_tracks
+
+    def _index_remove(self, file_path: str) -> Optional[TrackMetadata]:
+        """Remove one track from all indexes."""
+        track_id = self._id_by_path.pop(file_path, None)
+        if track_id is None:
+            return None
+        track = self._track_by_id[track_id]
+        self._track_list = None
+        self._own_indexes()
+        self._store.remove(track_id)
+        self._track_by_id[track_id] = None
+        self._unindex_track(track)
+        return track
+
+    def _index_put(self, track: TrackMetadata) -> None:
+        """Add a track to all indexes, replacing the track with the same path."""
+        self._own_indexes()
+        track_id = self._id_by_path.get(track.file_path)
+        if track_id is not None:
+            self._unindex_track(self._track_by_id[track_id])
+            self._store.update(track_id, track)
+            self._track_by_id[track_id] = track
+        else:
+            self._id_by_path[track.file_path] = self._store.add(track)
+            self._track_by_id.append(track)
+        self._track_list = None
+
+        artist = track.album_artist or track.artist or UNKNOWN_ARTIST
+        album = track.album or UNKNOWN_ALBUM
+        # Copy on write: lists handed out by getters stay unchanged
+        albums = self._own_albums(artist)
+        album_tracks = list(albums.get(album, ()))
+        bisect.insort(album_tracks, track, key=_album_order_key)
+        albums[album] = album_tracks
+        self._sort_key(artist)
+        self._sort_key(album)
+
+        folder = self._relative_folder(track.file_path)
+        if folder is not None:
+            tracks = list(FolderStructure(self._folder_tree).get(folder, ()))
+            bisect.insort(tracks, track, key=_folder_order_key)
+            self._set_folder_tracks(folder, tracks)
+
+    def _unindex_track(self, track: TrackMetadata) -> None:
+        """Remove a track from the artist/album and folder indexes."""
+        artist = track.album_artist or track.artist or UNKNOWN_ARTIST
+        album = track.album or UNKNOWN_ALBUM
+        albums = self.artists.get(artist)
+        if albums is not None and album in albums:
+            albums = self._own_albums(artist)
+            album_tracks = [t for t in albums[album] if t is not track]
+            if album_tracks:
+                albums[album] = album_tracks
+            else:
+                del albums[album]
+                if not albums:
+                    del self.artists[artist]
+
+        folder = self._relative_folder(track.file_path)
+        folder_tracks = FolderStructure(self._folder_tree).get(folder)
+        if folder_tracks is not None:
+            tracks = [t for t in folder_tracks if t is not track]
+            self._set_folder_tracks(folder, tracks)
+
+    def _set_folder_tracks(self, folder: str, tracks: List[TrackMetadata]) -> None:
+        """Replace a folder's (sorted) tracks, dropping the folder when empty."""
+        parts = Path(folder).parts if folder and folder != "." else ()
+
+        def update(node: Dict[str, Any], depth: int) -> Dict[str, Any]:
+            if depth == len(parts):
+                return {"tracks": tracks, "folders": node["folders"]}
+            name = parts[depth]
+            folders = dict(node["folders"])
+            child = folders.get(name, {"tracks": [], "folders": {}})
+            new_child = update(child, depth + 1)
+            if not (new_child["tracks"] or new_child["folders"]):
+                folders.pop(name, None)
+            elif name in folders:
+                folders[name] = new_child
+            else:
+                folders[name] = new_child
+                folders = dict(sorted(folders.items()))
+            return {"tracks": node["tracks"], "folders": folders}
+
+        self._folder_tree = update(self._folder_tree, 0)
+
+    @staticmethod
+    def _build_folder_tree(
+        folder_structure: Dict[str, List[TrackMetadata]],
+    ) -> Dict[str, Any]:
+        """Nest (already sorted) folders into a tree with sorted subfolders."""
+        root: Dict[str, Any] = {"tracks": [], "folders": {}}
+        for folder_path in sorted(folder_structure):
+            node = root
+            if folder_path and folder_path != ".":
+                for part in Path(folder_path).parts:
+                    folders = node["folders"]
+                    if part not in folders:
+                        folders[part] = {"tracks": [], "folders": {}}
+                    node = folders[part]
+            node["tracks"].extend(folder_structure[folder_path])
+
+        def sort_folders(node: Dict[str, Any]) -> None:
+            node["folders"] = dict(sorted(node["folders"].items()))
+            for child in node["folders"].values():
+                sort_folders(child)
+
+        sort_folders(root)
+        return root
+
+    def get_snapshot(self) -> LibrarySnapshot:
+        """Get the current library snapshot (never blocks)."""
+        return self._snapshot
+
+    def get_version(self) -> int:
+        """
+        Get the library version, which changes whenever tracks change.
+
+        Browse views can poll this and refresh only when it moved.
+        """
+        return self._snapshot.version
+
+    # The getters below read the current snapshot without locking. Lists
+    # they return are shared: treat them as read-only.
 
     def get_artists(self) -> List[str]:
-        """Get list of all artists, sorted."""
-        with self._lock:
-            return sorted(self.artists.keys())
+        """Get list of all artists, in natural order."""
+        return self._snapshot.get_artists()
 
     def get_albums(self, artist: str) -> List[str]:
-        """Get list of albums for an artist, sorted."""
-        with self._lock:
-            if artist in self.artists:
-                return sorted(self.artists[artist].keys())
-            return []
+        """Get list of albums for an artist, in natural order."""
+        return self._snapshot.get_albums(artist)
 
     def get_tracks(
         self, artist: Optional[str] = None, album: Optional[str] = None
-    ) -> List[TrackMetadata]:
-        """Get tracks, optionally filtered by artist and/or album."""
-        with self._lock:
-            if artist and album:
-                if artist in self.artists and album in self.artists[artist]:
-                    return self.artists[artist][album].copy()
-                return []
-            elif artist:
-                tracks = []
-                if artist in self.artists:
-                    for album_tracks in self.artists[artist].values():
-                        tracks.extend(album_tracks)
-                return tracks
-            else:
-                return self.tracks.copy()
+    ) -> Sequence[TrackMetadata]:
+        """
+        Get tracks, optionally filtered by artist and/or album.
+
+        An artist's tracks are listed album by album, in get_albums order.
+        """
+        return self._snapshot.get_tracks(artist, album)
 
     def search(self, query: str) -> List[TrackMetadata]:
         """Search tracks by title, artist, or album."""
-        query_lower = query.lower()
-        results = []
-
-        with self._lock:
-            for track in self.tracks:
-                matches = False
-
-                if track.title and query_lower in track.title.lower():
-                    matches = True
-                if track.artist and query_lower in track.artist.lower():
-                    matches = True
-                if track.album and query_lower in track.album.lower():
-                    matches = True
-                if track.album_artist and query_lower in track.album_artist.lower():
-                    matches = True
+        return self._snapshot.search(query)
 
-                if matches:
-                    results.append(track)
-
-        return results
+    def get_duration_by_artist(self) -> Dict[str, float]:
+        """Get the total known duration (seconds) per album artist or artist."""
+        return self._snapshot.get_duration_by_artist()
 
     def get_track_count(self) -> int:
         """Get total number of tracks."""
-        with self._lock:
-            return len(self.tracks)
+        return self._snapshot.track_count
 
     def is_scanning(self) -> bool:
         """Check if library is currently being scanned."""
         return self._scanning
 
-    def get_folder_structure(self) -> Dict[str, List[TrackMetadata]]:
-        """Get the folder structure of the music library."""
-        with self._lock:
-            return dict(self.folder_structure)
+    def get_folder_structure(self) -> Mapping[str, List[TrackMetadata]]:
+        """Get the folder structure of the music library (read-only)."""
+        return self._snapshot.folder_structure
+
+    def get_folder_tree(self) -> Dict[str, Any]:
+        """
+        Get the folder hierarchy of the library, ready to display (read-only).
+
+        Each node is {"tracks": [...], "folders": {name: node}}.
+        """
+        return self._snapshot.folder_tree
 
     def get_music_root(self) -> Optional[Path]:
-        """Get the root music directory."""
-        with self._lock:
-            return self._music_root
+        """Get the root music directory (the first one if there are several)."""
+        return self._snapshot.music_root
+
+    def get_music_roots(self) -> List[Path]:
+        """Get all music directories of the library, in configured order."""
+        return list(self._snapshot.music_roots)
 
-    def _save_index(self):
-        """Save the library index to disk."""
+    def get_folder_path(self, folder: str) -> Optional[Path]:
+        """Get the directory of a folder_structure key (None if unknown)."""
+        music_roots = self._snapshot.music_roots
+        for root, prefix in self._folder_prefixes:
+            if root not in music_roots:
+                continue
+            if not prefix:
+                return root if folder in ("", ".") else root / folder
+            if folder == prefix:
+                return root
+            if folder.startswith(prefix + os.sep):
+                return root / folder[len(prefix) + 1 :]
+        return None
+
+    def _save_index(self, snapshot: bool = True):
+        """Save the index, and the browse snapshot unless ``snapshot`` is False."""
         try:
-            # Prepare data for serialization
-            index_data = {"version": 1, "file_cache": {}}
-
-            # Convert TrackMetadata objects to dicts for serialization
-            for file_path, cache_entry in self._file_cache.items():
-                index_data["file_cache"][file_path] = {
-                    "mtime": cache_entry.get("mtime", 0),
-                    "metadata": cache_entry.get("metadata", {}),
-                }
+            self._index.save(
+                self._file_cache,
+                self._dir_cache,
+                self._dirty_files,
+                self._removed_files,
+            )
+            self._dirty_files = set()
+            self._removed_files = set()
+        except Exception as e:
+            logger.error("Error saving library index: %s", e, exc_info=True)
+            snapshot = False
+        # Art references of moved tracks (see _rekey_moved_entry)
+        self.art_store.save()
+        if snapshot:
+            self._save_snapshot()
+        else:
+            self._snapshot_file.unlink(missing_ok=True)
+        self._snapshot_outdated = False
 
-            # Write to file atomically
-            temp_file = self._index_file.with_suffix(".tmp")
-            with open(temp_file, "w", encoding="utf-8") as f:
-                json.dump(index_data, f, indent=2, ensure_ascii=False)
+    def _save_delta_index(self) -> None:
+        """
+        Save the index after watcher or validation batches (caller holds _lock).
 
-            # Atomic rename
-            temp_file.replace(self._index_file)
+        The browse snapshot is deleted rather than rewritten.
+        """
+        self._save_index(snapshot=False)
+        self._snapshot_outdated = True
 
+    def save_snapshot(self) -> None:
+        """Rewrite the browse snapshot if small changes deleted it (at shutdown)."""
+        with self._lock:
+            if self._snapshot_outdated:
+                self._snapshot_outdated = False
+                self._save_snapshot()
+
+    def _snapshot_key(
+        self, music_roots: List[Path], prefixes: List[Tuple[Path, str]]
+    ) -> Optional[Dict[str, Any]]:
+        """What a browse snapshot must have been built from to be used."""
+        stamp = self._index.stamp()
+        if stamp is None:
+            return None
+        return {
+            "index": stamp,
+            "index_version": INDEX_VERSION,
+            "music_roots": [str(root) for root in music_roots],
+            # Folder keys start with these
+            "folder_prefixes": [[str(root), prefix] for root, prefix in prefixes],
+            # Sort keys are collated for the locale
+            "collation": locale.setlocale(locale.LC_COLLATE),
+            # Tracks the include/exclude patterns leave out
+            "scan_rules": self._scan_rules.digest(),
+        }
+
+    def _save_snapshot(self) -> None:
+        """Persist the built browse structures (caller holds _lock)."""
+        key = self._snapshot_key(self._music_roots, self._indexed_prefixes)
+        if key is None:
+            return
+        data = {
+            "folder_tree": self._folder_tree,
+            "artists": {
+                artist: dict(albums) for artist, albums in self.artists.items()
+            },
+            "store": self._store,
+            "track_by_id": self._track_by_id,
+            "sort_keys": self._sort_keys,
+        }
+        try:
+            save_snapshot(self._snapshot_file, key, data)
         except Exception as e:
-            logger.error("Error saving library index: %s", e, exc_info=True)
+            logger.error("Error saving library snapshot: %s", e, exc_info=True)
+            self._snapshot_file.unlink(missing_ok=True)
+
+    def _load_snapshot(self, music_roots: List[Path]) -> bool:
+        """Install the browse structures from a snapshot matching the index."""
+        key = self._snapshot_key(music_roots, self._folder_prefixes)
+        data = load_snapshot(self._snapshot_file, key) if key else None
+        if data is None:
+            return False
+        artists = defaultdict(lambda: defaultdict(list))
+        for artist, albums in data["artists"].items():
+            artists[artist] = defaultdict(list, albums)
+        track_by_id = data["track_by_id"]
+        id_by_path = {
+            track.file_path: track_id
+            for track_id, track in enumerate(track_by_id)
+            if track is not None
+        }
+        with self._lock:
+            self._folder_tree = data["folder_tree"]
+            self.artists = artists
+            self._store = data["store"]
+            self._track_by_id = track_by_id
+            self._id_by_path = id_by_path
+            self._track_list = None
+            self._sort_keys = data["sort_keys"]
+            self._indexed_prefixes = self._folder_prefixes
+            self._music_root = music_roots[0] if music_roots else None
+            self._music_roots = music_roots
+            self._publish()
+        return True
 
     def _load_index(self):
-        """Load the library index from disk."""
+        """
+        Load the library index from disk.
+
+        With trust_cache, entries are published first and checked by _validate_cache.
+        """
         try:
-            if not self._index_file.exists():
+            loaded = self._index.load()
+            if loaded is None:
                 return
+            self._file_cache, self._dir_cache = loaded
+            music_roots = self._get_music_dirs()
 
-            with open(self._index_file, "r", encoding="utf-8") as f:
-                index_data = json.load(f)
+            # Cached entries are used unchecked anyway: take the prebuilt
+            # browse structures when they match the index
+            if self._trust_cache and self._load_snapshot(music_roots):
+                return
 
-            # Load file cache
-            if "file_cache" in index_data:
-                self._file_cache = index_data["file_cache"]
+            if self._trust_cache:
+                tracks = self._tracks_from_cache()
             else:
-                self._file_cache = {}
+                tracks = self._validated_tracks_from_cache()
+            if self._scan_rules:
+                # Entries indexed before the patterns changed; the next scan
+                # drops them from the index
+                tracks = [
+                    track
+                    for track in tracks
+                    if not self._is_excluded(track.file_path, music_roots)
+                ]
 
-            # Rebuild tracks and index from cache
-            tracks = []
-            files_to_remove = []
+            with self._lock:
+                self._replace_tracks(tracks, music_roots)
+                if self._trust_cache:
+                    # First start with this index: build the snapshot once
+                    self._save_snapshot()
 
-            for file_path, cache_entry in self._file_cache.items():
-                # Verify file still exists
-                path = Path(file_path)
-                if not path.exists():
-                    files_to_remove.append(file_path)
-                    continue
+        except Exception as e:
+            logger.error("Error loading library index: %s", e, exc_info=True)
+            # If loading fails, start with empty cache
+            self._file_cache = {}
+            self._dir_cache = {}
 
-                # Check if file was modified
-                try:
-                    current_mtime = path.stat().st_mtime
-                    cached_mtime = cache_entry.get("mtime", 0)
-
-                    # Only use cache if file hasn't changed
-                    if current_mtime == cached_mtime:
-                        metadata_dict = cache_entry.get("metadata", {})
-                        if metadata_dict:
-                            try:
-                                metadata = TrackMetadata.from_dict(metadata_dict)
-                                tracks.append(metadata)
-                            except Exception as e:
-                                logger.error(
-                                    "Error loading cached metadata for %s: %s",
-                                    file_path,
-                                    e,
-                                    exc_info=True,
-                                )
-                                # Mark for rescan
-                                cache_entry["mtime"] = 0
-                    else:
-                        # File changed, will be rescanned - clear old metadata
-                        cache_entry["mtime"] = current_mtime
-                        cache_entry["metadata"] = {}
-                except OSError:
-                    # File doesn't exist or can't be accessed, remove from cache
-                    files_to_remove.append(file_path)
+    def _replace_tracks(
+        self, tracks: List[TrackMetadata], music_roots: List[Path]
+    ) -> None:
+        """Replace the library with ``tracks`` and rebuild (caller holds _lock)."""
+        self.tracks = tracks
+        self._music_root = music_roots[0] if music_roots else None
+        self._music_roots = music_roots
+        self._rebuild_index()
+
+    def reattach_roots(self) -> List[Path]:
+        """
+        Bring back music directories whose index shard is dormant (re-plugged drives).
+
+        Returns:
+            The music directories brought back
+        """
+        reattached: List[Path] = []
+        new_tracks: List[TrackMetadata] = []
+        with self._scan_lock:
+            for root in self._index.dormant_roots():
+                loaded = self._index.load_root(root)
+                if loaded is None:
                     continue
+                file_cache, dir_cache, valid = loaded
+                with self._cache_lock:
+                    for path, entry in file_cache.items():
+                        self._file_cache.setdefault(path, entry)
+                    for path, entry in dir_cache.items():
+                        self._dir_cache.setdefault(path, entry)
+                reattached.append(root)
+                logger.info(
+                    "Music directory %s is back (%d cached entries%s)",
+                    root,
+                    len(file_cache),
+                    "" if valid else ", changed since",
+                )
+                if valid:
+                    for file_path in file_cache:
+                        metadata = self._get_cached_metadata(file_path)
+                        if metadata is not None:
+                            new_tracks.append(metadata)
+
+            if new_tracks:
+                music_roots = self._get_music_dirs()
+                with self._lock:
+                    known = self._id_by_path
+                    tracks = list(self.tracks)
+                    tracks.extend(t for t in new_tracks if t.file_path not in known)
+                    self._replace_tracks(tracks, music_roots)
+        if new_tracks and self._event_bus:
+            self._event_bus.publish(
+                EventBus.LIBRARY_TRACKS_UPDATED, {"tracks": new_tracks}
+            )
+        return reattached
+
+    def _tracks_from_cache(self) -> List[TrackMetadata]:
+        """Build tracks from cached metadata without checking the files."""
+        tracks = []
+        for file_path in self._file_cache:
+            metadata = self._get_cached_metadata(file_path)
+            if metadata is not None:
+                tracks.append(metadata)
+        return tracks
+
+    def _validated_tracks_from_cache(self) -> List[TrackMetadata]:
+        """Build tracks from cache, dropping missing files and changed entries."""
+        tracks = []
+        files_to_remove = []
+        stats = self._fs.stat_many(self._file_cache)
+
+        for file_path, cache_entry in self._file_cache.items():
+            # Verify file still exists
+            st = stats.get(file_path)
+            if st is None:
+                files_to_remove.append(file_path)
+                continue
+
+            # Check if file was modified
+            try:
+                current_mtime = st.st_mtime
+                cached_mtime = cache_entry.get("mtime", 0)
+
+                # Only use cache if file hasn't changed
+                if current_mtime == cached_mtime:
+                    metadata_dict = cache_entry.get("metadata", {})
+                    if metadata_dict:
+                        try:
+                            metadata = TrackMetadata.from_dict(metadata_dict)
+                            tracks.append(metadata)
+                        except Exception as e:
+                            logger.error(
+                                "Error loading cached metadata for %s: %s",
+                                file_path,
+                                e,
+                                exc_info=True,
+                            )
+                            # Mark for rescan
+                            cache_entry["mtime"] = 0
+                else:
+                    # File changed, will be rescanned - clear old metadata
+                    cache_entry["mtime"] = current_mtime
+                    cache_entry["metadata"] = {}
+                    self._dirty_files.add(file_path)
+            except OSError:
+                # File doesn't exist or can't be accessed, remove from cache
+                files_to_remove.append(file_path)
+                continue
+
+        # Remove deleted files from cache
+        for file_path in files_to_remove:
+            if file_path in self._file_cache:
+                del self._file_cache[file_path]
+                self._removed_files.add(file_path)
+
+        return tracks
+
+    def _validate_cache(self) -> None:
+        """
+        Check cached entries against the disk after a trust-cache startup.
+
+        Missing files are removed and modified ones re-extracted, in batches of deltas.
+        """
+        changed = False
+        with self._cache_lock:
+            paths = list(self._file_cache)
+
+        for start in range(0, len(paths), VALIDATION_BATCH_SIZE):
+            batch = paths[start : start + VALIDATION_BATCH_SIZE]
+            stats = self._fs.stat_many(batch)
+            removed: List[str] = []
+            updated: List[TrackMetadata] = []
+            covers: Dict[str, Optional[str]] = {}
+            # Watcher batches and reattached roots change the cache too
+            with self._scan_lock, self._cache_lock:
+                for file_path in batch:
+                    cache_entry = self._file_cache.get(file_path)
+                    if cache_entry is None:
+                        continue  # Removed since validation started
+                    st = stats[file_path]
+                    if st is None:
+                        removed.append(file_path)
+                        continue
+                    modified = st.st_mtime != cache_entry.get("mtime", 0)
+                    if modified or not cache_entry.get("metadata"):
+                        metadata = extract_track_metadata(file_path)
+                        dir_path = os.path.dirname(file_path)
+                        if dir_path not in covers:
+                            covers[dir_path] = self._list_folder_cover(dir_path)
+                        self._link_folder_cover(metadata, covers[dir_path])
+                        self._update_cache(file_path, metadata)
+                        updated.append(metadata)
+                    elif "fingerprint" not in cache_entry:
+                        cache_entry["fingerprint"] = self._make_fingerprint(
+                            file_path, st
+                        )
+                        self._dirty_files.add(file_path)
+                        changed = True
 
-            # Remove deleted files from cache
-            for file_path in files_to_remove:
-                if file_path in self._file_cache:
-                    del self._file_cache[file_path]
+                if removed or updated:
+                    self._apply_track_deltas(removed, updated)
+                    changed = True
 
+        if changed:
+            with self._scan_lock, self._lock:
+                self._save_delta_index()
+        logger.debug("Background validation of library index finished")
+
+    def _apply_track_deltas(
+        self, removed: List[str], updated: List[TrackMetadata]
+    ) -> None:
+        """
+        Drop removed paths, replace or add updated tracks, and publish the deltas.
+
+        Used for stale entries found by _validate_cache and for watcher batches.
+        """
+        with self._cache_lock:
+            for file_path in removed:
+                if self._file_cache.pop(file_path, None) is not None:
+                    self._removed_files.add(file_path)
+
+        replaced = {track.file_path for track in updated}
+        with self._lock:
+            # Entries that had no usable cached metadata are new to the view
+            removed_tracks = self._apply_index_deltas(
+                [path for path in removed if path not in replaced], updated
+            )
+            music_root = self._music_root
+            removed_folders = self._group_by_folder(removed_tracks)
+            updated_folders = self._group_by_folder(updated)
+
+        if self._event_bus:
+            if removed_tracks:
+                self._event_bus.publish(
+                    EventBus.LIBRARY_TRACKS_REMOVED,
+                    {
+                        "tracks": removed_tracks,
+                        "music_root": music_root,
+                        "folders": removed_folders,
+                    },
+                )
+            if updated:
+                self._event_bus.publish(
+                    EventBus.LIBRARY_TRACKS_UPDATED,
+                    {
+                        "tracks": updated,
+                        "music_root": music_root,
+                        "folders": updated_folders,
+                    },
+                )
+
+    def start_watching(self) -> None:
+        """Start applying filesystem changes under the music directories live."""
+        if not self._watch_enabled or self._watcher is not None:
+            return
+        music_roots = self._get_music_dirs()
+        if not music_roots:
+            return
+        self._watcher = LibraryWatcher(
+            music_roots,
+            on_changes=self.apply_file_changes,
+            on_poll=self._poll_rescan,
+            # Cover images relink the tracks of their directory
+            extensions=AUDIO_EXTENSIONS.union(FOLDER_COVER_EXTENSIONS),
+            poll_interval=self._watch_poll_interval,
+        )
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        """Stop the filesystem watcher (if running)."""
+        watcher = self._watcher
+        self._watcher = None
+        if watcher is not None:
+            watcher.stop()
+
+    def apply_file_changes(self, changed: Set[str], removed: Set[str]) -> None:
+        """
+        Apply a batch of filesystem changes incrementally.
+
+        Args:
+            changed: Created/modified/moved-to paths (files or directories)
+            removed: Deleted/moved-from paths (files or directories)
+        """
+        with self._scan_lock:
+            # Removed paths are either indexed files or directories (prefixes)
+            removed_files = {path for path in removed if path in self._file_cache}
+            removed_dirs = tuple(
+                path.rstrip(os.sep) + os.sep
+                for path in removed
+                if path not in self._file_cache
+            )
+            if removed_dirs:
+                removed_files.update(
+                    path for path in self._file_cache if path.startswith(removed_dirs)
+                )
+                for dir_path in [
+                    d for d in self._dir_cache if (d + os.sep).startswith(removed_dirs)
+                ]:
+                    del self._dir_cache[dir_path]
+
+            files_to_read = set()
+            for path in changed:
+                if self._fs.is_dir(path):
+                    for dir_path, files, _unchanged in self._walk_changed_directory(
+                        path.rstrip(os.sep)
+                    ):
+                        files_to_read.update(str(dir_path / name) for name in files)
+                elif os.path.splitext(path)[
+                    1
+                ].lower() in AUDIO_EXTENSIONS and self._fs.is_file(path):
+                    files_to_read.add(path)
+            if self._scan_rules:
+                files_to_read = {
+                    path for path in files_to_read if not self._is_excluded(path)
+                }
+            removed_files -= files_to_read
+
+            # Parents' listings changed; make the next scan list them again
+            for path in files_to_read | set(changed) | set(removed):
+                self._dir_cache.pop(os.path.dirname(path), None)
+
+            # Directories whose cover image was added, replaced or deleted
+            cover_dirs = {
+                os.path.dirname(path)
+                for path in set(changed) | set(removed)
+                if is_folder_cover(os.path.basename(path))
+            }
+            covers = {
+                dir_path: self._list_folder_cover(dir_path)
+                for dir_path in cover_dirs
+                | {os.path.dirname(path) for path in files_to_read}
+            }
+
+            updated = []
+            moved = 0
+            self._moved_lookup = None
+            for file_path in sorted(files_to_read):
+                # Renamed/moved files keep their cached tags
+                metadata = self._take_moved_entry(file_path)
+                extracted = metadata is None
+                if extracted:
+                    metadata = extract_track_metadata(file_path)
+                else:
+                    moved += 1
+                cover = covers[os.path.dirname(file_path)]
+                if self._link_folder_cover(metadata, cover) or extracted:
+                    self._update_cache(file_path, metadata)
+                updated.append(metadata)
+            if cover_dirs:
+                # Relink the other tracks of those directories, keeping their tags
+                for file_path in sorted(
+                    path
+                    for path in self._file_cache
+                    if os.path.dirname(path) in cover_dirs
+                    and path not in files_to_read
+                    and path not in removed_files
+                ):
+                    metadata = self._get_cached_metadata(file_path)
+                    cover = covers[os.path.dirname(file_path)]
+                    if metadata is not None and self._link_folder_cover(
+                        metadata, cover
+                    ):
+                        self._update_cache(file_path, metadata)
+                        updated.append(metadata)
+
+            if not (removed_files or updated):
+                return
+            self._apply_track_deltas(sorted(removed_files), updated)
             with self._lock:
-                self.tracks = tracks
-                self._rebuild_index()
+                self._save_delta_index()
+            logger.info(
+                "Library updated from filesystem: %d changed (%d moved), %d removed",
+                len(updated),
+                moved,
+                len(removed_files),
+            )
 
-        except Exception as e:
-            logger.error("Error loading library index: %s", e, exc_info=True)
-            # If loading fails, start with empty cache
-            self._file_cache = {}
+    def _poll_rescan(self) -> None:
+        """
+        Polling fallback: find what changed on disk and apply it like a watcher batch.
+
+        In-place tag edits in directories with an unchanged mtime wait for full_rescan.
+        """
+        if self._scanning:
+            return
+        with self._scan_lock:
+            music_dirs = self._get_music_dirs()
+            dir_cache: Dict[str, Dict] = {}
+            visited: Dict[Tuple[int, int], str] = {}
+            seen: Set[str] = set()
+            changed: Set[str] = set()
+            try:
+                for music_dir in music_dirs:
+                    for dir_path, files, unchanged in self._walk_directory(
+                        music_dir, dir_cache, visited=visited
+                    ):
+                        paths = [str(dir_path / name) for name in files]
+                        if not unchanged:
+                            self._fs.prefetch(paths)
+                        for file_path in paths:
+                            seen.add(file_path)
+                            entry = self._file_cache.get(file_path)
+                            if (
+                                entry is None
+                                or not entry.get("metadata")
+                                or (not unchanged and self._needs_rescan(file_path))
+                            ):
+                                changed.add(file_path)
+            finally:
+                self._fs.discard_prefetched()
+            # Listings are current; apply_file_changes drops the ones it changes
+            self._dir_cache.update(dir_cache)
+
+            roots = tuple(str(root).rstrip(os.sep) + os.sep for root in music_dirs)
+            removed = {
+                file_path
+                for file_path in self._file_cache
+                if file_path not in seen and file_path.startswith(roots)
+            }
+            if changed or removed:
+                self.apply_file_changes(changed, removed)
+
+    def _wait_for_validation(self) -> None:
+        """Block until a background cache validation (if any) has finished."""
+        thread = self._validation_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
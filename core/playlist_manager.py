@@ -375,6 +375,16 @@ class PlaylistManager:
             return self.current_playlist[self.current_index]
         return None
 
+    def get_upcoming_tracks(self, count: int) -> List[TrackMetadata]:
+        """Get up to ``count`` tracks expected to play next (read-only, follows the shuffle queue)."""
+        n = len(self.current_playlist)
+        if self._shuffle_enabled:
+            indices = [i for i in self._shuffle_queue if 0 <= i < n][:count]
+        else:
+            start = self.current_index + 1
+            indices = list(range(start, min(n, start + count)))
+        return [self.current_playlist[i] for i in indices]
+
     def set_current_index(self, index: int) -> None:
         """
         Set the current playing index.
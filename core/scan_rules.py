@@ -0,0 +1,106 @@
+"""Include/exclude rules deciding which files and folders a scan looks at."""
+
+import fnmatch
+import hashlib
+import os
+import re
+from typing import Iterable, List, Optional, Pattern
+
+
+def _compile(patterns: Iterable[str]) -> Optional[Pattern[str]]:
+    """Compile globs into one case-insensitive regex (None if there are none)."""
+    patterns = [pattern for pattern in patterns if pattern]
+    if not patterns:
+        return None
+    return re.compile(
+        "|".join(fnmatch.translate(pattern) for pattern in patterns), re.IGNORECASE
+    )
+
+
+class ScanRules:
+    """
+    Which files and folders under a music directory are scanned.
+
+    All globs are compiled once into a single regex per kind and matched
+    case-insensitively; ``*`` also matches ``/``.
+
+    - ``exclude_dirs``: folder names skipped wherever they appear (their
+      whole subtree is never listed)
+    - ``exclude``: paths relative to the music directory, for files and
+      folders (e.g. ``Podcasts/*`` or ``*.part.mp3``)
+    - ``include``: file names; when given, only matching audio files are
+      indexed
+    """
+
+    def __init__(
+        self,
+        exclude_dirs: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        include: Iterable[str] = (),
+    ) -> None:
+        self._exclude_dirs = _compile(exclude_dirs)
+        self._exclude = _compile(exclude)
+        self._include = _compile(include)
+
+    @classmethod
+    def from_config(cls, config) -> "ScanRules":
+        return cls(
+            exclude_dirs=config.library_exclude_dirs,
+            exclude=config.library_exclude,
+            include=config.library_include,
+        )
+
+    def digest(self) -> str:
+        """Fingerprint of the patterns; changes whenever the rules do."""
+        digest = hashlib.sha1()
+        for regex in (self._exclude_dirs, self._exclude, self._include):
+            digest.update(regex.pattern.encode() if regex is not None else b"")
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def __bool__(self) -> bool:
+        return any((self._exclude_dirs, self._exclude, self._include))
+
+    def skip_dir(self, rel_path: str) -> bool:
+        """Whether the folder at ``rel_path`` (relative to its root) is skipped."""
+        if self._exclude_dirs is not None and self._exclude_dirs.match(
+            os.path.basename(rel_path)
+        ):
+            return True
+        return self._exclude is not None and self._exclude.match(rel_path) is not None
+
+    def skip_file(self, rel_path: str) -> bool:
+        """Whether the audio file at ``rel_path`` (relative to its root) is skipped."""
+        if self._exclude is not None and self._exclude.match(rel_path):
+            return True
+        return (
+            self._include is not None
+            and self._include.match(os.path.basename(rel_path)) is None
+        )
+
+    def filter_files(self, rel_dir: str, names: List[str]) -> List[str]:
+        """The audio files of the folder ``rel_dir`` that are scanned."""
+        return [
+            name for name in names if not self.skip_file(os.path.join(rel_dir, name))
+        ]
+
+    def filter_dirs(self, rel_dir: str, names: List[str]) -> List[str]:
+        """The subfolders of the folder ``rel_dir`` that are descended into."""
+        return [
+            name for name in names if not self.skip_dir(os.path.join(rel_dir, name))
+        ]
+
+    def excludes(self, rel_path: str) -> bool:
+        """Whether a file is skipped, by itself or because a parent folder is."""
+        parent = os.path.dirname(rel_path)
+        if parent and self.excludes_dir(parent):
+            return True
+        return self.skip_file(rel_path)
+
+    def excludes_dir(self, rel_path: str) -> bool:
+        """Whether a folder is skipped, by itself or because a parent folder is."""
+        parts = rel_path.split(os.sep) if rel_path else []
+        return any(
+            self.skip_dir(os.sep.join(parts[:depth]))
+            for depth in range(1, len(parts) + 1)
+        )
@@ -0,0 +1,190 @@
+"""I/O pacing for library scans so they do not starve playback."""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Bytes charged per extracted file at most: tag reads touch the headers and
+# embedded art, not the audio data
+TAG_READ_BYTES = 1024 * 1024
+
+# Seconds of budget that may be used in a burst after an idle period
+BURST_SECONDS = 1.0
+
+# How often an idle-only scan re-checks whether playback stopped
+IDLE_POLL_INTERVAL = 0.5
+
+# Throttle modes reported in scan progress
+MODE_UNLIMITED = "unlimited"  # no budget applies
+MODE_LIMITED = "limited"  # files/bytes budget applies
+MODE_BACKOFF = "backoff"  # playback budget on the playing device applies
+MODE_WAITING_FOR_IDLE = "waiting_for_idle"  # idle-only: paused while playing
+
+
+class ScanThrottle:
+    """
+    Paces tag reads of a scan per device.
+
+    Every file that needs extraction is charged one file and its estimated
+    read size (the file size, capped at TAG_READ_BYTES) against the budgets
+    of the device it lives on. While a track plays from the same device the
+    files/sec budget drops to ``playback_files_per_sec``. In idle-only mode
+    scans wait until playback stops or pauses. A budget of 0 means unlimited.
+    """
+
+    def __init__(
+        self,
+        files_per_sec: float = 0,
+        bytes_per_sec: float = 0,
+        playback_files_per_sec: float = 0,
+        idle_only: bool = False,
+    ) -> None:
+        self._files_per_sec = files_per_sec
+        self._bytes_per_sec = bytes_per_sec
+        self._playback_files_per_sec = playback_files_per_sec
+        self._idle_only = idle_only
+
+        self._lock = threading.Lock()
+        # st_dev -> monotonic time at which the device's budget is free again
+        self._next_free: Dict[int, float] = {}
+        self._playing = False
+        self._playing_device: Optional[int] = None
+        self._mode = MODE_UNLIMITED
+        self._waited = 0.0
+
+    @classmethod
+    def from_config(cls, config) -> "ScanThrottle":
+        return cls(
+            files_per_sec=config.library_scan_max_files_per_sec,
+            bytes_per_sec=config.library_scan_max_bytes_per_sec,
+            playback_files_per_sec=config.library_scan_playback_files_per_sec,
+            idle_only=config.library_scan_idle_only,
+        )
+
+    @property
+    def charges_bytes(self) -> bool:
+        """Whether acquire uses the file size (callers can skip the stat if not)."""
+        return bool(self._bytes_per_sec)
+
+    def on_playback_state(self, data: Optional[dict]) -> None:
+        """EventBus subscriber for PLAYBACK_STATE_CHANGED."""
+        if not data:
+            return
+        playing = data.get("state") == "playing"
+        device = self._device_of(data.get("track")) if playing else None
+        with self._lock:
+            self._playing = playing
+            self._playing_device = device
+
+    def on_track_changed(self, data: Optional[dict]) -> None:
+        """
+        EventBus subscriber for TRACK_CHANGED.
+
+        Published with every CURRENT_INDEX_CHANGED: playback moving on to
+        the next track does not change the playback state, but the new
+        track may live on another device.
+        """
+        device = self._device_of(data.get("track") if data else None)
+        with self._lock:
+            if self._playing:
+                self._playing_device = device
+
+    @staticmethod
+    def _device_of(track: Any) -> Optional[int]:
+        """st_dev of a track's file (None if unknown)."""
+        file_path = getattr(track, "file_path", None)
+        if not file_path:
+            return None
+        try:
+            return os.stat(file_path).st_dev
+        except OSError:
+            return None
+
+    def acquire(
+        self,
+        device: int,
+        size: int,
+        sleep: Callable[[float], None],
+        on_wait: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """
+        Charge one file read on ``device``, sleeping until the budget allows it.
+
+        Args:
+            device: st_dev of the file
+            size: File size in bytes (only used if charges_bytes)
+            sleep: Sleeps for the given seconds (ScanJob.sleep, so waits can
+                be paused and cancelled)
+            on_wait: Called once before an idle-only wait starts (e.g. to
+                publish progress)
+        """
+        notified = False
+        while True:
+            with self._lock:
+                if not (self._idle_only and self._playing):
+                    break
+                self._mode = MODE_WAITING_FOR_IDLE
+            if not notified:
+                logger.debug("Library scan waiting for playback to stop")
+                if on_wait is not None:
+                    on_wait()
+                notified = True
+            sleep(IDLE_POLL_INTERVAL)
+            with self._lock:
+                self._waited += IDLE_POLL_INTERVAL
+
+        with self._lock:
+            files_per_sec = self._files_per_sec
+            mode = MODE_LIMITED if files_per_sec or self._bytes_per_sec else None
+            if (
+                self._playing
+                and self._playback_files_per_sec
+                and device == self._playing_device
+            ):
+                files_per_sec = min(
+                    files_per_sec or self._playback_files_per_sec,
+                    self._playback_files_per_sec,
+                )
+                mode = MODE_BACKOFF
+            self._mode = mode or MODE_UNLIMITED
+            if mode is None:
+                return
+
+            cost = 0.0
+            if files_per_sec:
+                cost = 1.0 / files_per_sec
+            if self._bytes_per_sec:
+                cost = max(cost, min(size, TAG_READ_BYTES) / self._bytes_per_sec)
+            now = time.monotonic()
+            start = max(self._next_free.get(device, 0.0), now - BURST_SECONDS)
+            self._next_free[device] = start + cost
+            delay = start + cost - now
+            if delay > 0:
+                self._waited += delay
+        if delay > 0:
+            sleep(delay)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current throttle state for scan progress."""
+        with self._lock:
+            return {
+                "mode": self._mode,
+                "files_per_sec": self._files_per_sec,
+                "bytes_per_sec": self._bytes_per_sec,
+                "playback_files_per_sec": self._playback_files_per_sec,
+                "idle_only": self._idle_only,
+                "playback_active": self._playing,
+                "waited": round(self._waited, 3),
+            }
+
+    def reset(self) -> None:
+        """Forget budgets and wait time (called when a scan starts)."""
+        with self._lock:
+            self._next_free.clear()
+            self._waited = 0.0
+            self._mode = MODE_UNLIMITED
@@ -0,0 +1,269 @@
+"""Scanner worker processes: tag parsing outside the GTK process."""
+
+import itertools
+import multiprocessing
+import pickle
+import queue
+import threading
+from concurrent.futures import Executor, Future
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.logging import get_logger
+from core.metadata import TrackMetadata
+
+logger = get_logger(__name__)
+
+# Most tasks sent to a worker in one message
+TASK_BATCH_SIZE = 64
+
+# Most results a worker collects before sending them (it also sends
+# whenever it runs out of tasks)
+RESULT_BATCH_SIZE = 32
+
+# Seconds to wait for a worker to exit at shutdown before killing it
+SHUTDOWN_TIMEOUT = 5.0
+
+# How worker processes are started: not forked, so they don't inherit the
+# locks held by the player's GTK, GStreamer and D-Bus threads
+START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+_TRACK_FIELDS = TrackMetadata.__slots__
+
+
+class ScanWorkerError(RuntimeError):
+    """A scanner worker process exited before finishing a task."""
+
+
+def extract_track_metadata(file_path: str) -> TrackMetadata:
+    """Scan task: read the tags of one file."""
+    return TrackMetadata(file_path)
+
+
+def _pack(result: Any) -> Tuple[bool, Any]:
+    """Compact form of a task result (TrackMetadata as a tuple of its fields)."""
+    if isinstance(result, TrackMetadata):
+        return True, tuple(getattr(result, field) for field in _TRACK_FIELDS)
+    return False, result
+
+
+def _unpack(packed: Tuple[bool, Any]) -> Any:
+    is_track, value = packed
+    if not is_track:
+        return value
+    metadata = TrackMetadata.__new__(TrackMetadata)
+    for field, field_value in zip(_TRACK_FIELDS, value):
+        setattr(metadata, field, field_value)
+    # Interned strings are per process
+    metadata._intern_fields()
+    return metadata
+
+
+def _picklable(error: BaseException) -> BaseException:
+    try:
+        pickle.dumps(error)
+    except Exception:
+        return RuntimeError(repr(error))
+    return error
+
+
+def _worker_main(conn: Connection, parent_conn: Connection) -> None:
+    """Worker process loop: run batches of (task_id, fn, args) until a None message."""
+    # Only the parent may hold the other end, or its exit goes unnoticed
+    parent_conn.close()
+    results: List[Tuple[int, bool, Any]] = []
+    while True:
+        if results and not conn.poll():
+            conn.send(results)
+            results = []
+        try:
+            tasks = conn.recv()
+        except (EOFError, OSError):
+            return
+        if tasks is None:
+            if results:
+                conn.send(results)
+            return
+        for task_id, fn, args in tasks:
+            try:
+                results.append((task_id, True, _pack(fn(*args))))
+            except Exception as e:
+                results.append((task_id, False, _picklable(e)))
+            if len(results) >= RESULT_BATCH_SIZE:
+                conn.send(results)
+                results = []
+
+
+class _Worker:
+    """One worker process with the threads feeding and draining its pipe."""
+
+    def __init__(self, context, name: str) -> None:
+        self.name = name
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, self.conn),
+            name=name,
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.lock = threading.Lock()
+        self.outstanding: Dict[int, Future] = {}
+        self.alive = True
+        self._tasks: "queue.Queue[Optional[Tuple[int, Callable, tuple]]]" = (
+            queue.Queue()
+        )
+        self._sender = threading.Thread(
+            target=self._send_loop, name=f"{name}-send", daemon=True
+        )
+        self._receiver = threading.Thread(
+            target=self._receive_loop, name=f"{name}-receive", daemon=True
+        )
+        self._sender.start()
+        self._receiver.start()
+
+    def submit(self, task_id: int, future: Future, fn: Callable, args: tuple) -> None:
+        with self.lock:
+            if not self.alive:
+                future.set_exception(ScanWorkerError(f"{self.name} is not running"))
+                return
+            self.outstanding[task_id] = future
+        self._tasks.put((task_id, fn, args))
+
+    def load(self) -> int:
+        with self.lock:
+            return len(self.outstanding)
+
+    def _send_loop(self) -> None:
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+            batch = [task]
+            stop = False
+            while len(batch) < TASK_BATCH_SIZE:
+                try:
+                    task = self._tasks.get_nowait()
+                except queue.Empty:
+                    break
+                if task is None:
+                    stop = True
+                    break
+                batch.append(task)
+            try:
+                self.conn.send(batch)
+            except Exception as e:
+                logger.debug("Cannot send to %s: %s", self.name, e)
+                self._fail(ScanWorkerError(f"{self.name} is not running"))
+                return
+            if stop:
+                break
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+
+    def _receive_loop(self) -> None:
+        while True:
+            try:
+                results = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            for task_id, ok, value in results:
+                with self.lock:
+                    future = self.outstanding.pop(task_id, None)
+                if future is None or not future.set_running_or_notify_cancel():
+                    continue
+                if ok:
+                    future.set_result(_unpack(value))
+                else:
+                    future.set_exception(value)
+        self._fail(ScanWorkerError(f"{self.name} exited"))
+
+    def _fail(self, error: Exception) -> None:
+        """Mark the worker dead and fail what it was still working on."""
+        with self.lock:
+            self.alive = False
+            futures = list(self.outstanding.values())
+            self.outstanding.clear()
+        for future in futures:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+    def cancel_outstanding(self) -> None:
+        with self.lock:
+            futures = list(self.outstanding.values())
+        for future in futures:
+            future.cancel()
+
+    def stop(self, wait: bool, kill: bool) -> None:
+        self._tasks.put(None)
+        if kill:
+            self.process.terminate()
+        if wait:
+            self.process.join(SHUTDOWN_TIMEOUT)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+            self._receiver.join()
+
+
+class ScanWorkerPool(Executor):
+    """
+    Runs scan tasks in long-lived worker processes, batching tasks and results per pipe.
+
+    A worker that dies fails only its own outstanding tasks with ScanWorkerError.
+    """
+
+    def __init__(self, max_workers: int, mp_context=None) -> None:
+        if mp_context is None:
+            mp_context = multiprocessing.get_context(START_METHOD)
+            if START_METHOD == "forkserver":
+                # Instead of the default ["__main__"], which imports the GTK
+                # application into the server (only effective before the
+                # server starts)
+                mp_context.set_forkserver_preload([__name__])
+        self._context = mp_context
+        self._lock = threading.Lock()
+        self._task_ids = itertools.count()
+        self._shutdown = False
+        self._names = itertools.count(1)
+        self._workers: List[_Worker] = []
+        try:
+            for _ in range(max(1, max_workers)):
+                self._workers.append(self._start_worker())
+        except BaseException:
+            # Don't leave the workers that did start behind
+            self.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    def _start_worker(self) -> _Worker:
+        return _Worker(self._context, f"library-scan-worker-{next(self._names)}")
+
+    def submit(self, fn: Callable, /, *args: Any, **kwargs: Any) -> Future:
+        if kwargs:
+            raise TypeError("ScanWorkerPool does not support keyword arguments")
+        future: Future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new tasks after shutdown")
+            for index, worker in enumerate(self._workers):
+                if not worker.alive:
+                    logger.warning("Restarting %s", worker.name)
+                    worker.stop(wait=False, kill=True)
+                    self._workers[index] = self._start_worker()
+            worker = min(self._workers, key=_Worker.load)
+            worker.submit(next(self._task_ids), future, fn, args)
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._lock:
+            self._shutdown = True
+            workers = list(self._workers)
+        for worker in workers:
+            if cancel_futures:
+                worker.cancel_outstanding()
+            worker.stop(wait, kill=cancel_futures)
@@ -0,0 +1,191 @@
+"""Single-pass readers mapping each mutagen tag container to track fields."""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from mutagen._vorbis import VCommentDict
+from mutagen.apev2 import APEv2
+from mutagen.asf import ASFTags
+from mutagen.id3 import ID3
+from mutagen.mp4 import MP4Tags
+
+# Fields read from tags; "track" is the raw track number text ("3", "3/12")
+FIELDS = ("title", "artist", "album", "album_artist", "genre", "year", "track")
+
+# Container key -> (field, rank). Several keys can feed one field; the
+# lowest rank present with a non-empty value wins (same precedence as the
+# key lists TrackMetadata tried one by one before).
+KeyTable = Dict[str, Tuple[str, int]]
+
+
+def _table(fields: Dict[str, List[str]]) -> KeyTable:
+    return {
+        key: (field, rank)
+        for field, keys in fields.items()
+        for rank, key in enumerate(keys)
+    }
+
+
+# ID3v2 frame IDs (v2.2/v2.3 frames are upgraded to v2.4 by mutagen)
+ID3_KEYS = _table(
+    {
+        "title": ["TIT2", "TIT1"],
+        "artist": ["TPE1"],
+        "album": ["TALB"],
+        "album_artist": ["TPE2"],
+        "genre": ["TCON"],
+        "year": ["TDRC", "TDRL", "TDOR"],
+        "track": ["TRCK"],
+    }
+)
+
+# Vorbis comments (FLAC, Ogg Vorbis/Opus/FLAC/Speex), upper-cased
+VORBIS_KEYS = _table(
+    {
+        "title": ["TITLE"],
+        "artist": ["ARTIST"],
+        "album": ["ALBUM"],
+        "album_artist": ["ALBUMARTIST", "ALBUM ARTIST"],
+        "genre": ["GENRE"],
+        "year": ["DATE", "YEAR"],
+        "track": ["TRACKNUMBER", "TRACK"],
+    }
+)
+
+# iTunes MP4 atoms
+MP4_KEYS = _table(
+    {
+        "title": ["\xa9nam"],
+        "artist": ["\xa9ART"],
+        "album": ["\xa9alb"],
+        "album_artist": ["aART"],
+        "genre": ["\xa9gen"],
+        "year": ["\xa9day"],
+        "track": ["trkn"],
+    }
+)
+
+# ASF (WMA) attributes
+ASF_KEYS = _table(
+    {
+        "title": ["Title"],
+        "artist": ["Author", "WM/Composer"],
+        "album": ["WM/AlbumTitle"],
+        "album_artist": ["WM/AlbumArtist"],
+        "genre": ["WM/Genre"],
+        "year": ["WM/Year", "WM/OriginalReleaseYear"],
+        "track": ["WM/TrackNumber", "WM/Track"],
+    }
+)
+
+# APEv2 items (Monkey's Audio, WavPack, Musepack), upper-cased
+APE_KEYS = _table(
+    {
+        "title": ["TITLE"],
+        "artist": ["ARTIST"],
+        "album": ["ALBUM"],
+        "album_artist": ["ALBUM ARTIST", "ALBUMARTIST"],
+        "genre": ["GENRE"],
+        "year": ["YEAR", "DATE"],
+        "track": ["TRACK", "TRACKNUMBER"],
+    }
+)
+
+
+def first_text(value: Any) -> Optional[str]:
+    """
+    First value of a tag as stripped text (None if empty).
+
+    Takes the first element of lists and tuples (MP4 ``trkn`` is a list of
+    (number, total) tuples), unwraps ID3 frames and ASF attributes, decodes
+    bytes and cuts APE multi-values at the first NUL.
+    """
+    if isinstance(value, list):
+        if not value:
+            return None
+        value = value[0]
+    if isinstance(value, tuple):
+        if not value:
+            return None
+        value = value[0]
+    text = getattr(value, "text", None)  # ID3 text frames
+    if isinstance(text, list):
+        if not text:
+            return None
+        value = text[0]
+    elif hasattr(value, "value") and not isinstance(value, (str, bytes)):
+        value = value.value  # ASF attributes, APE values
+    if isinstance(value, bytes):
+        value = value.decode("utf-8", errors="ignore")
+    result = str(value).split("\0", 1)[0].strip()
+    return result or None
+
+
+def _map_items(
+    items: Iterable[Tuple[str, Any]], table: KeyTable, upper: bool
+) -> Dict[str, str]:
+    """Map (key, value) pairs to fields in one pass."""
+    fields: Dict[str, str] = {}
+    ranks: Dict[str, int] = {}
+    for key, value in items:
+        entry = table.get(key.upper() if upper else key)
+        if entry is None:
+            continue
+        field, rank = entry
+        if rank >= ranks.get(field, len(table)):
+            continue
+        text = first_text(value)
+        if text is not None:
+            fields[field] = text
+            ranks[field] = rank
+    return fields
+
+
+def _read_id3(tags: ID3) -> Dict[str, str]:
+    return _map_items(
+        ((frame.FrameID, frame) for frame in tags.values()), ID3_KEYS, upper=False
+    )
+
+
+def _read_vorbis(tags: VCommentDict) -> Dict[str, str]:
+    # A list of (key, value) pairs; repeated keys come in file order
+    return _map_items(tags, VORBIS_KEYS, upper=True)
+
+
+def _read_mp4(tags: MP4Tags) -> Dict[str, str]:
+    return _map_items(tags.items(), MP4_KEYS, upper=False)
+
+
+def _read_asf(tags: ASFTags) -> Dict[str, str]:
+    return _map_items(tags, ASF_KEYS, upper=False)
+
+
+def _read_ape(tags: APEv2) -> Dict[str, str]:
+    return _map_items(tags.items(), APE_KEYS, upper=True)
+
+
+_READERS: List[Tuple[type, Callable[[Any], Dict[str, str]]]] = [
+    (ID3, _read_id3),
+    (VCommentDict, _read_vorbis),
+    (MP4Tags, _read_mp4),
+    (ASFTags, _read_asf),
+    (APEv2, _read_ape),
+]
+
+
+def read_tags(tags: Any) -> Optional[Dict[str, str]]:
+    """
+    Read the track fields (see FIELDS) from a mutagen tag container.
+
+    Walks the container once and looks every key up in the table of its
+    format, instead of probing each possible key of every format.
+
+    Returns:
+        Field -> text for the fields present ({} for no tags), or None if
+        the container type has no reader (callers fall back to probing)
+    """
+    if tags is None:
+        return {}
+    for container, reader in _READERS:
+        if isinstance(tags, container):
+            return reader(tags)
+    return None
@@ -0,0 +1,323 @@
+"""Columnar index of library tracks for searching, grouping and aggregation."""
+
+import math
+from array import array
+from collections import defaultdict
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from core.metadata import TrackMetadata
+
+UNKNOWN_ARTIST = "Unknown Artist"
+UNKNOWN_ALBUM = "Unknown Album"
+
+# Code stored in a string column for a missing value
+NO_CODE = -1
+# Stored in the track number column for a missing value
+NO_NUMBER = -(2**63)
+
+# Dictionary-encoded columns: the searched fields, and the names tracks are
+# grouped under in the browser (album artist, artist, or unknown).
+STRING_FIELDS = (
+    "artist",
+    "album",
+    "album_artist",
+    "library_artist",
+    "library_album",
+)
+# Fields matched by search
+SEARCH_FIELDS = ("title", "artist", "album", "album_artist")
+
+# Rows per chunk of a ChunkedColumn (a power of two)
+CHUNK_SHIFT = 12
+CHUNK_SIZE = 1 << CHUNK_SHIFT
+CHUNK_MASK = CHUNK_SIZE - 1
+
+
+class ChunkedColumn:
+    """
+    Append-only column of values in fixed-size chunks that copies share until written.
+    """
+
+    __slots__ = ("typecode", "_chunks", "_owned", "_length")
+
+    def __init__(self, typecode: Optional[str] = None) -> None:
+        self.typecode = typecode
+        self._chunks: List[Any] = []
+        # Chunks only this column refers to
+        self._owned: Set[int] = set()
+        self._length = 0
+
+    @classmethod
+    def from_values(
+        cls, values: Iterable[Any], typecode: Optional[str] = None
+    ) -> "ChunkedColumn":
+        column = cls(typecode)
+        column.extend(values)
+        return column
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[Any]:
+        return chain.from_iterable(self._chunks)
+
+    def __getitem__(self, index: int) -> Any:
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return self._chunks[index >> CHUNK_SHIFT][index & CHUNK_MASK]
+
+    def __setitem__(self, index: int, value: Any) -> None:
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        self._own_chunk(index >> CHUNK_SHIFT)[index & CHUNK_MASK] = value
+
+    def take(self, indexes: Iterable[int]) -> List[Any]:
+        """Values at the given indexes (without a method call per value)."""
+        chunks = self._chunks
+        return [chunks[index >> CHUNK_SHIFT][index & CHUNK_MASK] for index in indexes]
+
+    def append(self, value: Any) -> None:
+        if not self._length & CHUNK_MASK:
+            self._chunks.append(array(self.typecode) if self.typecode else [])
+            self._owned.add(len(self._chunks) - 1)
+        self._own_chunk(len(self._chunks) - 1).append(value)
+        self._length += 1
+
+    def extend(self, values: Iterable[Any]) -> None:
+        values = list(values)
+        start = 0
+        while start < len(values):
+            if not self._length & CHUNK_MASK:
+                self._chunks.append(array(self.typecode) if self.typecode else [])
+                self._owned.add(len(self._chunks) - 1)
+            end = start + CHUNK_SIZE - (self._length & CHUNK_MASK)
+            chunk = self._own_chunk(len(self._chunks) - 1)
+            chunk.extend(values[start:end])
+            self._length += len(values[start:end])
+            start = end
+
+    def copy(self) -> "ChunkedColumn":
+        """Copy sharing all chunks until one of the columns writes to them."""
+        column = ChunkedColumn(self.typecode)
+        column._chunks = list(self._chunks)
+        column._length = self._length
+        self._owned = set()
+        return column
+
+    def _own_chunk(self, number: int) -> Any:
+        chunk = self._chunks[number]
+        if number not in self._owned:
+            chunk = self._chunks[number] = chunk[:]
+            self._owned.add(number)
+        return chunk
+
+
+class StringColumn:
+    """
+    String column stored as int codes into an append-only table of distinct values.
+    """
+
+    __slots__ = ("values", "codes", "_code_by_value")
+
+    def __init__(self) -> None:
+        self.values: List[str] = []
+        self.codes = ChunkedColumn("i")
+        self._code_by_value: Dict[str, int] = {}
+
+    def encode(self, value: Optional[str]) -> int:
+        """Get the code of a value, adding it to the table if it is new."""
+        if value is None:
+            return NO_CODE
+        code = self._code_by_value.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._code_by_value[value] = code
+        return code
+
+    def copy(self) -> "StringColumn":
+        column = StringColumn()
+        column.values = self.values
+        column.codes = self.codes.copy()
+        column._code_by_value = self._code_by_value
+        return column
+
+    def decode(self, code: int) -> Optional[str]:
+        return None if code == NO_CODE else self.values[code]
+
+    def matching_codes(self, query_lower: str) -> Set[int]:
+        """Codes of the distinct values containing query_lower (case-insensitive)."""
+        return {
+            code
+            for code, value in enumerate(self.values)
+            if query_lower in value.lower()
+        }
+
+
+class TrackStore:
+    """
+    Column-oriented index of the queried track fields, addressed by integer track ids.
+
+    Track ids are row numbers; removed rows are tombstoned and their id is never reused.
+    """
+
+    def __init__(self) -> None:
+        self.titles = ChunkedColumn()
+        self.track_numbers = ChunkedColumn("q")
+        self.durations = ChunkedColumn("d")  # NaN when unknown
+        self.strings: Dict[str, StringColumn] = {
+            field: StringColumn() for field in STRING_FIELDS
+        }
+        self._alive = ChunkedColumn("B")
+        self._live_count = 0
+
+    @classmethod
+    def from_tracks(cls, tracks: Iterable[TrackMetadata]) -> "TrackStore":
+        """Build a store whose ids follow the order of ``tracks``."""
+        store = cls()
+        rows = [store._encode_row(track) for track in tracks]
+        if rows:
+            titles, numbers, durations, *codes = zip(*rows)
+            store.titles.extend(titles)
+            store.track_numbers.extend(numbers)
+            store.durations.extend(durations)
+            for column, column_codes in zip(store.strings.values(), codes):
+                column.codes.extend(column_codes)
+            store._alive.extend([1] * len(rows))
+            store._live_count = len(rows)
+        return store
+
+    def __len__(self) -> int:
+        return self._live_count
+
+    def copy(self) -> "TrackStore":
+        """Independent copy of the store (column chunks are copied on write)."""
+        store = TrackStore()
+        store.titles = self.titles.copy()
+        store.track_numbers = self.track_numbers.copy()
+        store.durations = self.durations.copy()
+        store.strings = {field: column.copy() for field, column in self.strings.items()}
+        store._alive = self._alive.copy()
+        store._live_count = self._live_count
+        return store
+
+    # Row maintenance
+
+    def add(self, track: TrackMetadata) -> int:
+        """Append a track and return its id."""
+        track_id = len(self._alive)
+        title, number, duration, *codes = self._encode_row(track)
+        self.titles.append(title)
+        self.track_numbers.append(number)
+        self.durations.append(duration)
+        for column, code in zip(self.strings.values(), codes):
+            column.codes.append(code)
+        self._alive.append(1)
+        self._live_count += 1
+        return track_id
+
+    def update(self, track_id: int, track: TrackMetadata) -> None:
+        """Overwrite a row in place with new metadata for the same id."""
+        title, number, duration, *codes = self._encode_row(track)
+        self.titles[track_id] = title
+        self.track_numbers[track_id] = number
+        self.durations[track_id] = duration
+        for column, code in zip(self.strings.values(), codes):
+            column.codes[track_id] = code
+
+    def remove(self, track_id: int) -> None:
+        """Tombstone a row; its id stays unused."""
+        if not self._alive[track_id]:
+            return
+        self._alive[track_id] = 0
+        self._live_count -= 1
+        self.titles[track_id] = None
+
+    def _encode_row(self, track: TrackMetadata) -> Tuple[Any, ...]:
+        """
+        A track's column values: title, track number, duration, then the
+        codes of the string columns in STRING_FIELDS order.
+        """
+        values = {
+            "artist": track.artist,
+            "album": track.album,
+            "album_artist": track.album_artist,
+            "library_artist": track.album_artist or track.artist or UNKNOWN_ARTIST,
+            "library_album": track.album or UNKNOWN_ALBUM,
+        }
+        return (
+            track.title,
+            self._encode_number(track.track_number),
+            math.nan if track.duration is None else float(track.duration),
+            *(self.strings[field].encode(values[field]) for field in STRING_FIELDS),
+        )
+
+    @staticmethod
+    def _encode_number(value: Optional[int]) -> int:
+        if value is None or not NO_NUMBER < value < 2**63:
+            return NO_NUMBER
+        return value
+
+    # Column operations
+
+    def search(self, query: str) -> List[int]:
+        """Ids whose title, artist, album or album artist contain query."""
+        query_lower = query.lower()
+        hits = [bool(title) and query_lower in title.lower() for title in self.titles]
+        for field in SEARCH_FIELDS:
+            if field in self.strings:
+                column = self.strings[field]
+                matched = column.matching_codes(query_lower)
+                # Only look at the rows of columns with a matching value
+                if matched:
+                    for track_id, code in enumerate(column.codes):
+                        if code in matched:
+                            hits[track_id] = True
+        return [
+            track_id
+            for track_id, (hit, alive) in enumerate(zip(hits, self._alive))
+            if hit and alive
+        ]
+
+    def sorted_ids(self, ids: Iterable[int], missing_number: int = 999) -> List[int]:
+        """
+        Sort ids in album order: track number, then title.
+
+        Missing (or zero) track numbers sort as ``missing_number``.
+        """
+        # Index the chunks directly: a method call per lookup would double
+        # the cost of the sort
+        numbers = self.track_numbers._chunks
+        titles = self.titles._chunks
+
+        def key(track_id: int) -> Tuple[int, str]:
+            chunk, row = track_id >> CHUNK_SHIFT, track_id & CHUNK_MASK
+            number = numbers[chunk][row]
+            if number == NO_NUMBER or number == 0:
+                number = missing_number
+            return number, titles[chunk][row] or ""
+
+        return sorted(ids, key=key)
+
+    def group_ids(self, *fields: str) -> Dict[Tuple[Optional[str], ...], List[int]]:
+        """Group live ids by the values of string columns (first-seen order)."""
+        columns = [self.strings[field] for field in fields]
+        groups: Dict[Tuple[int, ...], List[int]] = defaultdict(list)
+        rows = zip(self._alive, zip(*(column.codes for column in columns)))
+        for track_id, (alive, codes) in enumerate(rows):
+            if alive:
+                groups[codes].append(track_id)
+        return {
+            tuple(column.decode(code) for column, code in zip(columns, codes)): ids
+            for codes, ids in groups.items()
+        }
+
+    def total_duration_by(self, field: str) -> Dict[Optional[str], float]:
+        """Sum of known durations per value of a string column."""
+        column = self.strings[field]
+        totals: Dict[int, float] = defaultdict(float)
+        for alive, code, duration in zip(self._alive, column.codes, self.durations):
+            if alive and not math.isnan(duration):
+                totals[code] += duration
+        return {column.decode(code): total for code, total in totals.items()}
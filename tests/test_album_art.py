@@ -0,0 +1,186 @@
+"""Tests for on-demand album art extraction."""
+
+from pathlib import Path
+
+import pytest
+
+from benchmarks.synthetic_library import FORMATS, TRACKS_PER_ALBUM, generate_library
+from core.album_art import AlbumArt, AlbumArtPrefetcher
+from core.config import Config
+from core.events import EventBus
+from core.metadata import TrackMetadata
+from core.playlist_manager import PlaylistManager
+
+
+@pytest.fixture
+def library(temp_dir, monkeypatch):
+    """One album per format with embedded covers; config in a temporary XDG tree."""
+    monkeypatch.setenv('XDG_CONFIG_HOME', str(temp_dir / 'config'))
+    monkeypatch.setenv('XDG_CACHE_HOME', str(temp_dir / 'cache'))
+    monkeypatch.setenv('XDG_DATA_HOME', str(temp_dir / 'data'))
+    Config._instance = None
+    root = temp_dir / 'music'
+    generate_library(root, TRACKS_PER_ALBUM * len(FORMATS))
+    yield root
+    Config._instance = None
+
+
+def _tracks(root: Path, suffix: str):
+    return [TrackMetadata(str(path)) for path in sorted(root.rglob(f'*.{suffix}'))]
+
+
+class TestAlbumArt:
+    """Test AlbumArt and AlbumArtPrefetcher."""
+
+    def test_scan_records_art_without_extracting(self, library):
+        """Test reading metadata notes embedded art but writes no image."""
+        for fmt in FORMATS:
+            track = _tracks(library, fmt)[0]
+            assert track.embedded_art, fmt
+            assert track.album_art_path is None
+
+        assert not any(Config.get_instance().album_art_cache_dir.iterdir())
+
+    def test_art_is_extracted_on_demand(self, library):
+        """Test each format's cover is extracted once, when asked for."""
+        album_art = AlbumArt()
+        try:
+            for fmt in FORMATS:
+                track = _tracks(library, fmt)[0]
+                assert album_art.cached(track) is None
+                assert album_art.needs_extraction(track)
+
+                art_path = album_art.get(track)
+
+                data = Path(art_path).read_bytes()
+                assert data.startswith(b'\xff\xd8') and data.endswith(b'\xff\xd9'), fmt
+                assert not album_art.needs_extraction(track)
+                assert album_art.cached(track) == art_path
+        finally:
+            album_art.close()
+
+    def test_album_shares_one_image_across_sessions(self, library):
+        """Test an album's covers are stored once and found after a restart."""
+        tracks = _tracks(library, 'mp3')
+        album_art = AlbumArt()
+        paths = {album_art.get(track) for track in tracks}
+        album_art.close()
+
+        art_dir = Config.get_instance().album_art_cache_dir
+        assert len(paths) == 1
+        assert len([p for p in art_dir.iterdir() if p.suffix == '.jpg']) == 1
+        restarted = AlbumArt()
+        try:
+            assert restarted.cached(tracks[3]) == paths.pop()
+            assert not restarted.needs_extraction(tracks[3])
+        finally:
+            restarted.close()
+
+    def test_folder_cover_takes_precedence_over_embedded_art(self, library, monkeypatch):
+        """Test tracks next to a cover image use it without opening the audio file."""
+        from core import album_art as album_art_module
+        from core.music_library import MusicLibrary
+
+        Config.get_instance().set('library', 'music_dirs', str(library))
+        cover = Path(_tracks(library, 'mp3')[0].file_path).parent / 'Cover.JPG'
+        cover.write_bytes(b'\xff\xd8folder cover\xff\xd9')
+        scanned = MusicLibrary()
+        scanned._do_scan()
+        tracks = {Path(t.file_path).suffix: t for t in scanned.get_snapshot().tracks}
+
+        def read_album_art(file_path, location):
+            raise AssertionError(f'opened {file_path}')
+
+        monkeypatch.setattr(album_art_module, 'read_album_art', read_album_art)
+        album_art = AlbumArt()
+        try:
+            assert tracks['.mp3'].embedded_art
+            assert not album_art.needs_extraction(tracks['.mp3'])
+            assert album_art.get(tracks['.mp3']) == str(cover)
+            assert album_art.needs_extraction(tracks['.flac'])
+        finally:
+            album_art.close()
+
+    def test_gstreamer_art_is_extracted_on_demand(self, library, monkeypatch):
+        """Test video containers read through GStreamer also defer their cover."""
+        from types import SimpleNamespace
+        from core import metadata
+
+        image = b'\xff\xd8video cover\xff\xd9'
+
+        class Tags:
+            def get_string(self, name):
+                return False, None
+
+            def get_uint(self, name):
+                return False, 0
+
+            def get_date_time(self, name):
+                return False, None
+
+            def get_sample(self, name):
+                buffer = SimpleNamespace(
+                    map=lambda flags: (True, SimpleNamespace(data=image)),
+                    unmap=lambda map_info: None,
+                )
+                return True, SimpleNamespace(get_buffer=lambda: buffer)
+
+        info = SimpleNamespace(get_duration=lambda: 0, get_tags=Tags)
+        discoverer = SimpleNamespace(discover_uri=lambda uri: info)
+        gst = SimpleNamespace(SECOND=10**9, MapFlags=SimpleNamespace(READ=1))
+        pbutils = SimpleNamespace(
+            Discoverer=SimpleNamespace(new=lambda timeout: discoverer)
+        )
+        monkeypatch.setattr(metadata, '_gstreamer', lambda: (gst, pbutils))
+
+        track = TrackMetadata(str(library / 'clip.mp4'))
+        assert track.embedded_art == 'gstreamer'
+        assert not any(Config.get_instance().album_art_cache_dir.iterdir())
+
+        album_art = AlbumArt()
+        try:
+            assert Path(album_art.get(track)).read_bytes() == image
+        finally:
+            album_art.close()
+
+    def test_prefetch_keeps_requested_extractions(self, library):
+        """Test a new prefetch window only cancels extractions prefetch started."""
+        import threading
+
+        tracks = _tracks(library, 'flac')
+        album_art = AlbumArt()
+        try:
+            # Hold the single extraction thread while the windows change
+            release = threading.Event()
+            album_art._executor.submit(release.wait)
+            requested = album_art.request(tracks[0])
+            album_art.prefetch(tracks[:2])
+            album_art.prefetch(tracks[2:3])
+            release.set()
+
+            assert requested.result(timeout=10) is not None
+            album_art.request(tracks[2]).result(timeout=10)
+            assert album_art.cached(tracks[1]) is None
+        finally:
+            album_art.close()
+
+    def test_prefetcher_extracts_upcoming_tracks(self, library, temp_dir):
+        """Test the art of the next playlist tracks is extracted ahead."""
+        tracks = _tracks(library, 'flac')
+        event_bus = EventBus()
+        playlist = PlaylistManager(event_bus=event_bus, playlists_dir=temp_dir / 'pl')
+        album_art = AlbumArt()
+        prefetcher = AlbumArtPrefetcher(album_art, playlist, event_bus, count=2)
+        try:
+            playlist.set_playlist(tracks, 0)
+            # Single extraction thread: this waits for the prefetch too
+            album_art.request(tracks[5]).result()
+
+            assert album_art.cached(tracks[0]) is None
+            assert album_art.cached(tracks[1]) is not None
+            assert album_art.cached(tracks[2]) is not None
+            assert album_art.cached(tracks[3]) is None
+        finally:
+            prefetcher.cleanup()
+            playlist.cleanup()
+            album_art.close()
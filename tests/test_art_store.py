@@ -0,0 +1,80 @@
+"""Tests for the content-addressed album art store."""
+
+import os
+import time
+from types import SimpleNamespace
+
+from core.art_store import ArtStore
+
+
+def _track(file_path, album_art_path=None):
+    return SimpleNamespace(file_path=file_path, album_art_path=album_art_path)
+
+
+def _age(path, seconds=3600):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+class TestArtStore:
+    """Test ArtStore."""
+
+    def test_tracks_with_the_same_image_share_one_file(self, temp_dir):
+        """Test an album's identical covers are written once."""
+        store = ArtStore(temp_dir, max_bytes=2**20)
+        paths = {store.put(f'/m/{i}.mp3', b'\xff\xd8cover') for i in range(12)}
+        other = store.put('/m/x.flac', b'\x89PNGother')
+
+        assert len(paths) == 1
+        assert other.endswith('.png')
+        assert sorted(p.name for p in temp_dir.iterdir()) == sorted(
+            [os.path.basename(paths.pop()), os.path.basename(other)]
+        )
+        assert store.lookup('/m/5.mp3') == store.lookup('/m/0.mp3')
+        assert store.lookup('/m/unknown.mp3') is None
+
+    def test_references_survive_restart(self, temp_dir):
+        """Test the reference index is saved and loaded."""
+        store = ArtStore(temp_dir, max_bytes=2**20)
+        path = store.put('/m/a.mp3', b'cover')
+        store.save()
+
+        assert ArtStore(temp_dir, max_bytes=2**20).lookup('/m/a.mp3') == path
+
+    def test_garbage_collection(self, temp_dir):
+        """Test art of removed tracks and stray files go, pinned art stays."""
+        store = ArtStore(temp_dir, max_bytes=2**20)
+        kept = store.put('/m/kept.mp3', b'kept')
+        gone = store.put('/m/gone.mp3', b'gone')
+        legacy = temp_dir / '0123abcd.jpg'
+        legacy.write_bytes(b'old per-track file')
+        pinned = temp_dir / 'video.jpg'
+        pinned.write_bytes(b'video art')
+        fresh = temp_dir / 'fresh.jpg'
+        fresh.write_bytes(b'written by a running scan')
+        for path in (kept, gone, legacy, pinned):
+            _age(path)
+
+        removed, freed = store.collect_garbage(
+            [_track('/m/kept.mp3'), _track('/m/video.mkv', str(pinned))]
+        )
+
+        assert removed == {gone, str(legacy)}
+        assert freed == len(b'gone') + len(b'old per-track file')
+        assert store.lookup('/m/kept.mp3') == kept
+        assert store.lookup('/m/gone.mp3') is None
+        assert pinned.exists() and fresh.exists()
+
+    def test_least_recently_used_art_is_evicted(self, temp_dir):
+        """Test the store is trimmed to max_bytes, oldest use first."""
+        store = ArtStore(temp_dir, max_bytes=250)
+        tracks = [_track(f'/m/{i}.mp3') for i in range(3)]
+        for i, track in enumerate(tracks):
+            store.put(track.file_path, bytes([i]) * 100)
+        store.lookup('/m/0.mp3')  # used again: now the most recent
+
+        removed, freed = store.collect_garbage(tracks)
+
+        assert freed == 100
+        assert store.lookup('/m/1.mp3') is None
+        assert store.lookup('/m/0.mp3') and store.lookup('/m/2.mp3')
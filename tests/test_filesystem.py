@@ -0,0 +1,76 @@
+"""Tests for the filesystem layer."""
+
+import threading
+import time
+
+import pytest
+from core.filesystem import FileSystem, LatencyFileSystem
+
+
+@pytest.fixture
+def files(temp_dir):
+    """Ten small files."""
+    paths = []
+    for number in range(10):
+        path = temp_dir / f'{number}.mp3'
+        path.write_bytes(b'x' * number)
+        paths.append(str(path))
+    return paths
+
+
+class TestFileSystem:
+    """Test FileSystem and LatencyFileSystem classes."""
+
+    def test_stat_many_reports_missing_paths(self, temp_dir, files):
+        """Test stat_many maps every path, with None for missing ones."""
+        fs = FileSystem(stat_workers=4)
+        missing = str(temp_dir / 'gone.mp3')
+        stats = fs.stat_many(files + [missing])
+        assert stats[missing] is None
+        assert [stats[path].st_size for path in files] == list(range(10))
+        fs.close()
+
+    def test_stat_many_overlaps_latency(self, files):
+        """Test batched stats take about one round trip per worker round."""
+        fs = LatencyFileSystem(0.05, stat_workers=10)
+        start = time.monotonic()
+        fs.stat_many(files)
+        assert time.monotonic() - start < 0.25
+        assert fs.calls == 10
+        fs.close()
+
+    def test_prefetched_stat_is_used_once(self, files):
+        """Test stat() answers from a prefetch once, then stats again."""
+        fs = LatencyFileSystem(0.01, stat_workers=4)
+        fs.prefetch(files)
+        assert [fs.stat(path).st_size for path in files] == list(range(10))
+        assert fs.calls == 10
+        fs.stat(files[0])
+        assert fs.calls == 11
+        fs.close()
+
+    def test_prefetches_belong_to_their_thread(self, files):
+        """Test another thread neither uses nor discards this thread's prefetch."""
+        fs = LatencyFileSystem(0.01, stat_workers=4)
+        fs.prefetch(files)
+
+        def other_walk():
+            fs.prefetch(files[:2])
+            fs.stat(files[0])
+            fs.discard_prefetched()
+
+        thread = threading.Thread(target=other_walk)
+        thread.start()
+        thread.join()
+        assert fs.calls == 12
+        assert [fs.stat(path).st_size for path in files] == list(range(10))
+        assert fs.calls == 12
+        fs.close()
+
+    def test_prefetch_is_off_with_one_worker(self, files):
+        """Test a sequential filesystem does no background stats."""
+        fs = LatencyFileSystem(0, stat_workers=1)
+        fs.prefetch(files)
+        assert fs.calls == 0
+        assert fs.is_file(files[0]) and not fs.is_dir(files[0])
+        assert fs.calls == 2
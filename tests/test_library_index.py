@@ -0,0 +1,134 @@
+"""Tests for library index backends."""
+
+import sqlite3
+
+from core.library_index import JsonLibraryIndex, ShardedLibraryIndex, SqliteLibraryIndex
+
+
+def _entry(artist, album, mtime=1.0):
+    return {'mtime': mtime, 'metadata': {'artist': artist, 'album': album, 'title': 'x'}}
+
+
+class TestSqliteLibraryIndex:
+    """Test SqliteLibraryIndex class."""
+
+    def test_roundtrip(self, temp_dir):
+        """Test saved entries load back unchanged."""
+        index = SqliteLibraryIndex(temp_dir / 'index.db', 2)
+        assert index.load() is None
+
+        file_cache = {'/m/a.mp3': _entry('A', 'X'), '/m/b.mp3': _entry('B', 'Y')}
+        dir_cache = {'/m': {'mtime_ns': 5, 'files': ['a.mp3', 'b.mp3'], 'dirs': []}}
+        index.save(file_cache, dir_cache, set(), set())
+
+        assert SqliteLibraryIndex(temp_dir / 'index.db', 2).load() == (file_cache, dir_cache)
+
+    def test_incremental_upsert_and_delete(self, temp_dir):
+        """Test saves only touch changed and removed rows."""
+        db_file = temp_dir / 'index.db'
+        index = SqliteLibraryIndex(db_file, 2)
+        file_cache = {'/m/a.mp3': _entry('A', 'X'), '/m/b.mp3': _entry('B', 'Y')}
+        index.save(file_cache, {}, file_cache.keys(), set())
+
+        del file_cache['/m/b.mp3']
+        file_cache['/m/a.mp3'] = _entry('A2', 'X', mtime=2.0)
+        file_cache['/m/c.mp3'] = _entry('C', 'Z')
+        index.save(file_cache, {}, {'/m/a.mp3', '/m/c.mp3'}, {'/m/b.mp3'})
+
+        loaded, _ = SqliteLibraryIndex(db_file, 2).load()
+        assert loaded == file_cache
+        with sqlite3.connect(str(db_file)) as conn:
+            assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+    def test_migrates_json_index(self, temp_dir):
+        """Test an existing JSON index is imported on first run."""
+        json_file = temp_dir / 'library_index.json'
+        file_cache = {'/m/a.mp3': _entry('A', 'X')}
+        JsonLibraryIndex(json_file, 2).save(file_cache, {})
+
+        index = SqliteLibraryIndex(temp_dir / 'index.db', 2, legacy_json_file=json_file)
+        assert index.load() == (file_cache, {})
+        # Second load reads from SQLite, not the JSON file
+        json_file.unlink()
+        assert SqliteLibraryIndex(temp_dir / 'index.db', 2).load() == (file_cache, {})
+
+    def test_stamp_changes_on_save(self, temp_dir):
+        """Test the stamp identifies each saved state."""
+        index = SqliteLibraryIndex(temp_dir / 'index.db', 2)
+        assert index.stamp() is None
+        index.save({'/m/a.mp3': _entry('A', 'X')}, {}, {'/m/a.mp3'}, set())
+        first = index.stamp()
+        assert first is not None
+        assert SqliteLibraryIndex(temp_dir / 'index.db', 2).stamp() == first
+        index.save({}, {}, set(), {'/m/a.mp3'})
+        assert index.stamp() != first
+
+
+class TestShardedLibraryIndex:
+    """Test ShardedLibraryIndex class."""
+
+    def _index(self, temp_dir, roots):
+        from functools import partial
+        return ShardedLibraryIndex(temp_dir / 'shards', roots, 2, partial(JsonLibraryIndex, version=2), '.json')
+
+    def test_saves_only_changed_shards(self, temp_dir):
+        """Test each root has its own shard and unchanged shards are not rewritten."""
+        roots = [temp_dir / 'a', temp_dir / 'b']
+        for root in roots:
+            root.mkdir()
+            (root / 'cover.jpg').touch()
+        file_cache = {f'{roots[0]}/1.mp3': _entry('A', 'X'), f'{roots[1]}/2.mp3': _entry('B', 'Y')}
+        index = self._index(temp_dir, roots)
+        index.save(file_cache, {}, file_cache.keys(), set())
+        shards = sorted((temp_dir / 'shards').glob('*.json'))
+        assert len(shards) == 2
+        mtimes = {path: path.stat().st_mtime_ns for path in shards}
+
+        file_cache[f'{roots[0]}/3.mp3'] = _entry('A', 'Z')
+        index.save(file_cache, {}, {f'{roots[0]}/3.mp3'}, set())
+        changed = [path for path in shards if path.stat().st_mtime_ns != mtimes[path]]
+        assert len(changed) == 1
+        assert self._index(temp_dir, roots).load() == (file_cache, {})
+
+    def test_missing_root_stays_dormant(self, temp_dir):
+        """Test an unplugged root's shard is kept and comes back with load_root."""
+        roots = [temp_dir / 'a', temp_dir / 'usb']
+        for root in roots:
+            root.mkdir()
+            (root / 'cover.jpg').touch()
+        usb_entry = {f'{roots[1]}/2.mp3': _entry('B', 'Y')}
+        file_cache = {f'{roots[0]}/1.mp3': _entry('A', 'X'), **usb_entry}
+        self._index(temp_dir, roots).save(file_cache, {}, file_cache.keys(), set())
+
+        (roots[1] / 'cover.jpg').unlink()
+        roots[1].rmdir()
+        index = self._index(temp_dir, roots)
+        loaded, _ = index.load()
+        assert list(loaded) == [f'{roots[0]}/1.mp3']
+        assert index.dormant_roots() == [roots[1]]
+        # Saving without the root's entries does not purge its shard
+        index.save(loaded, {}, set(), set(usb_entry))
+        assert index.load_root(roots[1]) is None
+
+        roots[1].mkdir()
+        assert index.load_root(roots[1]) is None  # empty mount point
+        (roots[1] / 'cover.jpg').touch()
+        assert index.load_root(roots[1])[0] == usb_entry
+        assert index.dormant_roots() == []
+
+    def test_splits_legacy_index(self, temp_dir):
+        """Test an unsharded index is split into shards on first load."""
+        from functools import partial
+        roots = [temp_dir / 'a', temp_dir / 'b']
+        for root in roots:
+            root.mkdir()
+            (root / 'cover.jpg').touch()
+        legacy = JsonLibraryIndex(temp_dir / 'library_index.json', 2)
+        file_cache = {f'{roots[0]}/1.mp3': _entry('A', 'X'), f'{roots[1]}/2.mp3': _entry('B', 'Y')}
+        legacy.save(file_cache, {})
+        index = ShardedLibraryIndex(
+            temp_dir / 'shards', roots, 2, partial(JsonLibraryIndex, version=2), '.json', legacy=legacy
+        )
+        assert index.load() == (file_cache, {})
+        assert len(list((temp_dir / 'shards').glob('*.json'))) == 2
+        assert self._index(temp_dir, roots).load() == (file_cache, {})
@@ -0,0 +1,45 @@
+"""Tests for the library filesystem watcher."""
+
+import threading
+
+from core.library_watcher import LibraryWatcher
+
+
+class TestLibraryWatcher:
+    """Test LibraryWatcher class."""
+
+    def _watcher(self, batches):
+        done = threading.Event()
+
+        def on_changes(changed, removed):
+            batches.append((changed, removed))
+            done.set()
+
+        watcher = LibraryWatcher(
+            [], on_changes, lambda: None, {'.mp3'}, debounce=0.05, max_delay=1.0
+        )
+        return watcher, done
+
+    def test_coalesces_burst(self):
+        """Test a burst of events is delivered once with the latest state per path."""
+        batches = []
+        watcher, done = self._watcher(batches)
+        watcher.record(changed='/m/a.mp3')
+        watcher.record(changed='/m/a.mp3')
+        watcher.record(removed='/m/a.mp3')
+        watcher.record(changed='/m/b.mp3')
+        watcher.record(changed='/m/cover.jpg')
+        watcher.record(changed='/m/New Album', is_directory=True)
+
+        assert done.wait(2)
+        assert batches == [({'/m/b.mp3', '/m/New Album'}, {'/m/a.mp3'})]
+
+    def test_stop_drops_pending_changes(self):
+        """Test nothing is delivered after stop()."""
+        batches = []
+        watcher, done = self._watcher(batches)
+        watcher.record(changed='/m/a.mp3')
+        watcher.stop()
+
+        assert not done.wait(0.2)
+        assert batches == []
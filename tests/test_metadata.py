@@ -0,0 +1,49 @@
+"""Tests for TrackMetadata."""
+
+from core.metadata import TrackMetadata
+
+
+class TestTrackMetadata:
+    """Test TrackMetadata class."""
+
+    def test_from_dict_roundtrip(self):
+        """Test to_dict/from_dict keep every field."""
+        data = {
+            'file_path': '/music/A/X/01 - Song.mp3',
+            'title': 'Song',
+            'artist': 'A',
+            'album': 'X',
+            'album_artist': 'A',
+            'track_number': 1,
+            'duration': 200.5,
+            'album_art_path': None,
+            'genre': 'Rock',
+            'year': '1999',
+            'embedded_art': 'APIC:',
+        }
+        assert TrackMetadata.from_dict(data).to_dict() == data
+
+    def test_from_dict_ignores_unknown_and_fills_missing(self):
+        """Test old or foreign cache entries still load."""
+        track = TrackMetadata.from_dict({'file_path': '/m/03 - Tune.flac', 'bogus': 1})
+
+        assert not hasattr(track, '__dict__')
+        assert track.artist is None
+        assert track.track_number == 3
+        assert track.title == 'Tune'
+
+    def test_repeated_fields_are_interned(self):
+        """Test tracks share one string object per artist/album/genre/year."""
+        tracks = [
+            TrackMetadata.from_dict({
+                'file_path': f'/m/{i}.mp3',
+                'artist': ''.join('Artist'),
+                'album': ''.join('Album'),
+                'genre': ''.join('Jazz'),
+                'year': str(1970),
+            })
+            for i in range(2)
+        ]
+
+        for field in ('artist', 'album', 'genre', 'year'):
+            assert getattr(tracks[0], field) is getattr(tracks[1], field)
@@ -0,0 +1,919 @@
+"""Tests for music library scanning and indexing."""
+
+import pytest
+from pathlib import Path
+from core.config import Config
+
+
+@pytest.fixture
+def library_config(temp_dir, monkeypatch):
+    """Config singleton rooted in a temporary XDG tree with a music directory."""
+    monkeypatch.setenv('XDG_CONFIG_HOME', str(temp_dir / 'config'))
+    monkeypatch.setenv('XDG_CACHE_HOME', str(temp_dir / 'cache'))
+    monkeypatch.setenv('XDG_DATA_HOME', str(temp_dir / 'data'))
+    Config._instance = None
+
+    music_dir = temp_dir / 'music'
+    music_dir.mkdir()
+    config = Config.get_instance()
+    config.set('library', 'music_dirs', str(music_dir))
+    yield config
+    Config._instance = None
+
+
+@pytest.fixture
+def music_dir(library_config):
+    """Music directory with two albums of placeholder audio files."""
+    root = Path(library_config.get('library', 'music_dirs'))
+    for album in ('Album A', 'Album B'):
+        (root / album).mkdir()
+        for number in range(1, 4):
+            (root / album / f'0{number} - Song {number}.mp3').touch()
+    (root / 'cover.txt').touch()
+    return root
+
+
+class TestMusicLibrary:
+    """Test MusicLibrary class."""
+
+    def test_scan_builds_folder_structure(self, music_dir):
+        """Test a scan indexes audio files per folder."""
+        from core.music_library import MusicLibrary
+
+        library = MusicLibrary()
+        library._do_scan()
+
+        assert library.get_track_count() == 6
+        folders = library.get_folder_structure()
+        assert sorted(folders) == ['Album A', 'Album B']
+        assert [t.track_number for t in folders['Album A']] == [1, 2, 3]
+        assert library.get_music_root() == music_dir
+
+    @pytest.mark.parametrize('workers,executor', [('1', 'thread'), ('4', 'thread'), ('2', 'process')])
+    def test_parallel_scan_is_deterministic(self, library_config, music_dir, workers, executor):
+        """Test worker pools produce the same result as a serial scan."""
+        from core.music_library import MusicLibrary
+
+        library_config.set('library', 'scan_workers', workers)
+        library_config.set('library', 'scan_executor', executor)
+        library = MusicLibrary()
+        library._do_scan()
+
+        titles = [t.title for t in library.get_folder_structure()['Album B']]
+        assert titles == ['Song 1', 'Song 2', 'Song 3']
+        stats = library.get_scan_stats()
+        assert stats['files'] == 6
+        assert stats['extracted'] == 6
+        assert stats['workers'] == int(workers)
+
+    def test_scan_falls_back_to_threads(self, library_config, music_dir, monkeypatch):
+        """Test scans use threads when scanner processes can't be started."""
+        from concurrent.futures import ThreadPoolExecutor
+        from core import music_library
+        from core.music_library import MusicLibrary
+
+        def no_processes(max_workers):
+            raise OSError('fork server failed to start')
+
+        monkeypatch.setattr(music_library, 'ScanWorkerPool', no_processes)
+        library_config.set('library', 'scan_workers', '2')
+        library = MusicLibrary()
+        assert library._scan_executor_kind == 'process'
+        executor = library._create_executor()
+        assert isinstance(executor, ThreadPoolExecutor)
+        executor.shutdown()
+        library._do_scan()
+        assert library.get_track_count() == 6
+
+    def test_rescan_uses_cache(self, music_dir):
+        """Test unchanged files are not extracted again."""
+        from core.music_library import MusicLibrary
+
+        MusicLibrary()._do_scan()
+        library = MusicLibrary()
+        library._do_scan()
+
+        assert library.get_track_count() == 6
+        assert library.get_scan_stats()['extracted'] == 0
+
+    def test_rescan_skips_unchanged_directories(self, music_dir, monkeypatch):
+        """Test warm rescans reuse listings of directories whose mtime is unchanged."""
+        from core.music_library import MusicLibrary
+
+        MusicLibrary()._do_scan()
+        library = MusicLibrary()
+        stat_calls = []
+        monkeypatch.setattr(library, '_needs_rescan', lambda path: stat_calls.append(path))
+        library._do_scan()
+
+        assert library.get_track_count() == 6
+        assert stat_calls == []
+        stats = library.get_scan_stats()
+        assert stats['dirs'] == stats['dirs_unchanged'] == 3
+
+    def test_rescan_picks_up_new_and_removed_files(self, music_dir):
+        """Test directory mtime changes trigger a fresh listing."""
+        from core.music_library import MusicLibrary
+
+        MusicLibrary()._do_scan()
+        (music_dir / 'Album A' / '01 - Song 1.mp3').unlink()
+        (music_dir / 'Album C').mkdir()
+        (music_dir / 'Album C' / '01 - New.mp3').touch()
+
+        library = MusicLibrary()
+        library._do_scan()
+
+        folders = library.get_folder_structure()
+        assert [t.title for t in folders['Album A']] == ['Song 2', 'Song 3']
+        assert [t.title for t in folders['Album C']] == ['New']
+        assert library.get_scan_stats()['extracted'] == 1
+
+    def test_sqlite_index_backend(self, library_config, music_dir):
+        """Test the library persists and reloads through the SQLite index."""
+        from core.music_library import MusicLibrary
+
+        library_config.set('library', 'index_backend', 'sqlite')
+        MusicLibrary()._do_scan()
+        assert library_config.library_index_db.exists()
+
+        library = MusicLibrary()
+        assert library.get_track_count() == 6
+        library._do_scan()
+        assert library.get_scan_stats()['extracted'] == 0
+
+    def test_trust_cache_publishes_then_validates(self, music_dir):
+        """Test cached tracks are published at once and stale ones removed later."""
+        from core.events import EventBus
+        from core.music_library import MusicLibrary
+
+        MusicLibrary()._do_scan()
+        (music_dir / 'Album B' / '02 - Song 2.mp3').unlink()
+
+        event_bus = EventBus()
+        removed = []
+        event_bus.subscribe(EventBus.LIBRARY_TRACKS_REMOVED, removed.append)
+        library = MusicLibrary(event_bus=event_bus)
+        library._wait_for_validation()
+
+        assert [t.title for t in removed[0]['tracks']] == ['Song 2']
+        assert library.get_track_count() == 5
+        assert len(library.get_folder_structure()['Album B']) == 2
+
+    def test_validation_links_folder_covers(self, music_dir):
+        """Test tracks re-read by background validation keep their folder cover."""
+        import os
+        from core.music_library import MusicLibrary
+
+        cover = music_dir / 'Album A' / 'cover.jpg'
+        cover.touch()
+        MusicLibrary()._do_scan()
+        os.utime(music_dir / 'Album A' / '02 - Song 2.mp3', ns=(1, 1))
+
+        library = MusicLibrary()
+        library._wait_for_validation()
+
+        tracks = library.get_folder_structure()['Album A']
+        assert [t.album_art_path for t in tracks] == [str(cover)] * 3
+        assert MusicLibrary()._get_cached_metadata(
+            str(music_dir / 'Album A' / '02 - Song 2.mp3')
+        ).album_art_path == str(cover)
+
+    def test_blocking_validation_mode(self, library_config, music_dir):
+        """Test trust_cache = false validates synchronously on load."""
+        from core.music_library import MusicLibrary
+
+        MusicLibrary()._do_scan()
+        (music_dir / 'Album A' / '03 - Song 3.mp3').unlink()
+        library_config.set('library', 'trust_cache', 'false')
+
+        library = MusicLibrary()
+        assert library._validation_thread is None
+        assert library.get_track_count() == 5
+
+    def test_apply_file_changes(self, music_dir):
+        """Test watcher batches update tracks, folders and the index incrementally."""
+        from core.music_library import MusicLibrary
+
+        library = MusicLibrary()
+        library._do_scan()
+        new_album = music_dir / 'Album C'
+        new_album.mkdir()
+        (new_album / '01 - Fresh.mp3').touch()
+        removed = music_dir / 'Album A' / '02 - Song 2.mp3'
+        removed.unlink()
+
+        library.apply_file_changes({str(new_album)}, {str(removed), str(music_dir / 'Album B')})
+
+        folders = library.get_folder_structure()
+        assert [t.title for t in folders['Album A']] == ['Song 1', 'Song 3']
+        assert [t.title for t in folders['Album C']] == ['Fresh']
+        assert 'Album B' not in folders
+        assert library.get_track_count() == 3
+        assert MusicLibrary().get_track_count() == 3
+
+    def test_change_events_carry_folders(self, music_dir):
+        """Test removed/updated events say which folder each track belongs to."""
+        from core.events import EventBus
+        from core.music_library import MusicLibrary
+
+        event_bus = EventBus()
+        events = []
+        event_bus.subscribe(EventBus.LIBRARY_TRACKS_REMOVED, lambda data: events.append(('removed', data)))
+        event_bus.subscribe(EventBus.LIBRARY_TRACKS_UPDATED, lambda data: events.append(('updated', data)))
+        library = MusicLibrary(event_bus=event_bus)
+        library._do_scan()
+        removed = music_dir / 'Album A' / '02 - Song 2.mp3'
+        removed.unlink()
+        added = music_dir / 'Album B' / '04 - Song 4.mp3'
+        added.touch()
+
+        library.apply_file_changes({str(added)}, {str(removed)})
+
+        kinds = {kind: data for kind, data in events}
+        assert kinds['removed']['music_root'] == music_dir
+        assert {folder: [t.title for t in tracks] for folder, tracks in kinds['removed']['folders'].items()} == {
+            'Album A': ['Song 2']
+        }
+        assert {folder: [t.title for t in tracks] for folder, tracks in kinds['updated']['folders'].items()} == {
+            'Album B': ['Song 4']
+        }
+
+    def test_poll_publishes_watcher_style_deltas(self, music_dir):
+        """Test the polling fallback announces each change once, with its folders."""
+        import os
+        import shutil
+        from core.events import EventBus
+        from core.music_library import MusicLibrary
+
+        event_bus = EventBus()
+        events = []
+        for kind in (EventBus.LIBRARY_TRACKS_ADDED, EventBus.LIBRARY_TRACKS_REMOVED, EventBus.LIBRARY_TRACKS_UPDATED):
+            event_bus.subscribe(kind, lambda data, kind=kind: events.append((kind, data)))
+        library = MusicLibrary(event_bus=event_bus)
+        library._do_scan()
+        events.clear()
+        shutil.rmtree(music_dir / 'Album A')
+        (music_dir / 'Album B' / '04 - Song 4.mp3').touch()
+        edited = music_dir / 'Album B' / '01 - Song 1.mp3'
+        os.utime(edited, ns=(1, 1))
+        os.utime(music_dir / 'Album B', ns=(2, 2))
+
+        library._poll_rescan()
+
+        assert [kind for kind, _ in events] == [EventBus.LIBRARY_TRACKS_REMOVED, EventBus.LIBRARY_TRACKS_UPDATED]
+        removed, updated = events[0][1], events[1][1]
+        assert removed['music_root'] == music_dir
+        assert {folder: len(tracks) for folder, tracks in removed['folders'].items()} == {'Album A': 3}
+        assert {folder: sorted(t.title for t in tracks) for folder, tracks in updated['folders'].items()} == {
+            'Album B': ['Song 1', 'Song 4']
+        }
+        assert library.get_track_count() == 4
+
+        events.clear()
+        library._poll_rescan()
+        assert events == []
+
+        # Files in directories whose mtime did not change are not stat'ed
+        os.utime(music_dir / 'Album B' / '02 - Song 2.mp3', ns=(3, 3))
+        library._poll_rescan()
+        assert events == []
+
+    def test_watcher_falls_back_to_polling(self, music_dir, monkeypatch):
+        """Test inotify setup failures (watch limit) switch to polling."""
+        import errno
+        from core import library_watcher
+        from core.music_library import MusicLibrary
+
+        class ExhaustedObserver:
+            def schedule(self, *args, **kwargs):
+                raise OSError(errno.ENOSPC, 'inotify watch limit reached')
+
+            def stop(self):
+                pass
+
+        monkeypatch.setattr(library_watcher, 'Observer', ExhaustedObserver, raising=False)
+        monkeypatch.setattr(library_watcher, 'WATCHDOG_AVAILABLE', True)
+        library = MusicLibrary()
+        library.start_watching()
+        try:
+            assert library._watcher.is_polling
+        finally:
+            library.stop_watching()
+
+    def test_scan_streams_batches(self, music_dir, monkeypatch):
+        """Test scans publish new tracks in batches and report progress."""
+        from core import music_library
+        from core.events import EventBus
+
+        monkeypatch.setattr(music_library, 'SCAN_BATCH_SIZE', 2)
+        event_bus = EventBus()
+        batches, progress = [], []
+        event_bus.subscribe(EventBus.LIBRARY_TRACKS_ADDED, batches.append)
+        event_bus.subscribe(EventBus.LIBRARY_SCAN_PROGRESS, progress.append)
+
+        library = music_library.MusicLibrary(event_bus=event_bus)
+        library._do_scan()
+
+        assert len(batches) == 3
+        assert batches[0]['music_root'] == music_dir
+        assert list(batches[0]['folders']) == ['Album A']
+        assert sum(len(b['tracks']) for b in batches) == 6
+        assert progress[0]['files'] == 0
+        assert progress[-1] == {
+            'files': 6, 'extracted': 6, 'tracks_added': 6, 'done': True,
+            'paused': False, 'cancelled': False,
+            'throttle': {
+                'mode': 'unlimited', 'files_per_sec': 0.0, 'bytes_per_sec': 0.0,
+                'playback_files_per_sec': 20.0, 'idle_only': False,
+                'playback_active': False, 'waited': 0.0,
+            },
+        }
+
+        # Tracks already published are not announced again
+        batches.clear()
+        library._do_scan()
+        assert batches == []
+
+    def test_cancelled_scan_resumes_from_checkpoint(self, library_config, music_dir, monkeypatch):
+        """Test a cancelled scan keeps extracted entries and the next scan resumes."""
+        from core import music_library
+
+        library_config.set('library', 'scan_workers', '1')
+        library = music_library.MusicLibrary()
+        job = music_library.ScanJob()
+        extracted = []
+
+        def extract(file_path):
+            extracted.append(file_path)
+            if len(extracted) == 4:
+                job.cancel()
+            return music_library.TrackMetadata.from_dict({'file_path': file_path})
+
+        monkeypatch.setattr(music_library, 'extract_track_metadata', extract)
+        assert library._do_scan(job=job) is False
+        assert library.get_track_count() == 0
+        assert library.has_interrupted_scan()
+
+        # A fresh instance (next launch) only extracts the remaining files
+        extracted.clear()
+        library = music_library.MusicLibrary()
+        job = library.scan_library()
+        assert job.wait(timeout=5) and job.completed
+        assert len(extracted) == 2
+        assert library.get_track_count() == 6
+        assert not library.has_interrupted_scan()
+
+    def test_scan_job_pause_and_resume(self, music_dir):
+        """Test a paused scan waits until resumed and a second request reuses the job."""
+        from core.music_library import MusicLibrary, ScanJob
+
+        library = MusicLibrary()
+        job = ScanJob()
+        job.pause()
+        library._scan_job = job
+        assert library.scan_library() is job
+
+        import threading
+        thread = threading.Thread(target=library._do_scan, kwargs={'job': job})
+        thread.start()
+        thread.join(timeout=0.2)
+        assert thread.is_alive() and library.get_track_count() == 0
+
+        job.resume()
+        thread.join(timeout=5)
+        assert library.get_track_count() == 6
+
+    def test_multiple_roots_scan_per_device(self, library_config, music_dir, temp_dir):
+        """Test each music directory gets its own hierarchy and devices scan in parallel."""
+        import os
+        from core.filesystem import FileSystem
+        from core.music_library import MusicLibrary
+
+        other = temp_dir / 'usb' / 'music'
+        (other / 'Album A').mkdir(parents=True)
+        (other / 'Album A' / '01 - Other.mp3').touch()
+        (other / 'loose.mp3').touch()
+        library_config.set('library', 'music_dirs', f'{music_dir}:{other}')
+
+        class TwoDisks(FileSystem):
+            # Pretend the second directory lives on its own disk
+            def _stat(self, path):
+                st = os.stat(path)
+                if path != str(other):
+                    return st
+                return os.stat_result((*st[:2], st.st_dev + 1, *st[3:]))
+
+        library = MusicLibrary(filesystem=TwoDisks())
+        assert library._group_by_device([music_dir, other]) == [[music_dir], [other]]
+        library._do_scan()
+
+        folders = library.get_folder_structure()
+        assert set(folders) == {'music/Album A', 'music/Album B', 'music (2)', 'music (2)/Album A'}
+        assert [t.title for t in folders['music (2)/Album A']] == ['Other']
+        assert library.get_folder_path('music (2)/Album A') == other / 'Album A'
+        assert library.get_folder_path('music (2)') == other
+        assert library.get_scan_stats()['devices'] == 2
+        # Tracks follow the configured root order
+        assert library.tracks[0].file_path.startswith(str(music_dir))
+        assert library.tracks[-1].file_path.startswith(str(other))
+
+        # Cached loads build the same keys
+        assert sorted(MusicLibrary().get_folder_structure()) == sorted(folders)
+
+    def test_moved_folder_keeps_cached_metadata(self, library_config, music_dir, monkeypatch):
+        """Test renamed folders are re-keyed by fingerprint instead of re-extracted."""
+        from core import music_library
+        from core.album_art import album_art_cache_path
+
+        library = music_library.MusicLibrary()
+        library._do_scan()
+        old_path = str(music_dir / 'Album A' / '01 - Song 1.mp3')
+        art = album_art_cache_path(old_path)
+        art.write_bytes(b'art')
+        library._file_cache[old_path]['metadata']['album_art_path'] = str(art)
+        library._file_cache[old_path]['metadata']['artist'] = 'Tagged Artist'
+
+        (music_dir / 'Album A').rename(music_dir / 'Renamed')
+        extracted = []
+        monkeypatch.setattr(music_library, 'extract_track_metadata', extracted.append)
+        library._do_scan()
+
+        assert extracted == []
+        assert library.get_scan_stats()['moved'] == 3
+        moved = library.get_folder_structure()['Renamed'][0]
+        assert moved.artist == 'Tagged Artist'
+        assert moved.file_path == str(music_dir / 'Renamed' / '01 - Song 1.mp3')
+        assert moved.album_art_path == str(album_art_cache_path(moved.file_path))
+        assert not art.exists()
+        assert old_path not in library._file_cache
+
+    def test_moved_file_keeps_stored_album_art(self, library_config, music_dir):
+        """Test the art store reference of a file moved while watching follows it."""
+        from core.art_store import ArtStore
+        from core.music_library import MusicLibrary
+
+        library = MusicLibrary()
+        library._do_scan()
+        old_path = music_dir / 'Album B' / '02 - Song 2.mp3'
+        art = library.art_store.put(str(old_path), b'cover')
+        new_path = music_dir / 'Album A' / '04 - Song 2.mp3'
+        old_path.rename(new_path)
+
+        library.apply_file_changes({str(new_path)}, {str(old_path)})
+
+        assert library.art_store.lookup(str(new_path)) == art
+        assert library.art_store.lookup(str(old_path)) is None
+        assert ArtStore.from_config(library_config).lookup(str(new_path)) == art
+
+    def test_search_and_duration_by_artist(self, music_dir):
+        """Test search and aggregation run over the track store."""
+        from core.music_library import MusicLibrary
+
+        library = MusicLibrary()
+        library._do_scan()
+
+        assert len(library.search('song 2')) == 2
+        assert library.search('nothing') == []
+        assert library.get_duration_by_artist() == {}
+        assert library.get_tracks('Unknown Artist', 'Unknown Album')[0].track_number == 1
+
+    def test_idle_only_scan_waits_for_playback(self, library_config, music_dir, monkeypatch):
+        """Test an idle-only scan holds off while playing and can be cancelled."""
+        import threading
+        from core import scan_throttle
+        from core.events import EventBus
+        from core.music_library import MusicLibrary
+
+        monkeypatch.setattr(scan_throttle, 'IDLE_POLL_INTERVAL', 0.01)
+        library_config.set('library', 'scan_idle_only', 'true')
+        event_bus = EventBus()
+        waiting = threading.Event()
+        event_bus.subscribe(
+            EventBus.LIBRARY_SCAN_PROGRESS,
+            lambda data: data['throttle']['mode'] == 'waiting_for_idle' and waiting.set(),
+        )
+        library = MusicLibrary(event_bus=event_bus)
+        event_bus.publish(EventBus.PLAYBACK_STATE_CHANGED, {'state': 'playing'})
+
+        job = library.scan_library()
+        assert waiting.wait(5)
+        assert library.get_track_count() == 0
+        job.cancel()
+        assert job.wait(5) and not job.completed
+
+        event_bus.publish(EventBus.PLAYBACK_STATE_CHANGED, {'state': 'stopped'})
+        job = library.scan_library()
+        assert job.wait(5) and job.completed
+        assert library.get_track_count() == 6
+
+    def test_startup_loads_browse_snapshot(self, music_dir, monkeypatch):
+        """Test a warm start takes the prebuilt structures and a rescan refreshes them."""
+        from core.music_library import MusicLibrary
+
+        library = MusicLibrary()
+        library._do_scan()
+        assert library._snapshot_file.exists()
+
+        def no_rebuild(self):
+            raise AssertionError('index rebuilt despite snapshot')
+
+        with monkeypatch.context() as m:
+            m.setattr(MusicLibrary, '_rebuild_index', no_rebuild)
+            m.setattr(MusicLibrary, '_tracks_from_cache', no_rebuild)
+            warm = MusicLibrary()
+        assert warm.get_track_count() == 6
+        assert warm.get_artists() == library.get_artists()
+        assert sorted(warm.get_folder_structure()) == ['Album A', 'Album B']
+        tree = warm.get_folder_tree()
+        assert list(tree['folders']) == ['Album A', 'Album B']
+        assert [t.track_number for t in tree['folders']['Album B']['tracks']] == [1, 2, 3]
+        assert [t.title for t in warm.search('Song 2')] == ['Song 2', 'Song 2']
+
+        # A new file changes the index, so the old snapshot no longer matches
+        (music_dir / 'Album C').mkdir()
+        (music_dir / 'Album C' / '01 - New.mp3').touch()
+        key = warm._snapshot_key(warm.get_music_roots(), warm._folder_prefixes)
+        warm._do_scan()
+        assert warm._snapshot_key(warm.get_music_roots(), warm._folder_prefixes) != key
+        assert list(MusicLibrary().get_folder_tree()['folders']) == [
+            'Album A', 'Album B', 'Album C'
+        ]
+
+    def test_watcher_batches_defer_the_browse_snapshot(self, music_dir, monkeypatch):
+        """Test small changes only delete the snapshot; save_snapshot writes it again."""
+        from core.music_library import MusicLibrary
+
+        library = MusicLibrary()
+        library._do_scan()
+        new_file = music_dir / 'Album A' / '04 - Song 4.mp3'
+        new_file.touch()
+        saves = []
+        with monkeypatch.context() as m:
+            m.setattr(MusicLibrary, '_save_snapshot', lambda self: saves.append(self))
+            library.apply_file_changes({str(new_file)}, set())
+        assert saves == []
+        assert not library._snapshot_file.exists()
+
+        library.save_snapshot()
+
+        assert library._snapshot_file.exists()
+        assert [t.title for t in MusicLibrary().get_folder_structure()['Album A']] == [
+            'Song 1', 'Song 2', 'Song 3', 'Song 4'
+        ]
+
+    def test_stale_snapshot_is_ignored(self, library_config, music_dir):
+        """Test a snapshot built for other music directories is not used."""
+        from core.music_library import MusicLibrary
+
+        MusicLibrary()._do_scan()
+        other = music_dir.parent / 'other'
+        other.mkdir()
+        library_config.set('library', 'music_dirs', f'{music_dir}:{other}')
+
+        library = MusicLibrary()
+        assert sorted(library.get_folder_structure()) == [
+            'music/Album A', 'music/Album B'
+        ]
+
+    def test_deltas_update_indexes_without_rebuild(self, music_dir, monkeypatch):
+        """Test watcher-style deltas match a full rebuild without running one."""
+        from core.metadata import TrackMetadata
+        from core.music_library import MusicLibrary
+
+        library = MusicLibrary()
+        library._do_scan()
+        tree_before = library.get_folder_tree()
+        album_b = library.get_folder_structure()['Album B']
+
+        def no_rebuild(self):
+            raise AssertionError('full rebuild for a small change')
+
+        retagged = TrackMetadata.from_dict({
+            'file_path': str(music_dir / 'Album A' / '02 - Song 2.mp3'),
+            'title': 'Retagged', 'artist': 'New Artist', 'album': 'New Album',
+            'track_number': 1,
+        })
+        added = TrackMetadata.from_dict({
+            'file_path': str(music_dir / 'Album C' / 'Extra.mp3'), 'title': 'Extra',
+        })
+        with monkeypatch.context() as m:
+            m.setattr(MusicLibrary, '_rebuild_index', no_rebuild)
+            library._apply_track_deltas(
+                [str(music_dir / 'Album B' / '01 - Song 1.mp3')], [retagged, added]
+            )
+
+        assert library.get_track_count() == 6
+        assert library.get_tracks('New Artist', 'New Album') == [retagged]
+        assert [t.title for t in library.search('retagged')] == ['Retagged']
+        folders = library.get_folder_structure()
+        assert [t.title for t in folders['Album A']][0] == 'Retagged'
+        assert [t.track_number for t in folders['Album B']] == [2, 3]
+        assert list(library.get_folder_tree()['folders']) == ['Album A', 'Album B', 'Album C']
+        # Structures handed out before the change are left alone
+        assert len(album_b) == 3
+        assert list(tree_before['folders']) == ['Album A', 'Album B']
+
+        incremental = {
+            folder: [t.file_path for t in tracks] for folder, tracks in folders.items()
+        }
+        artists = {a: library.get_albums(a) for a in library.get_artists()}
+        with library._lock:
+            library._rebuild_index()
+        assert {
+            folder: [t.file_path for t in tracks]
+            for folder, tracks in library.get_folder_structure().items()
+        } == incremental
+        assert {a: library.get_albums(a) for a in library.get_artists()} == artists
+
+    def test_small_rescan_applies_deltas(self, music_dir, monkeypatch):
+        """Test a rescan that changed one file does not rebuild the indexes."""
+        from core.music_library import MusicLibrary
+
+        library = MusicLibrary()
+        library._do_scan()
+        (music_dir / 'Album B' / '03 - Song 3.mp3').unlink()
+
+        monkeypatch.setattr(
+            MusicLibrary, '_rebuild_index', lambda self: pytest.fail('full rebuild')
+        )
+        library._do_scan()
+        assert library.get_track_count() == 5
+        assert [t.track_number for t in library.get_folder_structure()['Album B']] == [1, 2]
+
+    def test_inconsistent_deltas_fall_back_to_rebuild(self, music_dir):
+        """Test the full rebuild repairs indexes that got out of sync."""
+        from core.music_library import MusicLibrary
+
+        library = MusicLibrary()
+        library._do_scan()
+        # Simulate a store that lost track of a row
+        library._store.remove(
+            library._id_by_path[str(music_dir / 'Album B' / '01 - Song 1.mp3')]
+        )
+
+        library._apply_track_deltas([str(music_dir / 'Album A' / '01 - Song 1.mp3')], [])
+        assert library.get_track_count() == 5
+        assert len(library._store) == 5
+        assert len(library.search('Song')) == 5
+
+    def test_sorted_views_are_cached_per_version(self, music_dir):
+        """Test browse getters reuse views until the library changes."""
+        from core.metadata import TrackMetadata
+        from core.music_library import MusicLibrary
+
+        def track(name, artist, album, number=1):
+            return TrackMetadata.from_dict({
+                'file_path': str(music_dir / name), 'title': name,
+                'artist': artist, 'album': album, 'track_number': number,
+            })
+
+        library = MusicLibrary()
+        library._do_scan()
+        library._apply_track_deltas([], [
+            track('a.mp3', 'artist 10', 'Vol. 10'),
+            track('b.mp3', 'Artist 9', 'vol. 2'),
+            track('c.mp3', 'Artist 9', 'Vol. 10', 2),
+            track('d.mp3', 'Artist 9', 'Vol. 10', 1),
+        ])
+        version = library.get_version()
+
+        artists = library.get_artists()
+        assert artists == ['Artist 9', 'artist 10', 'Unknown Artist']
+        assert library.get_albums('Artist 9') == ['vol. 2', 'Vol. 10']
+        assert [t.title for t in library.get_tracks('Artist 9')] == [
+            'b.mp3', 'd.mp3', 'c.mp3'
+        ]
+        assert library.get_artists() is artists
+        assert library.get_version() == version
+
+        library._apply_track_deltas([str(music_dir / 'a.mp3')], [])
+        assert library.get_version() > version
+        assert library.get_artists() == ['Artist 9', 'Unknown Artist']
+        assert artists == ['Artist 9', 'artist 10', 'Unknown Artist']
+
+    def test_readers_use_immutable_snapshots(self, music_dir):
+        """Test reads never wait for writers and old snapshots stay unchanged."""
+        import threading
+        from core.music_library import MusicLibrary
+
+        library = MusicLibrary()
+        library._do_scan()
+        snapshot = library.get_snapshot()
+
+        results = []
+
+        def read():
+            results.append((
+                library.get_track_count(),
+                len(library.search('Song')),
+                sorted(library.get_folder_structure()),
+            ))
+
+        with library._lock:  # a writer holding the lock
+            reader = threading.Thread(target=read)
+            reader.start()
+            reader.join(5)
+        assert results == [(6, 6, ['Album A', 'Album B'])]
+
+        library._apply_track_deltas([str(music_dir / 'Album A' / '01 - Song 1.mp3')], [])
+        assert library.get_snapshot() is not snapshot
+        assert library.get_snapshot().version > snapshot.version
+        assert len(snapshot.tracks) == 6
+        assert len(snapshot.search('Song')) == 6
+        assert len(snapshot.folder_structure['Album A']) == 3
+        assert len(library.search('Song')) == 5
+        assert sum(len(snapshot.get_tracks(a)) for a in snapshot.get_artists()) == 6
+        with pytest.raises(TypeError):
+            snapshot.folder_structure['Album C'] = []
+        # Lookups of missing keys don't insert into the shared dicts
+        assert snapshot.folder_structure.get('Album C') is None
+        assert 'Album C' not in library.get_folder_tree()['folders']
+
+        # A rebuild (as after too many deltas) leaves published lists alone
+        published = library.get_snapshot()
+        folder = published.folder_structure['Album B']
+        with library._lock:
+            library._rebuild_index()
+        assert library.get_snapshot().folder_structure['Album B'] is not folder
+        assert [t.title for t in folder] == ['Song 1', 'Song 2', 'Song 3']
+
+    def test_scan_through_latency_filesystem(self, music_dir):
+        """Test scans and rescans work through a batched high-latency filesystem."""
+        import os
+        from core.filesystem import LatencyFileSystem
+        from core.music_library import MusicLibrary
+
+        fs = LatencyFileSystem(0.001, stat_workers=4)
+        library = MusicLibrary(filesystem=fs)
+        library._do_scan()
+        assert library.get_track_count() == 6
+        assert fs.calls > 0
+
+        new_file = music_dir / 'Album B' / '04 - Song 4.mp3'
+        new_file.touch()
+        os.utime(music_dir / 'Album B', ns=(1, 1))
+        library._do_scan()
+        assert library.get_track_count() == 7
+        assert not fs._prefetched
+        fs.close()
+
+    def test_scan_rules_skip_excluded_folders(self, library_config, music_dir):
+        """Test excluded folders and files are not indexed, even from the cache."""
+        from core.music_library import MusicLibrary
+
+        (music_dir / '.git').mkdir()
+        (music_dir / '.git' / 'blob.mp3').touch()
+        (music_dir / 'Album A' / 'Backup').mkdir()
+        (music_dir / 'Album A' / 'Backup' / '01 - Song 1.mp3').touch()
+        library = MusicLibrary()
+        library._do_scan()
+        assert library.get_track_count() == 7
+        assert 'Album A/Backup' in library.get_folder_structure()
+
+        library_config.set('library', 'exclude', 'Album A/Backup:*/03 - *')
+        library = MusicLibrary()
+        library._do_scan()
+        assert library.get_track_count() == 4
+        assert sorted(library.get_folder_structure()) == ['Album A', 'Album B']
+
+    def test_changed_scan_rules_invalidate_the_snapshot(self, library_config, music_dir):
+        """Test a warm start after the patterns changed leaves out excluded tracks."""
+        from core.music_library import MusicLibrary
+
+        MusicLibrary()._do_scan()
+        library_config.set('library', 'exclude', 'Album B/*')
+
+        library = MusicLibrary()
+
+        assert library.get_track_count() == 3
+        assert sorted(library.get_folder_structure()) == ['Album A']
+
+    def test_symlink_loops_are_walked_once(self, library_config, music_dir):
+        """Test followed symlinks are scanned, but loops and repeats are not."""
+        from core.music_library import MusicLibrary
+
+        library_config.set('library', 'follow_symlinks', 'true')
+        (music_dir / 'Album A' / 'loop').symlink_to(music_dir)
+        (music_dir / 'Album C').symlink_to(music_dir / 'Album B')
+        library = MusicLibrary()
+        library._do_scan()
+
+        assert library.get_track_count() == 6
+        assert sorted(library.get_folder_structure()) == ['Album A', 'Album B']
+
+    def test_apply_file_changes_walks_like_a_scan(self, library_config, music_dir):
+        """Test new folders from the watcher get the scan rules and the loop guard."""
+        from core.music_library import MusicLibrary
+
+        library_config.set('library', 'follow_symlinks', 'true')
+        library_config.set('library', 'exclude_dirs', 'Backup')
+        library = MusicLibrary()
+        library._do_scan()
+        new_album = music_dir / 'Album C'
+        (new_album / 'Backup').mkdir(parents=True)
+        (new_album / '01 - Fresh.mp3').touch()
+        (new_album / 'Backup' / '01 - Fresh.mp3').touch()
+        (new_album / 'loop').symlink_to(music_dir)
+        listed = []
+        scandir = library._fs.scandir
+        library._fs.scandir = lambda path: listed.append(str(path)) or scandir(path)
+
+        library.apply_file_changes({str(new_album)}, set())
+
+        # Listed through the filesystem layer, without the excluded folder
+        # or the loop back to the music directory
+        assert set(listed) == {str(new_album)}
+        folders = library.get_folder_structure()
+        assert sorted(folders) == ['Album A', 'Album B', 'Album C']
+        assert [t.title for t in folders['Album C']] == ['Fresh']
+        assert library.get_track_count() == 7
+
+        library.apply_file_changes({str(new_album / 'Backup')}, set())
+        assert library.get_track_count() == 7
+
+    def test_unplugged_root_is_restored_from_its_shard(self, library_config, music_dir, temp_dir, monkeypatch):
+        """Test an unplugged music directory's entries come back without extraction."""
+        from core import music_library
+        from core.music_library import MusicLibrary
+
+        usb = temp_dir / 'usb'
+        (usb / 'Album U').mkdir(parents=True)
+        (usb / 'Album U' / '01 - Song 1.mp3').touch()
+        library_config.set('library', 'music_dirs', f'{music_dir}:{usb}')
+        MusicLibrary()._do_scan()
+
+        unplugged = temp_dir / 'unplugged'
+        usb.rename(unplugged)
+        library = MusicLibrary()
+        library._do_scan()
+        assert library.get_track_count() == 6
+        # The other directory keeps its folder keys while the drive is away
+        assert sorted(library.get_folder_structure()) == ['music/Album A', 'music/Album B']
+
+        unplugged.rename(usb)
+
+        def extract(file_path):
+            raise AssertionError(f'extracted {file_path}')
+
+        monkeypatch.setattr(music_library, 'extract_track_metadata', extract)
+        assert library.reattach_roots() == [usb]
+        assert library.get_track_count() == 7
+        library._do_scan()
+        assert library.get_track_count() == 7
+        assert 'usb/Album U' in library.get_folder_structure()
+
+    def test_scan_links_tracks_to_folder_covers(self, music_dir, monkeypatch):
+        """Test each directory's cover image is found once and shared by its tracks."""
+        from core import music_library
+        from core.music_library import MusicLibrary
+
+        (music_dir / 'Album A' / 'Folder.png').touch()
+        (music_dir / 'Album A' / 'cover.jpg').touch()
+        library = MusicLibrary()
+        library._do_scan()
+
+        folders = library.get_folder_structure()
+        cover = str(music_dir / 'Album A' / 'cover.jpg')
+        assert [t.album_art_path for t in folders['Album A']] == [cover] * 3
+        assert [t.album_art_path for t in folders['Album B']] == [None] * 3
+
+        (music_dir / 'Album A' / 'cover.jpg').unlink()
+        (music_dir / 'Album B' / 'front.jpeg').touch()
+
+        def extract(file_path):
+            raise AssertionError(f'extracted {file_path}')
+
+        monkeypatch.setattr(music_library, 'extract_track_metadata', extract)
+        library = MusicLibrary()
+        library._do_scan()
+
+        folders = library.get_folder_structure()
+        folder_png = str(music_dir / 'Album A' / 'Folder.png')
+        assert [t.album_art_path for t in folders['Album A']] == [folder_png] * 3
+        front = str(music_dir / 'Album B' / 'front.jpeg')
+        assert [t.album_art_path for t in MusicLibrary().get_folder_structure()['Album B']] == [front] * 3
+
+    def test_apply_file_changes_relinks_folder_covers(self, music_dir, monkeypatch):
+        """Test a cover image added or deleted while watching relinks cached tracks."""
+        from core import music_library
+        from core.music_library import MusicLibrary
+
+        library = MusicLibrary()
+        library._do_scan()
+
+        def extract(file_path):
+            raise AssertionError(f'extracted {file_path}')
+
+        monkeypatch.setattr(music_library, 'extract_track_metadata', extract)
+        cover = music_dir / 'Album B' / 'cover.jpg'
+        cover.touch()
+        library.apply_file_changes({str(cover)}, set())
+
+        folders = library.get_folder_structure()
+        assert [t.album_art_path for t in folders['Album B']] == [str(cover)] * 3
+        assert [t.album_art_path for t in folders['Album A']] == [None] * 3
+
+        cover.unlink()
+        library.apply_file_changes(set(), {str(cover)})
+
+        assert [t.album_art_path for t in library.get_folder_structure()['Album B']] == [None] * 3
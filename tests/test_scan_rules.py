@@ -0,0 +1,40 @@
+"""Tests for scan include/exclude rules."""
+
+from core.scan_rules import ScanRules
+
+
+class TestScanRules:
+    """Test ScanRules class."""
+
+    def test_no_rules_skip_nothing(self):
+        """Test empty rules are falsy and let everything through."""
+        rules = ScanRules()
+        assert not rules
+        assert not rules.skip_dir('.git')
+        assert not rules.skip_file('a/b.mp3')
+
+    def test_exclude_dirs_match_names_anywhere(self):
+        """Test folder name globs apply at any depth, case-insensitively."""
+        rules = ScanRules(exclude_dirs=['.*', '@eaDir'])
+        assert rules.skip_dir('.git')
+        assert rules.skip_dir('Artist/Album/@EADIR')
+        assert not rules.skip_dir('Artist/Album')
+        assert rules.filter_dirs('Artist', ['.hidden', 'Album']) == ['Album']
+
+    def test_exclude_and_include_globs(self):
+        """Test path excludes and file name includes."""
+        rules = ScanRules(exclude=['Podcasts/*', '*.part.mp3'], include=['*.flac', '*.mp3'])
+        assert rules.skip_dir('Podcasts/Show')
+        assert rules.filter_files('Album', ['1.mp3', '2.part.mp3', '3.ogg', '4.FLAC']) == [
+            '1.mp3',
+            '4.FLAC',
+        ]
+
+    def test_excludes_checks_parent_folders(self):
+        """Test files and folders inside an excluded folder are excluded."""
+        rules = ScanRules(exclude_dirs=['Backup'])
+        assert rules.excludes('Artist/Backup/Album/1.mp3')
+        assert not rules.excludes('Artist/Album/1.mp3')
+        assert rules.excludes_dir('Artist/Backup/Album')
+        assert not rules.excludes_dir('Artist/Album')
+        assert not rules.excludes_dir('')
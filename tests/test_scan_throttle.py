@@ -0,0 +1,124 @@
+"""Tests for scan I/O throttling."""
+
+import pytest
+from core import scan_throttle
+from core.scan_throttle import ScanThrottle
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock advanced by the throttle's sleeps."""
+    now = [1000.0]
+    monkeypatch.setattr(scan_throttle.time, 'monotonic', lambda: now[0])
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    return sleep, sleeps
+
+
+class Track:
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+
+class TestScanThrottle:
+    """Test ScanThrottle class."""
+
+    def test_unlimited_never_sleeps(self, clock):
+        """Test no budget means no waiting."""
+        sleep, sleeps = clock
+        throttle = ScanThrottle()
+        for _ in range(100):
+            throttle.acquire(1, 10 * 2**20, sleep)
+        assert sleeps == []
+        assert throttle.snapshot()['mode'] == 'unlimited'
+
+    def test_files_and_bytes_budgets(self, clock):
+        """Test reads are paced after the burst allowance is used up."""
+        sleep, sleeps = clock
+        throttle = ScanThrottle(files_per_sec=10)
+        for _ in range(30):
+            throttle.acquire(1, 0, sleep)
+        # 1s burst (10 files), then 20 files at 10/s
+        assert sum(sleeps) == pytest.approx(2.0)
+        assert throttle.snapshot()['mode'] == 'limited'
+
+        sleeps.clear()
+        throttle = ScanThrottle(bytes_per_sec=2**20)
+        for _ in range(4):
+            # Charged at most TAG_READ_BYTES (1 MiB) per file
+            throttle.acquire(1, 50 * 2**20, sleep)
+        assert sum(sleeps) == pytest.approx(3.0)
+
+    def test_budgets_are_per_device(self, clock):
+        """Test one device's budget does not slow down another."""
+        sleep, sleeps = clock
+        throttle = ScanThrottle(files_per_sec=1)
+        throttle.acquire(1, 0, sleep)
+        throttle.acquire(1, 0, sleep)
+        throttle.acquire(2, 0, sleep)
+        assert sum(sleeps) == pytest.approx(1.0)
+
+    def test_backoff_during_playback_on_same_device(self, clock, temp_dir):
+        """Test playback from the scanned device lowers the budget."""
+        sleep, sleeps = clock
+        song = temp_dir / 'song.mp3'
+        song.touch()
+        device = song.stat().st_dev
+        throttle = ScanThrottle(playback_files_per_sec=2)
+
+        throttle.on_playback_state({'state': 'playing', 'track': Track(str(song))})
+        throttle.acquire(device + 1, 0, sleep)
+        assert throttle.snapshot()['mode'] == 'unlimited'
+        for _ in range(6):
+            throttle.acquire(device, 0, sleep)
+        assert throttle.snapshot()['mode'] == 'backoff'
+        assert sum(sleeps) == pytest.approx(2.0)
+
+        sleeps.clear()
+        throttle.on_playback_state({'state': 'paused'})
+        throttle.acquire(device, 0, sleep)
+        assert sleeps == []
+
+    def test_idle_only_waits_for_playback_to_stop(self, clock, temp_dir):
+        """Test idle-only mode blocks while playing and reports it."""
+        sleep, sleeps = clock
+        throttle = ScanThrottle(idle_only=True)
+        throttle.on_playback_state({'state': 'playing', 'track': Track('/gone.mp3')})
+        waits = []
+
+        def stop_after_two_polls(seconds):
+            sleep(seconds)
+            if len(sleeps) == 2:
+                throttle.on_playback_state({'state': 'stopped'})
+
+        throttle.acquire(1, 0, stop_after_two_polls, on_wait=lambda: waits.append(
+            throttle.snapshot()['mode']))
+        assert waits == ['waiting_for_idle']
+        assert len(sleeps) == 2
+        assert throttle.snapshot()['waited'] == pytest.approx(1.0)
+
+    def test_track_change_moves_the_playing_device(self, clock, temp_dir):
+        """Test moving on to a track on another device ends the backoff."""
+        sleep, sleeps = clock
+        song = temp_dir / 'song.mp3'
+        song.touch()
+        device = song.stat().st_dev
+        throttle = ScanThrottle(playback_files_per_sec=2)
+
+        throttle.on_playback_state({'state': 'playing', 'track': Track(str(song))})
+        throttle.acquire(device, 0, sleep)
+        assert throttle.snapshot()['mode'] == 'backoff'
+
+        # Next playlist track, still playing: no PLAYBACK_STATE_CHANGED
+        throttle.on_track_changed({'track': Track('/elsewhere/next.mp3')})
+        throttle.acquire(device, 0, sleep)
+        assert throttle.snapshot()['mode'] == 'unlimited'
+        throttle.on_track_changed({'track': Track(str(song))})
+        throttle.acquire(device, 0, sleep)
+        assert throttle.snapshot()['mode'] == 'backoff'
+        assert not ScanThrottle(files_per_sec=10).charges_bytes
+        assert ScanThrottle(bytes_per_sec=2**20).charges_bytes
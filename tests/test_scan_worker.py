@@ -0,0 +1,61 @@
+"""Tests for scanner worker processes."""
+
+import os
+
+import pytest
+from core.metadata import TrackMetadata
+from core.scan_worker import ScanWorkerError, ScanWorkerPool
+
+
+def _track(file_path):
+    metadata = TrackMetadata.__new__(TrackMetadata)
+    for field in TrackMetadata.__slots__:
+        setattr(metadata, field, None)
+    metadata.file_path = file_path
+    metadata.artist = 'Artist'
+    metadata.track_number = 3
+    return metadata, os.getpid()
+
+
+def _square(value):
+    return value * value
+
+
+def _fail(value):
+    raise ValueError(value)
+
+
+def _crash(value):
+    os._exit(1)
+
+
+@pytest.fixture
+def pool():
+    pool = ScanWorkerPool(2)
+    yield pool
+    pool.shutdown(wait=True, cancel_futures=True)
+
+
+class TestScanWorkerPool:
+    """Test ScanWorkerPool class."""
+
+    def test_results_come_from_worker_processes(self, pool):
+        """Test tasks run in other processes and tracks round-trip."""
+        futures = [pool.submit(_track, f'/m/{n}.mp3') for n in range(100)]
+        results = [future.result(timeout=10) for future in futures]
+        assert [track.file_path for track, _ in results] == [f'/m/{n}.mp3' for n in range(100)]
+        assert results[0][0].artist == 'Artist' and results[0][0].track_number == 3
+        assert os.getpid() not in {pid for _, pid in results}
+        assert list(pool.map(_square, range(5))) == [0, 1, 4, 9, 16]
+
+    def test_task_errors_are_raised(self, pool):
+        """Test exceptions in tasks reach the caller."""
+        with pytest.raises(ValueError):
+            pool.submit(_fail, 'bad').result(timeout=10)
+        assert pool.submit(_square, 3).result(timeout=10) == 9
+
+    def test_crashed_worker_is_replaced(self, pool):
+        """Test a worker dying fails its tasks, and later tasks still run."""
+        with pytest.raises(ScanWorkerError):
+            pool.submit(_crash, None).result(timeout=10)
+        assert [pool.submit(_square, n).result(timeout=10) for n in range(4)] == [0, 1, 4, 9]
@@ -0,0 +1,92 @@
+"""Tests for the single-pass tag readers."""
+
+from mutagen._vorbis import VCommentDict
+from mutagen.apev2 import APEv2
+from mutagen.asf import ASFTags, ASFUnicodeAttribute
+from mutagen.id3 import ID3, TALB, TDRC, TIT1, TIT2, TPE1, TRCK
+from mutagen.mp4 import MP4Tags
+
+from core.metadata import TrackMetadata
+from core.tag_readers import read_tags
+
+
+class TestReadTags:
+    """Test read_tags."""
+
+    def test_id3(self):
+        """Test ID3 frames map to fields, preferring TIT2 over TIT1."""
+        tags = ID3()
+        tags.add(TIT1(encoding=3, text='Grouping'))
+        tags.add(TIT2(encoding=3, text='Song'))
+        tags.add(TPE1(encoding=3, text=['Artist', 'Guest']))
+        tags.add(TALB(encoding=3, text='  Album  '))
+        tags.add(TDRC(encoding=3, text='1999-05-01'))
+        tags.add(TRCK(encoding=3, text='3/12'))
+
+        assert read_tags(tags) == {
+            'title': 'Song',
+            'artist': 'Artist',
+            'album': 'Album',
+            'year': '1999-05-01',
+            'track': '3/12',
+        }
+
+    def test_vorbis_comments(self):
+        """Test Vorbis keys are case-insensitive and ranked per field."""
+        tags = VCommentDict()
+        tags['title'] = ['First', 'Second']
+        tags['album artist'] = 'Fallback'
+        tags['ALBUMARTIST'] = 'Preferred'
+        tags['year'] = '2001'
+        tags['Date'] = ''
+        tags['tracknumber'] = '7'
+
+        assert read_tags(tags) == {
+            'title': 'First',
+            'album_artist': 'Preferred',
+            'year': '2001',
+            'track': '7',
+        }
+
+    def test_mp4_asf_and_ape(self):
+        """Test MP4 atoms, ASF attributes and APEv2 items."""
+        mp4 = MP4Tags()
+        mp4['\xa9nam'] = ['Song']
+        mp4['aART'] = ['Band']
+        mp4['trkn'] = [(4, 10)]
+        assert read_tags(mp4) == {'title': 'Song', 'album_artist': 'Band', 'track': '4'}
+
+        asf = ASFTags()
+        asf['Author'] = [ASFUnicodeAttribute('Artist')]
+        asf['WM/AlbumTitle'] = [ASFUnicodeAttribute('Album')]
+        asf['WM/TrackNumber'] = [ASFUnicodeAttribute('5')]
+        assert read_tags(asf) == {'artist': 'Artist', 'album': 'Album', 'track': '5'}
+
+        ape = APEv2()
+        ape['Title'] = 'Song'
+        ape['Artist'] = 'One\0Two'
+        ape['Album Artist'] = 'Band'
+        assert read_tags(ape) == {'title': 'Song', 'artist': 'One', 'album_artist': 'Band'}
+
+    def test_missing_and_unknown_containers(self):
+        """Test no tags give no fields and unknown containers give None."""
+        assert read_tags(None) == {}
+        assert read_tags({'TITLE': ['Song']}) is None
+
+    def test_matches_generic_probing(self, tmp_path):
+        """Test the reader finds what probing every key finds."""
+        path = tmp_path / 'song.mp3'
+        tags = ID3()
+        tags.add(TIT2(encoding=3, text='Song'))
+        tags.add(TPE1(encoding=3, text='Artist'))
+        tags.add(TRCK(encoding=3, text='2'))
+        tags.save(path)
+
+        class AudioFile(dict):
+            pass
+
+        audio_file = AudioFile(ID3(path))
+        audio_file.tags = ID3(path)
+        probe = TrackMetadata.__new__(TrackMetadata)
+
+        assert read_tags(audio_file.tags) == probe._read_tags_generic(audio_file)
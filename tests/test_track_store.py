@@ -0,0 +1,95 @@
+"""Tests for the columnar track store."""
+
+import pytest
+from core.metadata import TrackMetadata
+from core.track_store import CHUNK_SIZE, NO_NUMBER, ChunkedColumn, TrackStore
+
+
+def _track(path, title, artist=None, album=None, number=None, duration=None, album_artist=None):
+    return TrackMetadata.from_dict({
+        'file_path': path,
+        'title': title,
+        'artist': artist,
+        'album': album,
+        'album_artist': album_artist,
+        'track_number': number,
+        'duration': duration,
+    })
+
+
+@pytest.fixture
+def store():
+    return TrackStore.from_tracks([
+        _track('/m/a2.mp3', 'Second', 'Air', 'Moon', 2, 200.0),
+        _track('/m/a1.mp3', 'First', 'Air', 'Moon', 1, 100.0),
+        _track('/m/b1.mp3', 'Intro', 'Bjork', 'Post', None, 50.0),
+        _track('/m/c1.mp3', 'Loose', album_artist='Various', duration=None),
+    ])
+
+
+class TestTrackStore:
+    """Test TrackStore class."""
+
+    def test_keeps_only_queried_fields(self, store):
+        """Test the store holds the query columns, not a copy of every field."""
+        assert set(store.strings) == {
+            'artist', 'album', 'album_artist', 'library_artist', 'library_album'}
+        assert store.track_numbers[2] == NO_NUMBER
+        assert store.titles[2] == 'Intro'
+        assert not hasattr(store, 'file_paths')
+
+    def test_group_and_sort(self, store):
+        """Test grouping and album ordering."""
+        groups = store.group_ids('library_artist', 'library_album')
+        assert list(groups) == [('Air', 'Moon'), ('Bjork', 'Post'), ('Various', 'Unknown Album')]
+        assert store.sorted_ids(groups[('Air', 'Moon')]) == [1, 0]
+
+    def test_search_and_aggregate(self, store):
+        """Test search over distinct values and per-artist durations."""
+        assert store.search('moo') == [0, 1]
+        assert store.search('INTRO') == [2]
+        assert store.total_duration_by('library_artist') == {'Air': 300.0, 'Bjork': 50.0}
+
+    def test_remove_and_update(self, store):
+        """Test tombstoned rows disappear and updates keep their id."""
+        store.remove(0)
+        store.update(2, _track('/m/b1.mp3', 'Intro', 'Björk', 'Post'))
+
+        assert len(store) == 3
+        assert store.titles[0] is None
+        assert list(store.group_ids('artist')) == [('Air',), ('Björk',), (None,)]
+        assert store.search('björk') == [2]
+        assert store.total_duration_by('artist') == {'Air': 100.0}
+
+    def test_copies_share_unchanged_chunks(self, store):
+        """Test a copy only copies the chunks written to after copying."""
+        for number in range(2 * CHUNK_SIZE):
+            store.add(_track(f'/m/x{number}.mp3', f'Extra {number}', 'Air', 'Moon'))
+        copy = store.copy()
+        copy.update(1, _track('/m/a1.mp3', 'Renamed', 'Air', 'Moon', 1, 100.0))
+        copy.add(_track('/m/new.mp3', 'New', 'Moby', 'Play'))
+
+        chunks = list(zip(store.titles._chunks, copy.titles._chunks))
+        assert [old is new for old, new in chunks] == [False, True, False]
+        assert store.titles[1] == 'First'
+        assert len(store) == 2 * CHUNK_SIZE + 4
+        assert store.search('Moby') == []
+        assert copy.search('Moby') == [2 * CHUNK_SIZE + 4]
+        assert copy.search('renamed') == [1]
+
+
+class TestChunkedColumn:
+    """Test ChunkedColumn class."""
+
+    def test_values_across_chunks(self):
+        """Test appends, extends and writes on both sides of chunk borders."""
+        column = ChunkedColumn.from_values(range(CHUNK_SIZE - 1), 'q')
+        column.extend([-1, -2])
+        column.append(-3)
+        column[CHUNK_SIZE] = 7
+
+        assert len(column) == CHUNK_SIZE + 2
+        assert list(column)[-4:] == [CHUNK_SIZE - 2, -1, 7, -3]
+        assert column.take([0, CHUNK_SIZE + 1]) == [0, -3]
+        with pytest.raises(IndexError):
+            column[CHUNK_SIZE + 2]
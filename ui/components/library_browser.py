@@ -1,7 +1,9 @@
 """Library browser component - sidebar with artist/album/track tree."""
 
+import threading
+from collections import deque
 from pathlib import Path
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Tuple
 
 if TYPE_CHECKING:
     from core.music_library import MusicLibrary
@@ -21,6 +23,9 @@ from ui.context_menu_touch import pick_widget_under_pointer, popover_should_dism
 
 logger = get_logger(__name__)
 
+# Tracks merged into the tree per idle callback while a scan streams results
+MERGE_CHUNK_SIZE = 200
+
 
 def _track_order_key(track: TrackMetadata) -> tuple[str, int, str, str]:
     """Sort tracks by parent directory, then track number, then title, then path."""
@@ -62,9 +67,9 @@ class LibraryBrowser(Gtk.Box):
             self._install_context_menu_outside_close(window)
 
         # Header
-        header = Gtk.Label(label="Library")
-        header.add_css_class("title-2")
-        self.append(header)
+        self.header = Gtk.Label(label="Library")
+        self.header.add_css_class("title-2")
+        self.append(self.header)
 
         # Scrolled window for tree view
         self.scrolled = Gtk.ScrolledWindow()
@@ -121,6 +126,29 @@ class LibraryBrowser(Gtk.Box):
         # Music root path (set when populating) for fallback folder path from tree
         self._music_root: Optional[Path] = None
 
+        # Incremental updates: folder rows by relative path, track rows by
+        # file path (TreeStore iters stay valid while their rows exist), and
+        # (action, music_root, rel_folder, track) items queued by
+        # LIBRARY_TRACKS_ADDED / _UPDATED / _REMOVED (published from library
+        # threads); action is "add", "update" or "remove"
+        self._folder_iters: Dict[str, Gtk.TreeIter] = {}
+        self._track_iters: Dict[str, Gtk.TreeIter] = {}
+        self._pending_tracks: Deque[Tuple[str, Path, str, TrackMetadata]] = deque()
+        self._merge_lock = threading.Lock()
+        self._merge_scheduled = False
+        self._showing_search_results = False
+        if self._events:
+            self._events.subscribe(EventBus.LIBRARY_TRACKS_ADDED, self._on_tracks_added)
+            self._events.subscribe(
+                EventBus.LIBRARY_TRACKS_UPDATED, self._on_tracks_updated
+            )
+            self._events.subscribe(
+                EventBus.LIBRARY_TRACKS_REMOVED, self._on_tracks_removed
+            )
+            self._events.subscribe(
+                EventBus.LIBRARY_SCAN_PROGRESS, self._on_scan_progress
+            )
+
         # Single-click expand/collapse state
         self._click_timeout_id = None
         self._click_in_progress = False
@@ -144,78 +172,209 @@ class LibraryBrowser(Gtk.Box):
         self._library = library  # Keep reference for restoring after search
         self._showing_search_results = False
         self.store.clear()
+        self._folder_iters = {}
+        self._track_iters = {}
 
-        folder_structure = library.get_folder_structure()
-        music_root = library.get_music_root()
+        # Prebuilt and sorted by the library; one snapshot keeps tree and
+        # root consistent even if a scan publishes meanwhile
+        snapshot = library.get_snapshot()
+        folder_tree = snapshot.folder_tree
+        music_root = snapshot.music_root
 
-        if not folder_structure or not music_root:
+        if not (folder_tree["tracks"] or folder_tree["folders"]) or not music_root:
             self._music_root = None
             return
 
-        # Build folder tree structure
         self._music_root = Path(music_root)
-        folder_tree = {}
-        root_path = self._music_root
-
-        # Sort folder paths to maintain order
-        sorted_folders = sorted(folder_structure.keys())
-
-        # Create folder hierarchy
-        for folder_path in sorted_folders:
-            # Get folder parts (folder_path is relative to music_root)
-            # Handle "." (current directory) as root
-            if folder_path and folder_path != ".":
-                parts = Path(folder_path).parts
-            else:
-                parts = []
-
-            # Build tree structure
-            current = folder_tree
-            for part in parts:
-                if part not in current:
-                    current[part] = {}
-                current = current[part]
-
-            # Store tracks for this folder
-            if "tracks" not in current:
-                current["tracks"] = []
-            current["tracks"].extend(folder_structure[folder_path])
-
         # Populate tree view recursively from folder_tree (root has no folder row)
-        self._populate_tree(None, folder_tree, None, root_path)
+        self._populate_tree(None, folder_tree, None, ".")
 
     def _populate_tree(
         self,
         parent_iter,
         folder_tree: dict,
         folder_name: Optional[str],
-        folder_path: Path,
+        rel_path: str,
     ) -> None:
-        """Recursively populate tree view from folder structure."""
+        """Recursively populate tree view from a get_folder_tree() node."""
         if folder_name is not None:
+            folder_path = self._library.get_folder_path(rel_path)
+            if folder_path is None:
+                folder_path = self._music_root / rel_path
             folder_iter = self.store.append(
                 parent_iter, [folder_name, "folder", str(folder_path)]
             )
+            self._folder_iters[rel_path] = folder_iter
         else:
             folder_iter = parent_iter  # root: no row, children attach to parent
 
         # Tracks in this folder (root-level tracks use parent_iter None)
-        if "tracks" in folder_tree:
-            target = folder_iter if folder_iter is not None else parent_iter
-            for track in sorted(folder_tree["tracks"], key=_track_order_key):
-                track_name = track.title or Path(track.file_path).stem
-                self.store.append(target, [track_name, "track", track])
-
-        # Recurse into subfolders
-        for key, value in sorted(folder_tree.items()):
-            if key != "tracks":
-                subfolder_path = folder_path / key
-                self._populate_tree(
-                    folder_iter if folder_iter is not None else parent_iter,
-                    value,
-                    key,
-                    subfolder_path,
-                )
+        target = folder_iter if folder_iter is not None else parent_iter
+        for track in folder_tree["tracks"]:
+            track_name = track.title or Path(track.file_path).stem
+            self._track_iters[track.file_path] = self.store.append(
+                target, [track_name, "track", track]
+            )
+
+        # Recurse into subfolders (already sorted by name)
+        for name, child in folder_tree["folders"].items():
+            self._populate_tree(target, child, name, str(Path(rel_path) / name))
+
+    # =========================================================================
+    # Streaming scan results and library changes (Core → UI via events,
+    # merged on idle)
+    # =========================================================================
+
+    def _on_tracks_added(self, data: Optional[dict]) -> None:
+        """Subscriber (scan thread): queue a batch and schedule an idle merge."""
+        self._queue_tracks("add", data)
+
+    def _on_tracks_updated(self, data: Optional[dict]) -> None:
+        """Subscriber (library threads): re-read tracks replace their rows."""
+        self._queue_tracks("update", data)
+
+    def _on_tracks_removed(self, data: Optional[dict]) -> None:
+        """Subscriber (library threads): rows of deleted tracks go."""
+        self._queue_tracks("remove", data)
+
+    def _queue_tracks(self, action: str, data: Optional[dict]) -> None:
+        """Queue the tracks of an event by folder and schedule an idle merge."""
+        if not data:
+            return
+        music_root = data.get("music_root")
+        items = [
+            (action, music_root, rel_path, track)
+            for rel_path, tracks in sorted(data.get("folders", {}).items())
+            for track in tracks
+        ]
+        with self._merge_lock:
+            self._pending_tracks.extend(items)
+            if self._merge_scheduled:
+                return
+            self._merge_scheduled = True
+        GLib.idle_add(self._merge_pending_tracks)
+
+    def _merge_pending_tracks(self) -> bool:
+        """Idle callback: apply up to MERGE_CHUNK_SIZE queued tracks to the tree."""
+        for _ in range(MERGE_CHUNK_SIZE):
+            with self._merge_lock:
+                if not self._pending_tracks:
+                    self._merge_scheduled = False
+                    return False
+                action, music_root, rel_path, track = self._pending_tracks.popleft()
+            # Search results are flat; the full view is rebuilt when search ends
+            if self._showing_search_results:
+                continue
+            if action != "add":
+                # An updated track keeps its folder row
+                self._remove_track(rel_path, track.file_path, prune=action == "remove")
+            if action != "remove":
+                self._merge_track(music_root, rel_path, track)
+        return True  # More queued: continue on the next idle iteration
+
+    def _merge_track(
+        self, music_root: Path, rel_path: str, track: TrackMetadata
+    ) -> None:
+        """Insert one track at its sorted position, creating folder rows as needed."""
+        if track.file_path in self._track_iters:
+            return
+        if self._music_root is None:
+            self._music_root = Path(music_root)
+        parent_iter = self._ensure_folder_row(rel_path, Path(track.file_path).parent)
+
+        key = _track_order_key(track)
+        sibling = self.store.iter_children(parent_iter)
+        while sibling is not None:
+            _, item_type, data = self.store.get(sibling, 0, 1, 2)
+            if item_type != "track" or _track_order_key(data) > key:
+                break
+            sibling = self.store.iter_next(sibling)
+
+        track_name = track.title or Path(track.file_path).stem
+        self._track_iters[track.file_path] = self.store.insert_before(
+            parent_iter, sibling, [track_name, "track", track]
+        )
+
+    def _remove_track(self, rel_path: str, file_path: str, prune: bool) -> None:
+        """Remove the row of a track; with ``prune``, also folders left empty."""
+        track_iter = self._track_iters.pop(file_path, None)
+        if track_iter is None:
+            return
+        self.store.remove(track_iter)
+        while prune and rel_path and rel_path != ".":
+            folder_iter = self._folder_iters.get(rel_path)
+            if folder_iter is None or self.store.iter_has_child(folder_iter):
+                break
+            self.store.remove(folder_iter)
+            del self._folder_iters[rel_path]
+            rel_path = str(Path(rel_path).parent)
+
+    def _ensure_folder_row(
+        self, rel_path: str, folder_dir: Path
+    ) -> Optional[Gtk.TreeIter]:
+        """
+        Get (or create, in sorted position) the row for a relative folder path.
+
+        ``folder_dir`` is the folder's directory on disk; parents are derived
+        from it, so folders of every music directory get the right path.
+        """
+        if not rel_path or rel_path == ".":
+            return None
+        folder_iter = self._folder_iters.get(rel_path)
+        if folder_iter is not None:
+            return folder_iter
+
+        rel = Path(rel_path)
+        parent_iter = self._ensure_folder_row(str(rel.parent), folder_dir.parent)
+        # Tracks come first, then subfolders sorted by name (as in populate)
+        sibling = self.store.iter_children(parent_iter)
+        while sibling is not None:
+            name, item_type = self.store.get(sibling, 0, 1)
+            if item_type == "folder" and name > rel.name:
+                break
+            sibling = self.store.iter_next(sibling)
+
+        folder_iter = self.store.insert_before(
+            parent_iter, sibling, [rel.name, "folder", str(folder_dir)]
+        )
+        self._folder_iters[rel_path] = folder_iter
+        return folder_iter
+
+    def _on_scan_progress(self, data: Optional[dict]) -> None:
+        """Subscriber (scan thread): show scan progress in the header."""
+        if not data:
+            return
+        if data.get("done"):
+            label = "Library"
+        elif data.get("paused"):
+            label = f"Library (scan paused at {data.get('files', 0)} files)"
+        elif (data.get("throttle") or {}).get("mode") == "waiting_for_idle":
+            label = "Library (scan waits until playback stops)"
+        else:
+            label = f"Library (scanning… {data.get('files', 0)} files)"
+        GLib.idle_add(self._set_header_label, label)
+
+    def _set_header_label(self, label: str) -> bool:
+        self.header.set_label(label)
+        return False
+
+    def cleanup(self) -> None:
+        """Unsubscribe from library events."""
+        if self._events:
+            self._events.unsubscribe(
+                EventBus.LIBRARY_TRACKS_ADDED, self._on_tracks_added
+            )
+            self._events.unsubscribe(
+                EventBus.LIBRARY_TRACKS_UPDATED, self._on_tracks_updated
+            )
+            self._events.unsubscribe(
+                EventBus.LIBRARY_TRACKS_REMOVED, self._on_tracks_removed
+            )
+            self._events.unsubscribe(
+                EventBus.LIBRARY_SCAN_PROGRESS, self._on_scan_progress
+            )
+        with self._merge_lock:
+            self._pending_tracks.clear()
 
     def show_search_results(self, tracks: List[TrackMetadata]) -> None:
         """Show search results as a flat list of tracks."""
@@ -430,12 +589,15 @@ class LibraryBrowser(Gtk.Box):
         """Build full folder path from tree row by walking up to root. Returns None if no music root."""
         if self._music_root is None:
             return None
-        parent = self.store.iter_parent(folder_iter)
-        name = self.store.get(folder_iter, 0)[0]
-        if parent is None:
-            return self._music_root / name
-        parent_path = self._get_folder_path_from_iter(parent)
-        return (parent_path / name) if parent_path else None
+        names = []
+        while folder_iter is not None:
+            names.append(self.store.get(folder_iter, 0)[0])
+            folder_iter = self.store.iter_parent(folder_iter)
+        rel_path = str(Path(*reversed(names)))
+        library = getattr(self, "_library", None)
+        if library is not None:
+            return library.get_folder_path(rel_path)
+        return self._music_root / rel_path
 
     def _install_context_menu_outside_close(self, window: Gtk.Window) -> None:
         """Close context menu on press/touch outside the popover (CAPTURE + GdkEvent + pick)."""
@@ -1,13 +1,16 @@
 """Metadata panel component - displays now playing information."""
 
+from concurrent.futures import Future
 from typing import Optional
 
 import gi
 
+gi.require_version("GLib", "2.0")
 gi.require_version("GObject", "2.0")
 gi.require_version("Gtk", "4.0")
-from gi.repository import GObject, Gtk
+from gi.repository import GLib, GObject, Gtk
 
+from core.album_art import AlbumArt
 from core.events import EventBus
 from core.logging import get_logger
 from core.metadata import TrackMetadata
@@ -18,7 +21,11 @@ logger = get_logger(__name__)
 class MetadataPanel(Gtk.Box):
     """Component for displaying track metadata and album art."""
 
-    def __init__(self, event_bus: Optional[EventBus] = None) -> None:
+    def __init__(
+        self,
+        event_bus: Optional[EventBus] = None,
+        album_art: Optional[AlbumArt] = None,
+    ) -> None:
         """
         Initialize metadata panel.
 
@@ -27,6 +34,8 @@ class MetadataPanel(Gtk.Box):
 
         Args:
             event_bus: Optional EventBus instance for subscribing to track changes
+            album_art: Optional AlbumArt for extracting embedded art on demand
+                (without it only album_art_path is shown)
         """
         super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=10)
         self.set_size_request(250, -1)
@@ -49,6 +58,7 @@ class MetadataPanel(Gtk.Box):
 
         # Track pending art path for lazy loading
         self._pending_art_path: Optional[str] = None
+        self._album_art = album_art
 
         # Track current track to detect changes
         self._current_track: Optional[TrackMetadata] = None
@@ -174,14 +184,39 @@ class MetadataPanel(Gtk.Box):
             # Clear first to avoid showing wrong art
             self.art_image.set_filename(None)
 
-            # Set album art lazily (only when panel is visible)
-            if track.album_art_path and self.get_visible():
-                self._load_album_art(track.album_art_path)
-            elif track.album_art_path:
-                # Store path for later loading
-                self._pending_art_path = track.album_art_path
+            self._pending_art_path = None
+            if self._album_art is None:
+                art_path = track.album_art_path
             else:
-                self._pending_art_path = None
+                art_path = self._album_art.cached(track)
+                if art_path is None and self._album_art.needs_extraction(track):
+                    # Embedded art is extracted in the background on first use
+                    self._album_art.request(track).add_done_callback(
+                        lambda future: GLib.idle_add(
+                            self._on_album_art_extracted, track, future
+                        )
+                    )
+            self._show_album_art(art_path)
+
+    def _show_album_art(self, art_path: Optional[str]) -> None:
+        """Show album art now if the panel is visible, else when it becomes visible."""
+        if art_path and self.get_visible():
+            self._load_album_art(art_path)
+        elif art_path:
+            # Store path for later loading
+            self._pending_art_path = art_path
+
+    def _on_album_art_extracted(self, track: TrackMetadata, future: Future) -> bool:
+        """Show extracted art if its track is still displayed (main loop)."""
+        current = self._current_track
+        if (
+            current is not None
+            and current.file_path == track.file_path
+            and not future.cancelled()
+            and future.exception() is None
+        ):
+            self._show_album_art(future.result())
+        return False
 
     def _load_album_art(self, art_path: str) -> None:
         """
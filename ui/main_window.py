@@ -1,11 +1,14 @@
 """Main application window with dockable panels."""
 
+import itertools
+
 import gi
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("GLib", "2.0")
 from gi.repository import GLib, Gtk
 
+from core.album_art import AlbumArt, AlbumArtPrefetcher
 from core.audio_player import AudioPlayer
 from core.bluetooth_manager import BluetoothManager
 from core.bluetooth_sink import BluetoothSink
@@ -50,7 +53,7 @@ class MainWindow(Gtk.ApplicationWindow):
         # ---------------------------------------------------------------------
         # Layer 2: Backends (library, players, MOC, BT, volume, MPRIS2)
         # ---------------------------------------------------------------------
-        self.library = MusicLibrary()
+        self.library = MusicLibrary(event_bus=self.event_bus)
         self.player = AudioPlayer()
         self.bt_manager = BluetoothManager(parent_window=self, event_bus=self.event_bus)
         self.bt_sink = BluetoothSink(self.bt_manager, event_bus=self.event_bus)
@@ -59,7 +62,12 @@ class MainWindow(Gtk.ApplicationWindow):
         )
         self.moc_controller = MocController()
         self.use_moc = self.moc_controller.is_available()
-        self.mpris2 = MPRIS2Manager()
+        # Embedded album art is extracted on demand, upcoming tracks ahead
+        self.album_art = AlbumArt(store=self.library.art_store)
+        self.album_art_prefetcher = AlbumArtPrefetcher(
+            self.album_art, self.playlist_manager, self.event_bus
+        )
+        self.mpris2 = MPRIS2Manager(album_art=self.album_art)
 
         # ---------------------------------------------------------------------
         # Layer 3: Playback controller (playlist_manager + event bus; no app state)
@@ -94,6 +102,10 @@ class MainWindow(Gtk.ApplicationWindow):
         if current_track:
             self.metadata_panel.sync_with_state(current_track)
         GLib.idle_add(self.dock_manager.load_layout)
+        # Show the cached library right away; the scan refreshes it afterwards
+        # (and the browser applies later changes itself)
+        if self.library.get_track_count():
+            GLib.idle_add(self._populate_library_browser)
         self.library.scan_library(callback=self._on_library_scan_complete)
         self.connect("close-request", self._on_close)
 
@@ -327,7 +339,9 @@ class MainWindow(Gtk.ApplicationWindow):
 
     def _create_metadata_panel(self):
         """Create the metadata panel."""
-        self.metadata_panel = MetadataPanel(event_bus=self.event_bus)
+        self.metadata_panel = MetadataPanel(
+            event_bus=self.event_bus, album_art=self.album_art
+        )
 
     def _create_bluetooth_panel(self):
         """Create the Bluetooth panel with speaker mode support."""
@@ -402,7 +416,9 @@ class MainWindow(Gtk.ApplicationWindow):
         # Cleanup playlist view (includes timeout cleanup)
         if hasattr(self, "playlist_view"):
             self.playlist_view.cleanup()
-        # Cleanup metadata and bluetooth panels (unsubscribe events)
+        # Cleanup library browser, metadata and bluetooth panels (unsubscribe events)
+        if hasattr(self, "library_browser"):
+            self.library_browser.cleanup()
         if hasattr(self, "metadata_panel"):
             self.metadata_panel.cleanup()
         if hasattr(self, "bt_panel"):
@@ -416,19 +432,42 @@ class MainWindow(Gtk.ApplicationWindow):
         # Cleanup playlist manager (cancel debounced write timer, unsubscribe events)
         if hasattr(self, "playlist_manager"):
             self.playlist_manager.cleanup()
+        if hasattr(self, "album_art"):
+            self.album_art_prefetcher.cleanup()
+            self.album_art.close()
 
         # Cleanup library watcher
         if hasattr(self, "library") and hasattr(self.library, "stop_watching"):
             self.library.stop_watching()
+            # Checkpoint a running scan; the next launch resumes it
+            scan_job = self.library.get_scan_job()
+            if scan_job is not None and not scan_job.is_done:
+                scan_job.cancel()
+                scan_job.wait(timeout=2.0)
+            # Watcher batches only invalidated it; the next start is instant
+            self.library.save_snapshot()
 
         return False  # Allow close to proceed
 
     def _on_library_scan_complete(self):
         """Called when library scan is complete."""
+        # From here on, keep the library current without full rescans
+        self.library.start_watching()
         # Use idle_add to populate browser incrementally (non-blocking)
         GLib.idle_add(self._populate_library_browser)
+        # Drop cached art of tracks that are gone, trim the cache to its size
+        GLib.idle_add(
+            self._collect_album_art_garbage, self.library.get_snapshot().tracks
+        )
         # PlaybackController handles MOC playlist loading
 
+    def _collect_album_art_garbage(self, library_tracks):
+        """Start album art garbage collection (main loop: reads the playlist)."""
+        self.album_art.collect_garbage(
+            itertools.chain(library_tracks, self.playlist_manager.get_playlist())
+        )
+        return False  # Don't repeat
+
     def _populate_library_browser(self):
         """Populate library browser (called via idle_add for non-blocking)."""
         self.library_browser.populate(self.library)